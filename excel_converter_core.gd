@@ -5,13 +5,63 @@ class_name ExcelConverterCore
 # Excel转换器核心类
 var logger: EditorLogger
 
+# 转换进度事件（格式见src/progress.py），总是在主线程中发出
+signal progress_event(event: Dictionary)
+# start_conversion启动的后台转换完成
+signal conversion_finished(success: bool)
+
+# 后台转换线程
+var _conversion_thread: Thread = null
+
 func _init():
 	logger = EditorLogger.new()
 
+# 常驻转换服务进程（所有ExcelConverterCore实例共享，避免每次转换都重新启动Python并导入pandas）
+static var _server_stdio: FileAccess = null
+static var _server_pid: int = -1
+static var _server_request_id: int = 0
+static var _server_mutex: Mutex = Mutex.new()
+
+func start_conversion(input_path: String = "", output_path: String = "", generate_gdscript: bool = false) -> bool:
+	"""在后台线程中执行Excel转换，不阻塞编辑器；进度和结果通过信号通知"""
+	if is_converting():
+		logger.log_warning("已有转换正在进行，请等待完成")
+		return false
+	
+	_conversion_thread = Thread.new()
+	_conversion_thread.start(_run_conversion_thread.bind(input_path, output_path, generate_gdscript))
+	return true
+
+func is_converting() -> bool:
+	"""是否有后台转换正在进行"""
+	return _conversion_thread != null
+
+func wait_for_conversion():
+	"""等待后台转换结束（插件卸载时调用）"""
+	if _conversion_thread != null:
+		_conversion_thread.wait_to_finish()
+		_conversion_thread = null
+
+func _run_conversion_thread(input_path: String, output_path: String, generate_gdscript: bool):
+	"""后台转换线程函数"""
+	var success = execute_conversion(input_path, output_path, generate_gdscript)
+	call_deferred("_on_conversion_thread_finished", success)
+
+func _on_conversion_thread_finished(success: bool):
+	"""后台转换完成，回到主线程"""
+	if _conversion_thread == null:
+		return
+	_conversion_thread.wait_to_finish()
+	_conversion_thread = null
+	conversion_finished.emit(success)
+
+func _emit_progress(event: Dictionary):
+	"""把进度事件转发到主线程发出"""
+	call_deferred("emit_signal", "progress_event", event)
+
 func execute_conversion(input_path: String = "", output_path: String = "", generate_gdscript: bool = false):
-	"""执行Excel转换"""
+	"""执行Excel转换（阻塞直到完成，需要不阻塞编辑器时使用start_conversion）"""
 	logger.log_info("开始Excel转换...")
-	logger.log_info("当前python路径: %s" % get_python_path())
 	
 	# 获取设置
 	var python_path = get_python_path()
@@ -21,50 +71,240 @@ func execute_conversion(input_path: String = "", output_path: String = "", gener
 	var enable_gdscript = generate_gdscript or get_enable_gdscript_generation()
 	var gdscript_output = get_gdscript_output_path()
 	
+	logger.log_info("当前python路径: %s" % python_path)
+	
 	# 使用传入的路径或默认路径
 	var final_input = input_path if input_path != "" else default_input
 	var final_output = output_path if output_path != "" else default_output
 	
-	# 构建命令参数
-	var args = [script_path]
+	# 构建转换参数
+	var params = {"config": get_config_path()}
 	if final_input != "":
-		args.append("--input")
-		args.append(final_input)
+		params["input"] = final_input
 	if final_output != "":
-		args.append("--output")
-		args.append(final_output)
+		params["output"] = final_output
 	
 	# 添加GDScript生成参数
 	if enable_gdscript:
-		args.append("--generate-gdscript")
+		params["generate_gdscript"] = true
 		if gdscript_output != "":
-			args.append("--gdscript-output")
-			args.append(gdscript_output)
+			params["gdscript_output"] = gdscript_output
 		logger.log_info("已启用GDScript脚本生成")
 	
 	# 更新配置文件中的base_resource_path
 	if enable_gdscript:
 		update_python_config()
 	
-	# 执行Python脚本
-	var output = []
-	var exit_code = OS.execute(python_path, args, output, true, true)
+	# 优先使用常驻服务，启动失败时回退到单次执行
+	if get_use_persistent_server():
+		var result = _convert_with_server(python_path, script_path, params)
+		if not result.is_empty():
+			return _report_server_result(result, enable_gdscript)
+		logger.log_warning("常驻转换服务不可用，回退到单次执行模式")
+	
+	return _convert_with_process(python_path, script_path, params, enable_gdscript)
+
+func _convert_with_process(python_path: String, script_path: String, params: Dictionary, enable_gdscript: bool) -> bool:
+	"""启动一次Python进程执行转换，逐行读取进度事件"""
+	# 构建命令参数；标准错误输出写入日志文件，只需读取标准输出，
+	# 避免子进程写满无人读取的stderr管道后与读取stdout的本线程互相等待
+	var log_path = get_process_log_path()
+	var args = [script_path, "--config", params["config"], "--progress", "--log-file", log_path]
+	if FileAccess.file_exists(log_path):
+		DirAccess.remove_absolute(log_path)
+	if params.has("input"):
+		args.append("--input")
+		args.append(params["input"])
+	if params.has("output"):
+		args.append("--output")
+		args.append(params["output"])
+	if params.get("generate_gdscript", false):
+		args.append("--generate-gdscript")
+		if params.has("gdscript_output"):
+			args.append("--gdscript-output")
+			args.append(params["gdscript_output"])
+	
+	# 通过管道执行Python脚本，标准输出为逐行JSON进度事件
+	var info = OS.execute_with_pipe(python_path, args)
+	if info.is_empty():
+		logger.log_error("无法启动Python进程: " + python_path)
+		return false
+	
+	var stdio: FileAccess = info["stdio"]
+	var stderr: FileAccess = info["stderr"]
+	var pid: int = info["pid"]
+	var failed = 0
+	
+	while true:
+		var line = stdio.get_line()
+		if line == "":
+			if stdio.get_error() != OK:
+				break
+			continue
+		
+		var event = _handle_progress_line(line)
+		if event.get("event", "") == "batch_finished":
+			failed = int(event.get("failed", 0))
+			logger.log_info("转换统计 - 成功: %d, 失败: %d, 跳过: %d" % [int(event.get("success", 0)), failed, int(event.get("skipped", 0))])
+		elif event.get("event", "") == "error":
+			failed = max(failed, 1)
+	
+	# 标准输出关闭后等待进程退出，输出未转为事件的错误（如Python异常）
+	while OS.is_process_running(pid):
+		OS.delay_msec(10)
+	var exit_code = OS.get_process_exit_code(pid)
+	var error_output = []
+	var log_file = FileAccess.open(log_path, FileAccess.READ)
+	if log_file != null:
+		error_output = log_file.get_as_text().split("\n", false)
+		log_file.close()
+	else:
+		# 重定向前就退出（如Python启动失败）时错误仍在stderr中，进程已退出，读取不会阻塞
+		while true:
+			var line = stderr.get_line()
+			if line == "" and stderr.get_error() != OK:
+				break
+			if line != "":
+				error_output.append(line)
 	
 	# 处理结果
-	if exit_code == 0:
+	if exit_code == 0 and failed == 0:
 		logger.log_info("Excel转换成功完成！")
 		if enable_gdscript:
 			logger.log_info("GDScript脚本生成完成！")
-		if output.size() > 0:
-			for line in output:
-				logger.log_info(line)
-	else:
+	elif exit_code != 0:
 		logger.log_error("Excel转换失败，退出代码: " + str(exit_code))
-		if output.size() > 0:
-			for line in output:
-				logger.log_error(line)
+	else:
+		logger.log_error("Excel转换失败，%d 个文件出错" % failed)
+	for line in error_output:
+		logger.log_error(line)
 	
-	return exit_code == 0
+	return exit_code == 0 and failed == 0
+
+func _handle_progress_line(line: String) -> Dictionary:
+	"""处理转换进程输出的一行：日志事件输出到编辑器，其余进度事件转发为信号"""
+	var event = JSON.parse_string(line)
+	if typeof(event) != TYPE_DICTIONARY or not event.has("event"):
+		logger.log_info(line)
+		return {}
+	
+	if event["event"] == "log":
+		_log_server_message(event)
+	else:
+		_emit_progress(event)
+	return event
+
+func _convert_with_server(python_path: String, script_path: String, params: Dictionary) -> Dictionary:
+	"""通过常驻服务执行转换，服务不可用时返回空字典"""
+	_server_mutex.lock()
+	var response = {}
+	if _ensure_server(python_path, script_path):
+		response = _call_server("convert", params)
+	_server_mutex.unlock()
+	return response
+
+func _report_server_result(response: Dictionary, enable_gdscript: bool) -> bool:
+	"""输出常驻服务的转换结果"""
+	if response.has("error"):
+		logger.log_error("Excel转换失败: " + str(response["error"].get("message", "")))
+		return false
+	
+	var result = response.get("result", {})
+	var failed = int(result.get("failed", 0))
+	logger.log_info("转换统计 - 成功: %d, 失败: %d, 跳过: %d" % [int(result.get("success", 0)), failed, int(result.get("skipped", 0))])
+	if failed > 0:
+		logger.log_error("Excel转换失败，%d 个文件出错" % failed)
+		return false
+	
+	logger.log_info("Excel转换成功完成！")
+	if enable_gdscript:
+		logger.log_info("GDScript脚本生成完成！")
+	return true
+
+func _ensure_server(python_path: String, script_path: String) -> bool:
+	"""确保常驻服务进程正在运行（调用方需持有_server_mutex）"""
+	if _server_stdio != null and OS.is_process_running(_server_pid):
+		return true
+	
+	# 服务的标准错误输出写入日志文件，避免无人读取的stderr管道写满后阻塞服务
+	var info = OS.execute_with_pipe(python_path, [script_path, "--serve", "--log-file", get_server_log_path()])
+	if info.is_empty():
+		return false
+	
+	_server_stdio = info["stdio"]
+	_server_pid = info["pid"]
+	logger.log_info("已启动常驻转换服务，进程ID: %d" % _server_pid)
+	return true
+
+func _call_server(method: String, params: Dictionary) -> Dictionary:
+	"""发送请求并等待响应，期间把服务推送的日志输出到编辑器（调用方需持有_server_mutex）"""
+	_server_request_id += 1
+	var request_id = _server_request_id
+	var request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+	_server_stdio.store_line(JSON.stringify(request))
+	_server_stdio.flush()
+	
+	while OS.is_process_running(_server_pid):
+		var line = _server_stdio.get_line()
+		if line == "":
+			if _server_stdio.get_error() != OK:
+				break
+			continue
+		
+		var message = JSON.parse_string(line)
+		if typeof(message) != TYPE_DICTIONARY:
+			logger.log_info(line)
+			continue
+		
+		if message.has("id") and message["id"] != null and int(message["id"]) == request_id:
+			return message
+		
+		match message.get("method", ""):
+			"log":
+				_log_server_message(message.get("params", {}))
+			"progress":
+				_emit_progress(message.get("params", {}))
+	
+	# 服务进程已退出，输出日志文件中的错误信息（如Python异常）
+	_server_stdio = null
+	_server_pid = -1
+	_report_server_log()
+	return {}
+
+func _report_server_log():
+	"""输出常驻服务日志文件的内容"""
+	var file = FileAccess.open(get_server_log_path(), FileAccess.READ)
+	if file == null:
+		return
+	
+	for line in file.get_as_text().split("\n", false):
+		logger.log_error(line)
+	file.close()
+
+func _log_server_message(params: Dictionary):
+	"""输出服务推送的日志"""
+	var message = str(params.get("message", ""))
+	match params.get("level", "INFO"):
+		"ERROR", "CRITICAL":
+			logger.log_error(message)
+		"WARNING":
+			logger.log_warning(message)
+		_:
+			logger.log_info(message)
+
+static func shutdown_server():
+	"""关闭常驻转换服务（插件卸载时调用）"""
+	_server_mutex.lock()
+	if _server_stdio != null and OS.is_process_running(_server_pid):
+		_server_request_id += 1
+		_server_stdio.store_line(JSON.stringify({"jsonrpc": "2.0", "id": _server_request_id, "method": "shutdown"}))
+		_server_stdio.flush()
+		OS.delay_msec(100)
+		if OS.is_process_running(_server_pid):
+			OS.kill(_server_pid)
+	_server_stdio = null
+	_server_pid = -1
+	_server_mutex.unlock()
 
 func get_python_path() -> String:
 	"""获取Python路径 (从用户本地配置获取，不使用项目设置)"""
@@ -154,13 +394,29 @@ func get_gdscript_output_path() -> String:
 		return ProjectSettings.globalize_path("res://scripts/generated/")
 	return ProjectSettings.globalize_path(setting)
 
+func get_use_persistent_server() -> bool:
+	"""获取是否使用常驻转换服务"""
+	return ProjectSettings.get_setting("excel_converter/use_persistent_server", true)
+
+func get_config_path() -> String:
+	"""获取Python配置文件路径"""
+	return ProjectSettings.globalize_path("res://addons/py_excel_tool/src/config.ini")
+
+func get_server_log_path() -> String:
+	"""获取常驻转换服务的日志文件路径"""
+	return ProjectSettings.globalize_path("user://py_excel_tool_server.log")
+
+func get_process_log_path() -> String:
+	"""获取单次执行转换进程的日志文件路径"""
+	return ProjectSettings.globalize_path("user://py_excel_tool_convert.log")
+
 func get_base_resource_path() -> String:
 	"""获取基础资源路径配置"""
 	return ProjectSettings.get_setting("excel_converter/base_resource_path", "res://scripts")
 
 func update_python_config():
 	"""更新Python配置文件中的base_resource_path"""
-	var config_path = ProjectSettings.globalize_path("res://addons/py_excel_tool/src/config.ini")
+	var config_path = get_config_path()
 	var base_path = get_base_resource_path()
 	
 	# 读取配置文件
@@ -181,7 +437,6 @@ func update_python_config():
 		if line.strip_edges().begins_with("base_resource_path"):
 			updated_lines.append("base_resource_path = " + base_path)
 			base_path_updated = true
-			logger.log_info("更新base_resource_path为: " + base_path)
 		else:
 			updated_lines.append(line)
 	
@@ -197,13 +452,20 @@ func update_python_config():
 			updated_lines.insert(gdscript_section_index + 1, "base_resource_path = " + base_path)
 			logger.log_info("添加base_resource_path配置: " + base_path)
 	
+	# 内容未变化时不写回，避免修改时间变化导致常驻服务重新创建转换器
+	var updated_content = "\n".join(updated_lines)
+	if updated_content == content:
+		return
+	if base_path_updated:
+		logger.log_info("更新base_resource_path为: " + base_path)
+	
 	# 写回配置文件
 	file = FileAccess.open(config_path, FileAccess.WRITE)
 	if file == null:
 		logger.log_error("无法写入配置文件: " + config_path)
 		return
 	
-	file.store_string("\n".join(updated_lines))
+	file.store_string(updated_content)
 	file.close()
 
 # 日志记录类
@@ -16,6 +16,10 @@ var enable_gdscript_check: CheckBox
 # 设置相关
 var settings_dialog: AcceptDialog
 
+# 转换进度
+var total_files: int = 0
+var done_files: int = 0
+
 func _init():
 	name = "Excel转换器"
 	custom_minimum_size = Vector2(300, 400)
@@ -26,6 +30,8 @@ func _setup_converter():
 	if is_inside_tree():
 		var ExcelConverterCore = load("res://addons/py_excel_tool/excel_converter_core.gd")
 		converter = ExcelConverterCore.new()
+		converter.progress_event.connect(_on_progress_event)
+		converter.conversion_finished.connect(_on_conversion_finished)
 
 func _ready():
 	if Engine.is_editor_hint():
@@ -142,6 +148,7 @@ func _setup_ui():
 	# 进度条
 	progress_bar = ProgressBar.new()
 	progress_bar.visible = false
+	progress_bar.show_percentage = false
 	main_vbox.add_child(progress_bar)
 	
 	# 状态标签
@@ -171,6 +178,11 @@ func _on_convert_pressed():
 	
 	convert_button.disabled = true
 	progress_bar.visible = true
+	# 收到文件总数前显示为不确定进度
+	progress_bar.indeterminate = true
+	progress_bar.value = 0
+	total_files = 0
+	done_files = 0
 	status_label.text = "正在转换..."
 	
 	_add_log("开始Excel转换...")
@@ -178,20 +190,51 @@ func _on_convert_pressed():
 	var input_path = converter.get_input_path()
 	var output_path = converter.get_output_path()
 	
-	# 在线程中执行转换
-	var thread = Thread.new()
-	thread.start(_convert_thread.bind([input_path, output_path]))
+	# 在后台执行转换，进度通过progress_event信号实时更新
+	if not converter.start_conversion(input_path, output_path, enable_gdscript_check.button_pressed):
+		convert_button.disabled = false
+		progress_bar.visible = false
+		status_label.text = "已有转换正在进行"
 
-func _convert_thread(paths: Array):
-	"""转换线程函数"""
-	var input_path = paths[0]
-	var output_path = paths[1]
-	
-	var generate_gdscript = enable_gdscript_check.button_pressed
-	var success = converter.execute_conversion(input_path, output_path, generate_gdscript)
-	
-	# 回到主线程更新UI
-	call_deferred("_on_conversion_finished", success)
+func _on_progress_event(event: Dictionary):
+	"""转换进度事件"""
+	var file_name = str(event.get("file", "")).get_file()
+	match event.get("event", ""):
+		"batch_started":
+			total_files = int(event.get("total", 0))
+			progress_bar.indeterminate = false
+			progress_bar.max_value = max(total_files, 1)
+			progress_bar.value = 0
+		"file_started":
+			status_label.text = "正在转换: %s" % file_name
+		"rows":
+			status_label.text = "正在转换: %s [%s] %d行" % [file_name, event.get("sheet", ""), int(event.get("rows", 0))]
+		"sheet_done":
+			if event.get("cached", false):
+				_add_log("%s [%s] 未变化，复用缓存" % [file_name, event.get("sheet", "")])
+			else:
+				_add_log("%s [%s] 完成，%d行" % [file_name, event.get("sheet", ""), int(event.get("rows", 0))])
+		"file_finished":
+			_advance_progress()
+			_add_log("%s 完成，%d 个输出文件有变化" % [file_name, event.get("changed", []).size()])
+		"file_skipped":
+			_advance_progress()
+		"error":
+			_advance_progress()
+			_add_log("转换失败: %s - %s" % [file_name, event.get("message", "")])
+		"batch_finished":
+			status_label.text = "成功: %d, 失败: %d, 跳过: %d" % [int(event.get("success", 0)), int(event.get("failed", 0)), int(event.get("skipped", 0))]
+
+func _advance_progress():
+	"""完成一个文件，更新进度条"""
+	done_files += 1
+	if total_files > 0:
+		progress_bar.value = done_files
+		status_label.text = "已完成 %d/%d 个文件" % [done_files, total_files]
+
+func _exit_tree():
+	if converter:
+		converter.wait_for_conversion()
 
 func _on_conversion_finished(success: bool):
 	"""转换完成回调"""
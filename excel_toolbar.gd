@@ -16,17 +16,27 @@ func _ready():
 		converter = ExcelConverterCore.new()
 		_connect_signals()
 
+func _exit_tree():
+	if converter:
+		converter.wait_for_conversion()
+
 func _connect_signals():
 	"""连接信号"""
 	convert_button.pressed.connect(_on_convert_pressed)
 	quick_convert_button.pressed.connect(_on_quick_convert_pressed)
 	settings_button.pressed.connect(_on_settings_pressed)
+	converter.progress_event.connect(_on_progress_event)
 
 func _on_convert_pressed():
 	"""普通转换按钮"""
 	_update_status("开始转换...")
-	var success = converter.execute_conversion()
-	_update_status("转换完成" if success else "转换失败")
+	if converter.start_conversion():
+		convert_button.disabled = true
+		quick_convert_button.disabled = true
+		var success = await converter.conversion_finished
+		convert_button.disabled = false
+		quick_convert_button.disabled = false
+		_update_status("转换完成" if success else "转换失败")
 
 func _on_quick_convert_pressed():
 	"""快速转换按钮 - 使用默认路径"""
@@ -34,8 +44,13 @@ func _on_quick_convert_pressed():
 	var input_path = ProjectSettings.get_setting("excel_converter/input_path", "res://addons/py_excel_tool/data/")
 	var output_path = ProjectSettings.get_setting("excel_converter/output_path", "res://data/generated/")
 	
-	var success = converter.execute_conversion(input_path, output_path)
-	_update_status("快速转换完成" if success else "快速转换失败")
+	if converter.start_conversion(input_path, output_path):
+		convert_button.disabled = true
+		quick_convert_button.disabled = true
+		var success = await converter.conversion_finished
+		convert_button.disabled = false
+		quick_convert_button.disabled = false
+		_update_status("快速转换完成" if success else "快速转换失败")
 
 func _on_settings_pressed():
 	"""设置按钮"""
@@ -43,6 +58,11 @@ func _on_settings_pressed():
 	EditorInterface.get_base_control().add_child(settings_dialog)
 	settings_dialog.popup_centered(Vector2i(500, 350))
 
+func _on_progress_event(event: Dictionary):
+	"""在状态标签上显示正在转换的文件"""
+	if event.get("event", "") == "file_started":
+		status_label.text = "正在转换: %s" % str(event.get("file", "")).get_file()
+
 func _update_status(message: String):
 	"""更新状态"""
 	status_label.text = message
@@ -2,6 +2,8 @@
 extends EditorPlugin
 
 var dock_instance
+# 工具菜单使用的转换器，在后台转换期间保持引用
+var menu_converter
 
 func _enter_tree():
 	# 执行python_path迁移 (从项目设置迁移到用户配置)
@@ -34,6 +36,11 @@ func _exit_tree():
 		remove_control_from_docks(dock_instance)
 		dock_instance.queue_free()
 	
+	# 等待后台转换结束并关闭常驻转换服务
+	if menu_converter:
+		menu_converter.wait_for_conversion()
+	ExcelConverterCore.shutdown_server()
+	
 	# 注意: 通常不在插件卸载时移除项目设置，以保留用户配置
 	# 如果确实需要清理，可以取消注释下面的行
 	# _cleanup_project_settings()
@@ -41,14 +48,18 @@ func _exit_tree():
 	print("[Excel转换器] 插件已卸载")
 
 func _on_convert_excel():
-	"""直接执行Excel转换"""
-	var converter = ExcelConverterCore.new()
-	converter.execute_conversion()
+	"""直接执行Excel转换（后台进行，不阻塞编辑器）"""
+	_get_menu_converter().start_conversion()
 
 func _on_convert_excel_with_gdscript():
-	"""执行Excel转换并生成GDScript"""
-	var converter = ExcelConverterCore.new()
-	converter.execute_conversion("", "", true)
+	"""执行Excel转换并生成GDScript（后台进行，不阻塞编辑器）"""
+	_get_menu_converter().start_conversion("", "", true)
+
+func _get_menu_converter():
+	"""获取工具菜单使用的转换器"""
+	if menu_converter == null:
+		menu_converter = ExcelConverterCore.new()
+	return menu_converter
 
 func _on_open_settings():
 	"""打开设置对话框"""
@@ -66,6 +77,7 @@ func _setup_project_settings():
 	_add_project_setting("excel_converter/auto_convert", false, TYPE_BOOL, "文件改变时自动转换")
 	_add_project_setting("excel_converter/show_notifications", true, TYPE_BOOL, "显示转换完成通知")
 	_add_project_setting("excel_converter/verbose_logging", false, TYPE_BOOL, "详细日志输出")
+	_add_project_setting("excel_converter/use_persistent_server", true, TYPE_BOOL, "使用常驻Python转换服务 (避免每次转换重新启动Python)")
 	
 	# GDScript生成相关设置
 	_add_project_setting("excel_converter/enable_gdscript_generation", false, TYPE_BOOL, "启用GDScript脚本自动生成")
@@ -108,6 +120,7 @@ func _cleanup_project_settings():
 		"excel_converter/auto_convert",
 		"excel_converter/show_notifications",
 		"excel_converter/verbose_logging",
+		"excel_converter/use_persistent_server",
 		"excel_converter/enable_gdscript_generation",
 		"excel_converter/gdscript_output_path",
 		"excel_converter/base_resource_path"
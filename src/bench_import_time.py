@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行启动时间基准
+
+Godot插件会交互式地调用 excel_to_json.py，启动时间直接影响编辑器中的等待时间。
+该脚本检查两件事：
+1. 导入 excel_to_json / gdscript_generator 时不会加载pandas、numpy、openpyxl等重量级库；
+2. `excel_to_json.py --help` 的启动耗时不超过阈值。
+
+任一检查失败时以非零退出码结束，可直接用作CI门禁。
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+from typing import List, Dict, Any
+
+# 不允许在模块导入阶段加载的库
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'xlrd')
+
+# 需要保持轻量导入的模块
+CLI_MODULES = ('excel_to_json', 'gdscript_generator')
+
+SRC_DIR = Path(__file__).resolve().parent
+
+
+def find_heavy_imports(module_name: str) -> List[str]:
+    """
+    在全新的解释器中导入模块，返回被一并加载的重量级库
+
+    Args:
+        module_name (str): 模块名
+
+    Returns:
+        List[str]: 被加载的重量级库
+    """
+    code = (
+        f"import sys, json; import {module_name}; "
+        f"print(json.dumps([m for m in {list(HEAVY_MODULES)!r} if m in sys.modules]))"
+    )
+    output = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def measure_startup(runs: int) -> float:
+    """
+    测量 `excel_to_json.py --help` 的启动耗时
+
+    Args:
+        runs (int): 运行次数
+
+    Returns:
+        float: 最短耗时（毫秒），取最小值以减少系统噪声
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'excel_to_json.py', '--help'], cwd=SRC_DIR,
+                       capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def measure_interpreter(runs: int) -> float:
+    """测量空解释器的启动耗时（毫秒），作为对比基准"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='命令行启动时间基准')
+    parser.add_argument('--runs', '-n',
+                       type=int,
+                       default=5,
+                       help='每项测量的运行次数 (默认: 5)')
+    parser.add_argument('--max-overhead-ms',
+                       type=float,
+                       default=150.0,
+                       help='--help相对空解释器允许的最大额外耗时（毫秒） (默认: 150)')
+    parser.add_argument('--json',
+                       action='store_true',
+                       help='以JSON格式输出结果')
+
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {
+        'heavy_imports': {name: find_heavy_imports(name) for name in CLI_MODULES},
+        'interpreter_ms': measure_interpreter(args.runs),
+        'help_ms': measure_startup(args.runs),
+    }
+    results['overhead_ms'] = results['help_ms'] - results['interpreter_ms']
+
+    failures = []
+    for name, modules in results['heavy_imports'].items():
+        if modules:
+            failures.append(f"导入 {name} 时加载了重量级库: {', '.join(modules)}")
+    if results['overhead_ms'] > args.max_overhead_ms:
+        failures.append(f"--help 额外耗时 {results['overhead_ms']:.1f}ms 超过阈值 {args.max_overhead_ms:.1f}ms")
+    results['failures'] = failures
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f"空解释器启动: {results['interpreter_ms']:.1f}ms")
+        print(f"excel_to_json.py --help: {results['help_ms']:.1f}ms (额外 {results['overhead_ms']:.1f}ms)")
+        for failure in failures:
+            print(f"失败: {failure}")
+        if not failures:
+            print("通过")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换流程基准测试
+
+生成指定形状的合成工作簿（行数、列数、工作表数、类型分布、空值比例、中文字符串比例），
+分阶段测量 ExcelToJsonConverter / GDScriptGenerator 的耗时和内存增量：
+    read               读取Excel并生成记录
+    infer              推断字段类型
+    write_json         写出JSON
+    generate_gdscript  生成GDScript脚本
+    end_to_end         convert_single_file 完整流程
+
+内存增量是阶段执行期间常驻内存相对阶段开始时的最大增长，不包括前面阶段仍持有的数据；
+每个阶段的输入在不再需要时立即释放。
+
+结果可以输出为JSON文件；用 --compare 与基准结果比较，耗时退化超过阈值时以非零退出码结束，
+可直接用作CI门禁。
+"""
+
+import gc
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from excel_to_json import ExcelToJsonConverter, CONVERTER_VERSION, READER_BACKENDS
+from gdscript_generator import StructureTracker
+from run_report import PeakMemory
+
+logger = logging.getLogger(__name__)
+
+# 结果文件格式版本，格式不兼容时递增
+BENCHMARK_VERSION = 2
+
+SRC_DIR = Path(__file__).resolve().parent
+
+# 默认的列类型分布
+DEFAULT_TYPE_MIX = 'int:4,float:2,str:3,bool:1'
+
+COLUMN_TYPES = ('int', 'float', 'str', 'bool', 'mixed')
+
+# 生成中文字符串使用的字符
+CJK_CHARS = '火焰冰霜雷电剑盾弓箭法杖药水宝石金币经验等级攻击防御速度生命魔法暴击闪避装备道具任务奖励'
+
+STAGES = ('read', 'infer', 'write_json', 'generate_gdscript', 'end_to_end')
+
+
+def parse_type_mix(spec: str) -> Dict[str, int]:
+    """
+    解析列类型分布，如 "int:4,float:2,str:3,bool:1"
+
+    Args:
+        spec (str): 类型分布描述
+
+    Returns:
+        Dict[str, int]: 类型 -> 权重
+    """
+    type_mix = {}
+    for item in spec.split(','):
+        name, _, weight = item.strip().partition(':')
+        if name not in COLUMN_TYPES:
+            raise ValueError(f"未知的列类型: {name} (可选: {', '.join(COLUMN_TYPES)})")
+        type_mix[name] = int(weight or 1)
+    return type_mix
+
+
+def plan_columns(columns: int, type_mix: Dict[str, int]) -> List[str]:
+    """按权重为每一列分配类型"""
+    pattern = [name for name, weight in type_mix.items() for _ in range(weight)]
+    return [pattern[i % len(pattern)] for i in range(columns)]
+
+
+def make_value(column_type: str, row: int, rng: random.Random, cjk_ratio: float) -> Any:
+    """生成一个单元格的值"""
+    if column_type == 'mixed':
+        column_type = rng.choice(('int', 'float', 'str'))
+
+    if column_type == 'int':
+        return rng.randint(-1000, 100000)
+    if column_type == 'float':
+        return round(rng.uniform(-1000, 1000), 3)
+    if column_type == 'bool':
+        return rng.random() < 0.5
+    if rng.random() < cjk_ratio:
+        return ''.join(rng.choice(CJK_CHARS) for _ in range(rng.randint(2, 8)))
+    return f"item_{row}_{rng.randint(0, 9999)}"
+
+
+def generate_workbook(output_file: Path, rows: int, columns: int, sheets: int = 1,
+                      type_mix: Optional[Dict[str, int]] = None, null_density: float = 0.0,
+                      cjk_ratio: float = 0.3, seed: int = 0) -> Path:
+    """
+    生成合成工作簿
+
+    每个工作表第一列为递增的ID，其余列按类型分布生成。
+
+    Args:
+        output_file (Path): 输出的.xlsx文件路径
+        rows (int): 每个工作表的数据行数
+        columns (int): 每个工作表的列数（含ID列）
+        sheets (int): 工作表数
+        type_mix (Dict[str, int]): 列类型分布
+        null_density (float): 空单元格比例 (0~1)
+        cjk_ratio (float): 字符串中中文的比例 (0~1)
+        seed (int): 随机种子，相同参数生成相同的工作簿
+
+    Returns:
+        Path: 生成的文件路径
+    """
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    column_types = ['int'] + plan_columns(max(columns - 1, 0), type_mix or parse_type_mix(DEFAULT_TYPE_MIX))
+
+    workbook = Workbook(write_only=True)
+    for sheet_index in range(sheets):
+        worksheet = workbook.create_sheet(f"sheet_{sheet_index + 1}")
+        worksheet.append(['ID'] + [f"{column_type}_{i}" for i, column_type in enumerate(column_types[1:], 1)])
+
+        for row in range(rows):
+            values = [row + 1]
+            for column_type in column_types[1:]:
+                if null_density and rng.random() < null_density:
+                    values.append(None)
+                else:
+                    values.append(make_value(column_type, row, rng, cjk_ratio))
+            worksheet.append(values)
+
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    workbook.save(output_file)
+    return output_file
+
+
+def measure(stage: Callable[[], Any], memory: PeakMemory) -> Tuple[Any, Dict[str, Any]]:
+    """
+    执行一个阶段并测量耗时和内存增量
+
+    Args:
+        stage (Callable[[], Any]): 阶段函数
+        memory (PeakMemory): 内存增量测量器
+
+    Returns:
+        Tuple[Any, Dict[str, Any]]: (阶段返回值, {"seconds", "rss_increase_mb"})
+    """
+    gc.collect()
+    memory.start()
+    start = time.perf_counter()
+    result = stage()
+    seconds = time.perf_counter() - start
+    return result, {'seconds': seconds, 'rss_increase_mb': memory.increase_mb()}
+
+
+def run_benchmark(excel_file: Path, work_dir: Path, reader_backend: Optional[str] = None,
+                  config_path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    对一个工作簿执行一轮分阶段测量
+
+    Args:
+        excel_file (Path): Excel文件路径
+        work_dir (Path): 存放输出的临时目录
+        reader_backend (str): Excel读取后端
+        config_path (str): 配置文件路径
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 阶段名 -> 测量结果
+    """
+    converter = ExcelToJsonConverter(
+        excel_file.parent,
+        work_dir / 'json',
+        generate_gdscript=True,
+        gdscript_output_dir=str(work_dir / 'gdscript'),
+        incremental=False,
+        config_path=config_path or str(SRC_DIR / 'config.ini'),
+        reader_backend=reader_backend
+    )
+    memory = PeakMemory()
+    results = {}
+
+    def read():
+        return [(name, list(records)) for name, records in converter.iter_excel_to_json(excel_file)]
+
+    sheets, results['read'] = measure(read, memory)
+
+    def infer():
+        tracker = StructureTracker(converter.gdscript_generator)
+        for _, records in tracker.track(sheets):
+            for _ in records:
+                pass
+        return tracker.sheets_structure
+
+    structure, results['infer'] = measure(infer, memory)
+
+    json_file = work_dir / 'json' / f"{excel_file.stem}.json"
+    _, results['write_json'] = measure(lambda: converter.save_json_stream(sheets, json_file), memory)
+    results['write_json']['bytes'] = json_file.stat().st_size
+
+    # 释放不再需要的阶段输入，避免后续阶段在其之上测量
+    rows = sum(len(records) for _, records in sheets)
+    del sheets
+    _, results['generate_gdscript'] = measure(
+        lambda: converter.gdscript_generator.generate_scripts_from_structure(
+            structure, work_dir / 'gdscript', excel_file.stem),
+        memory
+    )
+
+    del structure
+    _, results['end_to_end'] = measure(lambda: converter.convert_single_file(excel_file), memory)
+    results['end_to_end']['rows'] = rows
+
+    return results
+
+
+def merge_runs(runs: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """合并多轮测量结果：耗时取最小值以减少噪声，内存取最大值"""
+    merged = {}
+    for stage in STAGES:
+        samples = [run[stage] for run in runs]
+        merged[stage] = dict(samples[0])
+        merged[stage]['seconds'] = min(sample['seconds'] for sample in samples)
+        increases = [sample['rss_increase_mb'] for sample in samples if sample['rss_increase_mb'] is not None]
+        merged[stage]['rss_increase_mb'] = max(increases) if increases else None
+    return merged
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float, min_seconds: float) -> List[str]:
+    """
+    与基准结果比较各阶段耗时
+
+    Args:
+        current (Dict[str, Any]): 本次结果
+        baseline (Dict[str, Any]): 基准结果
+        threshold (float): 允许的相对退化比例（如0.2表示慢20%）
+        min_seconds (float): 绝对差值低于该值时视为噪声
+
+    Returns:
+        List[str]: 退化描述，为空表示通过
+    """
+    regressions = []
+    for stage, result in current['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base:
+            continue
+        delta = result['seconds'] - base['seconds']
+        if delta > min_seconds and result['seconds'] > base['seconds'] * (1 + threshold):
+            regressions.append(
+                f"{stage}: {base['seconds']:.3f}s -> {result['seconds']:.3f}s "
+                f"(+{delta / base['seconds'] * 100 if base['seconds'] else float('inf'):.0f}%)"
+            )
+    return regressions
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='Excel转换流程基准测试')
+    parser.add_argument('--workbook',
+                       help='使用已有的工作簿，不生成合成工作簿')
+    parser.add_argument('--rows', '-r',
+                       type=int,
+                       default=10000,
+                       help='每个工作表的数据行数 (默认: 10000)')
+    parser.add_argument('--columns',
+                       type=int,
+                       default=12,
+                       help='每个工作表的列数 (默认: 12)')
+    parser.add_argument('--sheets',
+                       type=int,
+                       default=1,
+                       help='工作表数 (默认: 1)')
+    parser.add_argument('--type-mix',
+                       default=DEFAULT_TYPE_MIX,
+                       help=f'列类型分布，可选类型 {"/".join(COLUMN_TYPES)} (默认: {DEFAULT_TYPE_MIX})')
+    parser.add_argument('--null-density',
+                       type=float,
+                       default=0.05,
+                       help='空单元格比例 (默认: 0.05)')
+    parser.add_argument('--cjk-ratio',
+                       type=float,
+                       default=0.3,
+                       help='字符串中中文的比例 (默认: 0.3)')
+    parser.add_argument('--seed',
+                       type=int,
+                       default=0,
+                       help='随机种子 (默认: 0)')
+    parser.add_argument('--reader',
+                       choices=READER_BACKENDS,
+                       help='Excel读取后端 (默认: 使用配置文件中的reader_backend)')
+    parser.add_argument('--config', '-c',
+                       help='配置文件路径 (默认: 脚本目录下的config.ini)')
+    parser.add_argument('--repeat', '-n',
+                       type=int,
+                       default=3,
+                       help='测量轮数，耗时取最小值 (默认: 3)')
+    parser.add_argument('--output', '-o',
+                       help='把结果写入JSON文件')
+    parser.add_argument('--compare',
+                       help='与基准结果JSON文件比较，退化时以非零退出码结束')
+    parser.add_argument('--threshold',
+                       type=float,
+                       default=0.2,
+                       help='允许的耗时退化比例 (默认: 0.2)')
+    parser.add_argument('--min-seconds',
+                       type=float,
+                       default=0.05,
+                       help='低于该绝对差值（秒）的变化视为噪声 (默认: 0.05)')
+
+    args = parser.parse_args()
+
+    # 转换器的逐文件日志会干扰计时输出
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix='excel_benchmark_') as temp_dir:
+        temp_dir = Path(temp_dir)
+
+        if args.workbook:
+            excel_file = Path(args.workbook)
+            workbook_info = {'path': str(excel_file)}
+        else:
+            excel_file = generate_workbook(
+                temp_dir / 'input' / 'benchmark.xlsx',
+                rows=args.rows,
+                columns=args.columns,
+                sheets=args.sheets,
+                type_mix=parse_type_mix(args.type_mix),
+                null_density=args.null_density,
+                cjk_ratio=args.cjk_ratio,
+                seed=args.seed
+            )
+            workbook_info = {
+                'rows': args.rows,
+                'columns': args.columns,
+                'sheets': args.sheets,
+                'type_mix': args.type_mix,
+                'null_density': args.null_density,
+                'cjk_ratio': args.cjk_ratio,
+                'seed': args.seed,
+            }
+        workbook_info['size_bytes'] = excel_file.stat().st_size
+
+        # 预先导入读取库，避免把导入耗时计入第一轮
+        import pandas  # noqa: F401
+        import openpyxl  # noqa: F401
+
+        runs = []
+        for run_index in range(args.repeat):
+            runs.append(run_benchmark(excel_file, temp_dir / f"run_{run_index}", args.reader, args.config))
+
+    results = {
+        'benchmark_version': BENCHMARK_VERSION,
+        'converter_version': CONVERTER_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'reader_backend': args.reader,
+        'repeat': args.repeat,
+        'workbook': workbook_info,
+        'stages': merge_runs(runs),
+    }
+
+    for stage, result in results['stages'].items():
+        increase = f"{result['rss_increase_mb']:.1f}MB" if result['rss_increase_mb'] is not None else '-'
+        print(f"{stage:<18} {result['seconds']:>9.3f}s  内存增量 {increase}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold, args.min_seconds)
+        for regression in regressions:
+            print(f"退化: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("与基准相比没有退化")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Godot二进制列式数据输出工具
+
+把工作表数据按列编码为Godot `var_to_bytes` 格式，游戏中用
+`bytes_to_var(FileAccess.get_file_as_bytes(path))` 一次性解码，无需解析JSON文本。
+
+文件内容是一个Dictionary:
+    {
+        "format": "py_excel_tool.columnar",
+        "version": 1,
+        "sheets": {
+            "<表名>": {
+                "row_count": int,
+                "columns": PackedStringArray,   # 列名
+                "data": Array,                  # 与columns一一对应的列数据
+            }
+        }
+    }
+
+列数据的编码方式：无空值的整数列为 PackedInt64Array，无空值的数值列为 PackedFloat64Array，
+无空值的字符串列为 PackedStringArray，其余列（含空值、布尔、混合类型）为普通 Array。
+
+编码结果与Godot 4的 `var_to_bytes` 逐字节相同（如能用32位精确表示的浮点数按32位存储，
+PackedStringArray中的字符串带结尾的\\0）。
+"""
+
+import struct
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Optional
+
+from json_writer import atomic_open
+
+logger = logging.getLogger(__name__)
+
+BINARY_FORMAT = 'py_excel_tool.columnar'
+BINARY_VERSION = 1
+
+# Godot 4 Variant::Type
+TYPE_NIL = 0
+TYPE_BOOL = 1
+TYPE_INT = 2
+TYPE_FLOAT = 3
+TYPE_STRING = 4
+TYPE_DICTIONARY = 27
+TYPE_ARRAY = 28
+TYPE_PACKED_INT64_ARRAY = 31
+TYPE_PACKED_FLOAT64_ARRAY = 33
+TYPE_PACKED_STRING_ARRAY = 34
+
+# 编码标志：INT/FLOAT使用64位存储
+ENCODE_FLAG_64 = 1 << 16
+
+_INT32_MIN = -(1 << 31)
+_INT32_MAX = (1 << 31) - 1
+
+
+class EncodedVariant(bytes):
+    """已按var_to_bytes格式编码的值（如工作表缓存中的列数据），编码时原样输出"""
+
+
+class PackedInt64Array(list):
+    """标记为 PackedInt64Array 编码的列表"""
+
+
+class PackedFloat64Array(list):
+    """标记为 PackedFloat64Array 编码的列表"""
+
+
+class PackedStringArray(list):
+    """标记为 PackedStringArray 编码的列表"""
+
+
+def _encode_string(value: str, out: bytearray, terminated: bool = False) -> None:
+    """编码字符串内容：UTF-8长度 + 字节 + 4字节对齐填充；terminated时长度和字节包含结尾的\\0"""
+    data = value.encode('utf-8')
+    if terminated:
+        data += b'\0'
+    out += struct.pack('<I', len(data))
+    out += data
+    out += b'\0' * (-len(data) % 4)
+
+
+def _fits_float32(value: float) -> bool:
+    """判断浮点数能否用32位精确表示（与Godot编码FLOAT时的判断相同）"""
+    try:
+        return struct.unpack('<f', struct.pack('<f', value))[0] == value
+    except OverflowError:
+        return False
+
+
+def encode_variant(value: Any, out: bytearray) -> None:
+    """
+    按Godot var_to_bytes格式编码一个值
+
+    Args:
+        value (Any): None/bool/int/float/str/list/dict 或 Packed*Array
+        out (bytearray): 输出缓冲区
+    """
+    if value is None:
+        out += struct.pack('<I', TYPE_NIL)
+    elif isinstance(value, EncodedVariant):
+        out += value
+    elif isinstance(value, bool):
+        out += struct.pack('<Ii', TYPE_BOOL, int(value))
+    elif isinstance(value, int):
+        if _INT32_MIN <= value <= _INT32_MAX:
+            out += struct.pack('<Ii', TYPE_INT, value)
+        else:
+            out += struct.pack('<Iq', TYPE_INT | ENCODE_FLAG_64, value)
+    elif isinstance(value, float):
+        if _fits_float32(value):
+            out += struct.pack('<If', TYPE_FLOAT, value)
+        else:
+            out += struct.pack('<Id', TYPE_FLOAT | ENCODE_FLAG_64, value)
+    elif isinstance(value, str):
+        out += struct.pack('<I', TYPE_STRING)
+        _encode_string(value, out)
+    elif isinstance(value, PackedInt64Array):
+        out += struct.pack(f'<II{len(value)}q', TYPE_PACKED_INT64_ARRAY, len(value), *value)
+    elif isinstance(value, PackedFloat64Array):
+        out += struct.pack(f'<II{len(value)}d', TYPE_PACKED_FLOAT64_ARRAY, len(value), *value)
+    elif isinstance(value, PackedStringArray):
+        out += struct.pack('<II', TYPE_PACKED_STRING_ARRAY, len(value))
+        for item in value:
+            _encode_string(item, out, terminated=True)
+    elif isinstance(value, (list, tuple)):
+        out += struct.pack('<II', TYPE_ARRAY, len(value))
+        for item in value:
+            encode_variant(item, out)
+    elif isinstance(value, dict):
+        out += struct.pack('<II', TYPE_DICTIONARY, len(value))
+        for key, item in value.items():
+            encode_variant(key, out)
+            encode_variant(item, out)
+    else:
+        raise TypeError(f"无法编码为Godot二进制格式的值类型: {type(value).__name__}")
+
+
+def pack_column(values: List[Any]) -> List[Any]:
+    """
+    为一列选择最紧凑的编码方式
+
+    Args:
+        values (List[Any]): 列中的值
+
+    Returns:
+        List[Any]: Packed*Array 或普通列表
+    """
+    value_types = set(map(type, values))
+
+    if value_types == {int}:
+        if all(-(1 << 63) <= value < (1 << 63) for value in values):
+            return PackedInt64Array(values)
+    elif value_types and value_types <= {int, float}:
+        return PackedFloat64Array(float(value) for value in values)
+    elif value_types == {str}:
+        return PackedStringArray(values)
+
+    return values
+
+
+class ColumnarTableBuilder:
+    """在记录流经时按列收集数据，用于生成二进制列式文件"""
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, Any]] = {}
+
+    def track(self, sheets: Iterable[Tuple[str, Iterable[Dict[str, Any]]]]) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+        """
+        包装 (工作表名称, 记录迭代器) 序列，记录被消费时同步按列收集
+
+        Args:
+            sheets (Iterable[Tuple[str, Iterable[Dict[str, Any]]]]): 工作表序列
+
+        Yields:
+            Tuple[str, Iterator[Dict[str, Any]]]: 原样产出的工作表名称和记录
+        """
+        for sheet_name, records in sheets:
+            if sheet_name in self.tables:
+                # 已通过provide提供编码结果的表，无需收集
+                yield sheet_name, records
+            else:
+                yield sheet_name, self._collect(sheet_name, records)
+
+    def provide(self, sheet_name: str, encoded_table: bytes) -> None:
+        """
+        提供预先编码好的表数据（如来自工作表缓存）
+
+        Args:
+            sheet_name (str): 表名
+            encoded_table (bytes): encoded_table() 返回的编码结果
+        """
+        self.tables[sheet_name] = EncodedVariant(encoded_table)
+
+    def encoded_table(self, sheet_name: str) -> Optional[bytes]:
+        """
+        获取单个表的编码结果，用于缓存
+
+        Args:
+            sheet_name (str): 表名
+
+        Returns:
+            Optional[bytes]: 编码结果，表不存在时为None
+        """
+        table = self.tables.get(sheet_name)
+        if table is None:
+            return None
+        out = bytearray()
+        encode_variant(table, out)
+        return bytes(out)
+
+    def _collect(self, sheet_name: str, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """逐条产出记录并追加到列中"""
+        columns: Dict[Any, List[Any]] = {}
+        row_count = 0
+
+        for record in records:
+            if row_count == 0:
+                columns = {field_name: [] for field_name in record}
+            for field_name, values in columns.items():
+                values.append(record.get(field_name))
+            row_count += 1
+            yield record
+
+        self.tables[sheet_name] = {
+            'row_count': row_count,
+            'columns': PackedStringArray(str(field_name) for field_name in columns),
+            'data': [pack_column(values) for values in columns.values()],
+        }
+
+    def write(self, output_file: Path) -> None:
+        """
+        写出二进制文件
+
+        Args:
+            output_file (Path): 输出文件路径
+        """
+        out = bytearray()
+        encode_variant({
+            'format': BINARY_FORMAT,
+            'version': BINARY_VERSION,
+            'sheets': self.tables,
+        }, out)
+
+        with atomic_open(output_file, 'wb') as f:
+            f.write(out)
+
+        logger.info(f"成功保存二进制数据文件: {output_file}")
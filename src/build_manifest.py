@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建清单管理
+
+记录每个Excel文件的大小、修改时间、内容哈希、转换器/配置签名以及生成的输出文件，
+用于增量转换：未变化的工作簿直接跳过，已删除工作簿的过期输出会被清理。
+"""
+
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional
+from json_writer import atomic_open
+
+logger = logging.getLogger(__name__)
+
+# 清单文件格式版本，格式不兼容时递增
+MANIFEST_VERSION = 1
+
+# 默认清单文件名（保存在JSON输出目录中）
+MANIFEST_FILENAME = '.excel_to_json_manifest.json'
+
+
+def hash_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    计算文件内容的SHA-256哈希
+
+    Args:
+        file_path (Path): 文件路径
+        chunk_size (int): 每次读取的字节数
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_file(file_path: Path) -> Dict[str, Any]:
+    """
+    获取源文件的大小、修改时间和内容哈希
+
+    应在读取源文件之前调用：转换期间文件被重新保存时，清单记录的是转换所用的旧内容，
+    下次检查时发现不一致会重新转换。
+
+    Args:
+        file_path (Path): 文件路径
+
+    Returns:
+        Dict[str, Any]: {'size', 'mtime_ns', 'sha256'}
+    """
+    stat = Path(file_path).stat()
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': hash_file(file_path),
+    }
+
+
+class BuildManifest:
+    """增量构建清单类"""
+
+    def __init__(self, manifest_path: Path, build_signature: str):
+        """
+        初始化构建清单
+
+        Args:
+            manifest_path (Path): 清单文件路径
+            build_signature (str): 转换器/配置签名，签名变化时所有记录失效
+        """
+        self.manifest_path = Path(manifest_path)
+        self.build_signature = build_signature
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+
+        self.load()
+
+    @staticmethod
+    def source_key(source: Path) -> str:
+        """获取源文件在清单中的键"""
+        return str(Path(source).resolve())
+
+    def load(self) -> None:
+        """加载清单文件，文件缺失或损坏时从空清单开始"""
+        self.entries = {}
+        self.dirty = False
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            # 清单文件已被删除（如清理输出目录），之前加载的记录全部作废
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"构建清单 {self.manifest_path} 无法读取，将重新构建: {str(e)}")
+            return
+
+        if data.get('version') != MANIFEST_VERSION:
+            logger.info("构建清单版本不匹配，将重新构建")
+            return
+
+        self.entries = data.get('entries', {})
+
+    def save(self) -> None:
+        """保存清单文件（先写临时文件再原子替换）"""
+        if not self.dirty:
+            return
+
+        data = {
+            'version': MANIFEST_VERSION,
+            'entries': self.entries,
+        }
+
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_open(self.manifest_path) as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+        self.dirty = False
+
+    def is_up_to_date(self, source: Path) -> bool:
+        """
+        判断源文件的输出是否为最新
+
+        先比较大小和修改时间；若修改时间变化但大小相同，再比较内容哈希，
+        内容未变时仅刷新记录中的修改时间。
+
+        Args:
+            source (Path): Excel文件路径
+
+        Returns:
+            bool: 输出是否为最新
+        """
+        entry = self.entries.get(self.source_key(source))
+        if not entry or entry.get('signature') != self.build_signature:
+            return False
+
+        if not all(Path(output).exists() for output in entry.get('outputs', [])):
+            return False
+
+        stat = Path(source).stat()
+        if stat.st_size != entry.get('size'):
+            return False
+
+        if stat.st_mtime_ns == entry.get('mtime_ns'):
+            return True
+
+        # 修改时间变化（如重新保存、检出），用内容哈希确认
+        if hash_file(source) != entry.get('sha256'):
+            return False
+
+        entry['mtime_ns'] = stat.st_mtime_ns
+        self.dirty = True
+        return True
+
+    def record(self, source: Path, outputs: Iterable[Path], snapshot: Optional[Dict[str, Any]] = None) -> None:
+        """
+        记录一次成功的转换，并删除该源文件不再生成的旧输出
+
+        Args:
+            source (Path): Excel文件路径
+            outputs (Iterable[Path]): 本次生成的输出文件
+            snapshot (Dict[str, Any], optional): 转换开始前 snapshot_file 得到的源文件状态，
+                为None时使用源文件当前的状态
+        """
+        key = self.source_key(source)
+        new_outputs = [str(Path(output).resolve()) for output in outputs]
+
+        old_entry = self.entries.get(key)
+        if old_entry:
+            stale = set(old_entry.get('outputs', [])) - set(new_outputs)
+            self._remove_outputs(stale, exclude_key=key)
+
+        if snapshot is None:
+            snapshot = snapshot_file(source)
+        self.entries[key] = {
+            'size': snapshot['size'],
+            'mtime_ns': snapshot['mtime_ns'],
+            'sha256': snapshot['sha256'],
+            'signature': self.build_signature,
+            'outputs': new_outputs,
+        }
+        self.dirty = True
+
+    def prune(self, sources: Iterable[Path], input_dir: Optional[Path] = None) -> List[str]:
+        """
+        清理已删除源文件的记录及其输出文件
+
+        Args:
+            sources (Iterable[Path]): 当前存在的Excel文件
+            input_dir (Path): 仅清理位于该目录下的记录，为None时清理全部
+
+        Returns:
+            List[str]: 被删除的输出文件
+        """
+        live_keys = {self.source_key(source) for source in sources}
+        input_root = Path(input_dir).resolve() if input_dir else None
+
+        removed = []
+        for key in list(self.entries.keys()):
+            if key in live_keys or Path(key).exists():
+                continue
+            if input_root and Path(key).parent != input_root:
+                continue
+
+            entry = self.entries.pop(key)
+            self.dirty = True
+            removed.extend(self._remove_outputs(entry.get('outputs', []), exclude_key=key))
+            logger.info(f"源文件已删除，清理其输出: {key}")
+
+        return removed
+
+    def _remove_outputs(self, outputs: Iterable[str], exclude_key: str) -> List[str]:
+        """删除不再被其他记录引用的输出文件"""
+        still_owned = set()
+        for key, entry in self.entries.items():
+            if key != exclude_key:
+                still_owned.update(entry.get('outputs', []))
+
+        removed = []
+        for output in outputs:
+            if output in still_owned:
+                continue
+            try:
+                Path(output).unlink()
+                removed.append(output)
+                logger.info(f"删除过期输出文件: {output}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"删除过期输出文件 {output} 失败: {str(e)}")
+
+        return removed
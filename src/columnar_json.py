@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式JSON布局
+
+配置 [OUTPUT] json_layout = columnar（或命令行 --json-layout columnar）时，每个工作表写为按列存放的对象，
+列名只出现一次，而不是在每条记录中重复:
+
+    {
+        "<表名>": {
+            "row_count": 3,
+            "columns": ["ID", "name", "type"],
+            "data": [
+                [1, 2, 3],
+                ["铁剑", "木盾", "药水"],
+                {"values": ["weapon", "potion"], "codes": [0, 0, 1]}
+            ]
+        }
+    }
+
+重复值较多的字符串列（如类型、品质等枚举列）按字典编码：values为不重复的值（可含null），
+codes为每行的值在values中的下标。生成的加载器先把字典编码的列还原为数组，
+再按列创建数据项，与二进制列式文件(.bin)的加载方式相同。
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from json_writer import ColumnarSheet, RawJson
+
+# 可选的JSON布局
+JSON_LAYOUTS = ('records', 'columnar')
+
+# 不重复值的数量不超过行数的该比例时，字符串列按字典编码
+DICTIONARY_MAX_RATIO = 0.5
+
+
+def encode_column(values: List[Any], max_ratio: float = DICTIONARY_MAX_RATIO) -> Any:
+    """
+    为一列选择编码方式：低基数的字符串列按字典编码，其余列原样输出为数组
+
+    Args:
+        values (List[Any]): 列中的值
+        max_ratio (float): 不重复值数量与行数之比的上限
+
+    Returns:
+        Any: 值数组，或 {"values": [...], "codes": [...]} 字典编码
+    """
+    codes_by_value: Dict[Any, int] = {}
+    has_string = False
+    for value in values:
+        if value is None:
+            pass
+        elif isinstance(value, str):
+            has_string = True
+        else:
+            return values
+        codes_by_value.setdefault(value, len(codes_by_value))
+        if len(codes_by_value) > len(values) * max_ratio:
+            return values
+
+    if not has_string:
+        return values
+    return {
+        'values': list(codes_by_value),
+        'codes': [codes_by_value[value] for value in values],
+    }
+
+
+class ColumnarJsonBuilder:
+    """把交给JSON写入器的记录转换为列式布局"""
+
+    def __init__(self, max_ratio: float = DICTIONARY_MAX_RATIO):
+        """
+        初始化转换器
+
+        Args:
+            max_ratio (float): 字符串列按字典编码时，不重复值数量与行数之比的上限
+        """
+        self.max_ratio = max_ratio
+
+    def track(self, sheets: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+        """
+        包装交给JSON写入器的工作表序列，把每个工作表的记录收集为列
+
+        Args:
+            sheets (Iterable[Tuple[str, Any]]): (工作表名称, 记录迭代器) 序列
+
+        Yields:
+            Tuple[str, Any]: (工作表名称, ColumnarSheet)；缓存的JSON片段和非列表值原样产出
+        """
+        for sheet_name, records in sheets:
+            if isinstance(records, (RawJson, dict, str)) or not hasattr(records, '__iter__'):
+                yield sheet_name, records
+            else:
+                yield sheet_name, self.build(records)
+
+    def build(self, records: Iterable[Dict[str, Any]]) -> ColumnarSheet:
+        """
+        把一个工作表的记录转换为列式布局
+
+        Args:
+            records (Iterable[Dict[str, Any]]): 记录
+
+        Returns:
+            ColumnarSheet: 列式工作表数据
+        """
+        columns: Dict[Any, List[Any]] = {}
+        row_count = 0
+        for record in records:
+            for field_name in record:
+                if field_name not in columns:
+                    # 之前的行没有该字段，补null
+                    columns[field_name] = [None] * row_count
+            for field_name, values in columns.items():
+                values.append(record.get(field_name))
+            row_count += 1
+
+        return ColumnarSheet(
+            row_count=row_count,
+            columns=[str(field_name) for field_name in columns],
+            data=[encode_column(values, self.max_ratio) for values in columns.values()],
+        )
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel转换常驻服务
+
+以 `excel_to_json.py --serve` 启动，通过标准输入/输出使用逐行JSON-RPC 2.0协议接收转换请求。
+进程在多次转换之间保持常驻，pandas/openpyxl只导入一次，转换器（含构建清单和GDScript生成器）
+按参数缓存复用，最多保留 MAX_CACHED_CONVERTERS 个，超出时淘汰最久未使用的转换器。转换过程中的日志以 "log" 通知、进度事件（见progress.py）以 "progress" 通知
+实时推送给客户端。
+使用 `--log-file` 时标准错误输出重定向到该文件，客户端无需读取stderr管道。
+
+请求示例:
+    {"jsonrpc": "2.0", "id": 1, "method": "convert",
+     "params": {"input": "...", "output": "...", "generate_gdscript": true}}
+
+支持的方法:
+    ping      - 检查服务是否存活
+    convert   - 执行转换，返回 {"success": N, "failed": M, "skipped": K}
+    shutdown  - 退出服务
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, IO, Tuple, List
+
+from excel_to_json import ExcelToJsonConverter
+from progress import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# 缓存的转换器数量上限
+MAX_CACHED_CONVERTERS = 8
+
+
+class InvalidParamsError(ValueError):
+    """请求参数无效"""
+
+
+class _NotificationHandler(logging.Handler):
+    """把日志记录转发为JSON-RPC通知的处理器"""
+
+    def __init__(self, server: 'ConverterServer'):
+        super().__init__()
+        self.server = server
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.server.notify('log', {
+                'level': record.levelname,
+                'message': record.getMessage(),
+            })
+        except Exception:
+            self.handleError(record)
+
+
+class ConverterServer:
+    """Excel转换常驻服务类"""
+
+    def __init__(self, input_stream: Optional[IO[str]] = None, output_stream: Optional[IO[str]] = None):
+        """
+        初始化服务
+
+        Args:
+            input_stream (IO[str]): 请求输入流，默认为标准输入
+            output_stream (IO[str]): 响应输出流，默认为标准输出
+        """
+        self.input_stream = input_stream or sys.stdin
+        self.output_stream = output_stream or sys.stdout
+        self.running = False
+
+        # 按转换参数缓存的转换器及创建时配置文件内容的哈希，按最近使用排序
+        self.converters: 'OrderedDict[str, Tuple[str, ExcelToJsonConverter]]' = OrderedDict()
+
+        self.methods = {
+            'ping': self.handle_ping,
+            'convert': self.handle_convert,
+            'shutdown': self.handle_shutdown,
+        }
+
+    def serve_forever(self) -> None:
+        """逐行读取请求并处理，直到收到shutdown请求或输入流关闭"""
+        self._setup_streams()
+        self.warm_up()
+
+        self.running = True
+        self.notify('ready', {'pid': os.getpid()})
+
+        for line in self.input_stream:
+            line = line.strip()
+            if not line:
+                continue
+
+            response = self.handle_line(line)
+            if response is not None:
+                self.send(response)
+
+            if not self.running:
+                break
+
+    def _setup_streams(self) -> None:
+        """日志改为通过通知输出，标准输出只用于协议消息"""
+        for stream in (self.input_stream, self.output_stream):
+            if hasattr(stream, 'reconfigure'):
+                stream.reconfigure(encoding='utf-8')
+
+        # 客户端不一定读取stderr，避免管道写满导致服务阻塞
+        root_logger = logging.getLogger()
+        root_logger.handlers = [_NotificationHandler(self)]
+        # 依赖库的警告同样以日志通知推送，而不是直接写入stderr；
+        # 其余写入stderr的内容可用 --log-file 重定向到日志文件（见 progress.redirect_stderr）
+        logging.captureWarnings(True)
+
+    def warm_up(self) -> None:
+        """预先导入耗时的依赖库"""
+        import pandas  # noqa: F401
+        import openpyxl  # noqa: F401
+
+    def send(self, message: Dict[str, Any]) -> None:
+        """发送一条协议消息"""
+        self.output_stream.write(json.dumps(message, ensure_ascii=False) + '\n')
+        self.output_stream.flush()
+
+    def notify(self, method: str, params: Dict[str, Any]) -> None:
+        """发送通知（无需响应的消息）"""
+        self.send({'jsonrpc': '2.0', 'method': method, 'params': params})
+
+    def handle_line(self, line: str) -> Optional[Dict[str, Any]]:
+        """
+        处理一行请求
+
+        Args:
+            line (str): JSON-RPC请求文本
+
+        Returns:
+            Optional[Dict[str, Any]]: 响应消息，通知请求返回None
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return self._error(None, PARSE_ERROR, f"无法解析请求: {str(e)}")
+
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return self._error(request.get('id') if isinstance(request, dict) else None,
+                               INVALID_REQUEST, "无效的请求")
+
+        request_id = request.get('id')
+        method = self.methods.get(request['method'])
+        if method is None:
+            return self._error(request_id, METHOD_NOT_FOUND, f"未知的方法: {request['method']}")
+
+        params = request.get('params') or {}
+        if not isinstance(params, dict):
+            return self._error(request_id, INVALID_PARAMS, "params必须是对象")
+
+        try:
+            result = method(params)
+        except InvalidParamsError as e:
+            return self._error(request_id, INVALID_PARAMS, str(e))
+        except Exception as e:
+            logger.error(f"处理请求 {request['method']} 失败: {str(e)}")
+            return self._error(request_id, INTERNAL_ERROR, str(e))
+
+        if request_id is None:
+            return None
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    def _error(self, request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        """构造错误响应"""
+        return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+    def handle_ping(self, params: Dict[str, Any]) -> str:
+        """检查服务是否存活"""
+        return 'pong'
+
+    def handle_shutdown(self, params: Dict[str, Any]) -> bool:
+        """退出服务"""
+        self.running = False
+        return True
+
+    def handle_convert(self, params: Dict[str, Any]) -> Dict[str, int]:
+        """
+        执行转换
+
+        Args:
+            params (Dict[str, Any]): 与命令行参数对应的转换参数
+                (input, output, file, generate_gdscript, gdscript_output,
+                 config, reader, binary, shard, shard_rows, pipeline, output_profile,
+                 json_layout, sheets, jobs, force, incremental)
+
+        Returns:
+            Dict[str, int]: 转换统计
+        """
+        converter = self.get_converter(params)
+        # 缓存的转换器被多个请求共享，force只作用于本次转换
+        force = bool(params.get('force', False))
+
+        file_path = params.get('file')
+        if not file_path:
+            return converter.convert_all_files(force)
+
+        file_path = Path(file_path)
+        if not file_path.exists() or file_path.suffix.lower() not in converter.supported_extensions:
+            raise ValueError(f"文件不存在或格式不支持: {file_path}")
+
+        try:
+            converter.convert_single_file(file_path, force)
+            return {'success': 1, 'failed': 0, 'skipped': 0}
+        except Exception:
+            # 错误已在convert_single_file中记录
+            return {'success': 0, 'failed': 1, 'skipped': 0}
+        finally:
+            converter.save_manifest()
+
+    def get_converter(self, params: Dict[str, Any]) -> ExcelToJsonConverter:
+        """
+        获取（或创建并缓存）与参数对应的转换器
+
+        配置文件内容变化后会重新创建转换器，以读取新的配置；仅修改时间变化（如重新保存）时继续复用。
+
+        Args:
+            params (Dict[str, Any]): 转换参数
+
+        Returns:
+            ExcelToJsonConverter: 转换器实例
+        """
+        generate_gdscript = bool(params.get('generate_gdscript', False))
+        options = {
+            'input_dir': params.get('input', './excel_files'),
+            'output_dir': params.get('output', './json_files'),
+            'generate_gdscript': generate_gdscript,
+            'gdscript_output_dir': params.get('gdscript_output', './gdscript_output') if generate_gdscript else None,
+            'incremental': bool(params.get('incremental', True)),
+            'jobs': int(params.get('jobs', 1)),
+            'config_path': params.get('config', 'config.ini'),
+            'reader_backend': params.get('reader'),
+            'binary_output': params.get('binary'),
+            'shard_output': params.get('shard'),
+            'shard_rows': params.get('shard_rows'),
+            'pipeline_writes': params.get('pipeline'),
+            'output_profile': params.get('output_profile'),
+            'json_layout': params.get('json_layout'),
+            'sheets': self._get_sheets(params),
+        }
+
+        key = json.dumps(options, sort_keys=True, ensure_ascii=False)
+        config_path = Path(options['config_path'])
+        config_hash = hashlib.sha1(config_path.read_bytes()).hexdigest() if config_path.exists() else ''
+
+        cached = self.converters.get(key)
+        if cached is not None and cached[0] == config_hash:
+            self.converters.move_to_end(key)
+            converter = cached[1]
+            # 清单文件可能已被其他参数的转换器或命令行更新或删除，重新读取（删除时清空记录）
+            if converter.manifest is not None:
+                converter.manifest.load()
+            return converter
+
+        progress = ProgressReporter(lambda event: self.notify('progress', event))
+        converter = ExcelToJsonConverter(**options, progress=progress)
+        self.converters[key] = (config_hash, converter)
+        self.converters.move_to_end(key)
+        while len(self.converters) > MAX_CACHED_CONVERTERS:
+            self.converters.popitem(last=False)
+        return converter
+
+    def _get_sheets(self, params: Dict[str, Any]) -> Optional[List[str]]:
+        """
+        获取并检查工作表筛选参数
+
+        Args:
+            params (Dict[str, Any]): 转换参数
+
+        Returns:
+            Optional[List[str]]: 工作表名列表，未指定时为None
+        """
+        sheets = params.get('sheets')
+        if sheets is None:
+            return None
+        if not isinstance(sheets, list) or not all(isinstance(name, str) for name in sheets):
+            raise InvalidParamsError("sheets必须是工作表名字符串的列表")
+        return [name.strip() for name in sheets if name.strip()] or None
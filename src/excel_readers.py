@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel流式读取工具
+
+逐行读取工作表，直接产出记录字典，不构建DataFrame。
+输出与 pandas.read_excel(header=0) 再按 dataframe_records 转换为记录的结果保持一致：
+表头处理（Unnamed列、重复列名）、空值识别、数值/布尔列的类型转换规则都与pandas相同。
+
+读取引擎按名称注册在 STREAM_READERS 中，共用同一套行处理逻辑，输出的记录完全相同:
+    openpyxl  openpyxl只读模式 (.xlsx/.xlsm)
+    xlrd      xlrd按需加载工作表 (旧版.xls)
+    calamine  python-calamine (Rust实现，最快；可选依赖，需要 pip install python-calamine)
+"""
+
+import re
+import pickle
+import logging
+import tempfile
+import importlib.util
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Optional, Sequence, Type, Union
+
+logger = logging.getLogger(__name__)
+
+# pandas默认识别为空值的字符串
+NA_STRINGS = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+    'n/a', 'nan', 'null',
+})
+
+# Excel错误值，pandas读取为空值
+ERROR_STRINGS = frozenset({
+    '#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A',
+})
+
+# pandas默认识别为布尔值的字符串
+TRUE_STRINGS = frozenset({'True', 'TRUE', 'true'})
+FALSE_STRINGS = frozenset({'False', 'FALSE', 'false'})
+
+_INT_PATTERN = re.compile(r'^\s*[+-]?\d+\s*$')
+
+# 浮点数能精确表示的最大整数，超出范围的可空整数列保持为浮点数
+MAX_SAFE_INTEGER = 2 ** 53
+
+# 单元格空值标记
+_NA = None
+
+
+def _convert_cell(value: Any) -> Any:
+    """
+    转换单元格值，规则与pandas的openpyxl读取器一致
+
+    空单元格和错误值返回 None，整数值的浮点数转换为int。
+    """
+    if value is None:
+        return _NA
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        return value
+    if isinstance(value, str) and (value in NA_STRINGS or value in ERROR_STRINGS):
+        return _NA
+    return value
+
+
+def _is_safe_integer(number: Any) -> bool:
+    """数值是否为浮点数能精确表示的整数"""
+    if isinstance(number, float) and not number.is_integer():
+        return False
+    return abs(number) <= MAX_SAFE_INTEGER
+
+
+def dataframe_records(df: Any) -> Iterator[Dict[str, Any]]:
+    """
+    把DataFrame逐行转换为记录字典，空值(NaN/NaT/None)转换为None
+
+    按列转换为Python值列表，只有含空值的列才逐值替换，不复制整个DataFrame；
+    记录在迭代时才逐条构建。pandas用NaN表示空值时会把整数列提升为浮点列，
+    含空值的浮点列如果其余值都是整数，转换回int。
+
+    Args:
+        df (pandas.DataFrame): 原始DataFrame
+
+    Returns:
+        Iterator[Dict[str, Any]]: 记录迭代器
+    """
+    field_names = list(df.columns)
+    columns = [dataframe_column_values(df.iloc[:, position]) for position in range(len(field_names))]
+    return (dict(zip(field_names, row)) for row in zip(*columns))
+
+
+def dataframe_column_values(column: Any) -> List[Any]:
+    """
+    把DataFrame的一列转换为Python值列表，空值转换为None
+
+    Args:
+        column (pandas.Series): 列数据
+
+    Returns:
+        List[Any]: 值列表
+    """
+    mask = column.isna()
+    if not mask.any():
+        return column.tolist()
+
+    values = column.tolist()
+    missing = mask.tolist()
+    if column.dtype.kind == 'f':
+        present = column[~mask]
+        if ((present % 1 == 0) & (present.abs() <= MAX_SAFE_INTEGER)).all():
+            # 可空整数列
+            return [None if is_missing else int(value) for value, is_missing in zip(values, missing)]
+    return [None if is_missing else value for value, is_missing in zip(values, missing)]
+
+
+def _convert_header_cell(value: Any) -> Any:
+    """转换表头单元格值，表头中只有空单元格视为空值"""
+    if value is None or value == '':
+        return _NA
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _parse_number(value: Any) -> Optional[Any]:
+    """
+    尝试把值解析为数值
+
+    Returns:
+        Optional[Any]: int/float/bool，无法解析时返回None
+    """
+    if isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if _INT_PATTERN.match(value):
+            return int(value)
+        if '_' in value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+class _ColumnStats:
+    """单列的类型统计，用于决定pandas会推断出的列类型"""
+
+    __slots__ = ('numeric', 'has_float', 'integral', 'all_bool', 'boolish', 'has_na', 'count')
+
+    def __init__(self):
+        self.numeric = True
+        self.has_float = False
+        self.integral = True
+        self.all_bool = True
+        self.boolish = True
+        self.has_na = False
+        self.count = 0
+
+    def observe(self, value: Any) -> None:
+        """统计一个非空值"""
+        self.count += 1
+
+        if isinstance(value, bool):
+            return
+
+        self.all_bool = False
+        if self.boolish and not (isinstance(value, str) and (value in TRUE_STRINGS or value in FALSE_STRINGS)):
+            self.boolish = False
+
+        if self.numeric:
+            number = _parse_number(value)
+            if number is None:
+                self.numeric = False
+            else:
+                if isinstance(number, float):
+                    self.has_float = True
+                if self.integral and not _is_safe_integer(number):
+                    self.integral = False
+
+    def build_converter(self):
+        """
+        根据统计结果生成该列的值转换函数
+
+        Returns:
+            Callable[[Any], Any]: 转换函数，空值转换为None
+        """
+        if self.numeric:
+            if self.count == 0:
+                return lambda value: None
+            if self.has_na and self.integral:
+                # 可空整数列保持为整数，与dataframe_records一致
+                return lambda value: None if value is _NA else int(_parse_number(value))
+            if self.has_na or self.has_float:
+                return lambda value: None if value is _NA else float(_parse_number(value))
+            if self.all_bool:
+                return lambda value: value
+            return lambda value: int(_parse_number(value))
+
+        if self.boolish:
+            return lambda value: None if value is _NA else (value if isinstance(value, bool) else value in TRUE_STRINGS)
+
+        return lambda value: value
+
+
+def _make_column_names(header: List[Any]) -> List[Any]:
+    """
+    生成列名：空表头命名为 "Unnamed: i"，重复列名追加 ".1"、".2" 后缀
+
+    与pandas的规则一致：先处理有表头的列，再处理空表头的列；后缀跳过表头中已有的列名。
+    """
+    names = [f"Unnamed: {i}" if value is _NA else value for i, value in enumerate(header)]
+    unnamed = [i for i, value in enumerate(header) if value is _NA]
+    named = [i for i, value in enumerate(header) if value is not _NA]
+
+    counts: Dict[Any, int] = {}
+    for i in named + unnamed:
+        name = original = names[i]
+        cur_count = counts.get(name, 0)
+        while cur_count > 0:
+            counts[original] = cur_count + 1
+            name = f"{original}.{cur_count}"
+            cur_count = cur_count + 1 if name in names else counts.get(name, 0)
+        names[i] = name
+        counts[name] = cur_count + 1
+
+    return names
+
+
+class RowStreamReader:
+    """
+    流式工作表读取器基类
+
+    子类负责打开工作簿并逐行产出原始单元格值（空单元格为None），
+    表头处理和列类型转换由基类完成，因此所有读取引擎的输出相同。
+    """
+
+    # 引擎名称
+    name = ''
+    # 依赖的模块，未安装时引擎不可用
+    module = ''
+    # 提供该模块的安装包名
+    package = ''
+    # 支持的文件扩展名
+    extensions: frozenset = frozenset()
+
+    def __init__(self, excel_file: Path):
+        """
+        初始化读取器
+
+        Args:
+            excel_file (Path): Excel文件路径
+        """
+        self.excel_file = Path(excel_file)
+
+    @classmethod
+    def available(cls) -> bool:
+        """依赖的模块是否已安装"""
+        return importlib.util.find_spec(cls.module) is not None
+
+    @classmethod
+    def supports(cls, excel_file: Path) -> bool:
+        """是否支持该文件格式"""
+        return Path(excel_file).suffix.lower() in cls.extensions
+
+    def sheet_names(self) -> List[str]:
+        """获取工作簿中的工作表名称（按工作簿中的顺序）"""
+        workbook = self._open_workbook()
+        try:
+            return list(self._workbook_sheet_names(workbook))
+        finally:
+            self._close_workbook(workbook)
+
+    def iter_sheets(self, sheet_name: Union[str, List[str]] = "") -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+        """
+        逐个工作表产出记录迭代器
+
+        每个工作表的记录迭代器必须在请求下一个工作表之前消费完毕。
+
+        Args:
+            sheet_name (Union[str, List[str]]): 工作表名称或名称列表，为空时读取所有工作表
+
+        Yields:
+            Tuple[str, Iterator[Dict[str, Any]]]: (工作表名称, 记录迭代器)
+        """
+        workbook = self._open_workbook()
+        try:
+            if isinstance(sheet_name, list):
+                sheet_names = sheet_name
+            else:
+                sheet_names = [sheet_name] if sheet_name else self._workbook_sheet_names(workbook)
+            for name in sheet_names:
+                yield name, self._iter_records(self._iter_rows(workbook, name))
+        finally:
+            self._close_workbook(workbook)
+
+    def _open_workbook(self) -> Any:
+        """打开工作簿"""
+        raise NotImplementedError
+
+    def _close_workbook(self, workbook: Any) -> None:
+        """关闭工作簿"""
+
+    def _workbook_sheet_names(self, workbook: Any) -> List[str]:
+        """获取工作簿中的工作表名称"""
+        raise NotImplementedError
+
+    def _iter_rows(self, workbook: Any, name: str) -> Iterable[Sequence[Any]]:
+        """逐行产出工作表的原始单元格值，从第一行第一列开始，空单元格为None"""
+        raise NotImplementedError
+
+    def _iter_records(self, rows: Iterable[Sequence[Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        读取单个工作表的记录
+
+        第一遍扫描时统计每列的类型并把原始行暂存到临时文件，
+        第二遍从临时文件读回并按列类型转换，内存占用与行数无关。
+        """
+        with tempfile.TemporaryFile() as spool:
+            header, row_count, stats, width = self._scan(rows, spool)
+            if header is None or row_count == 0:
+                return
+
+            columns = _make_column_names(header + [_NA] * (width - len(header)))
+            converters = [column.build_converter() for column in stats]
+            padding = (_NA,) * width
+
+            spool.seek(0)
+            for _ in range(row_count):
+                row = pickle.load(spool)
+                if len(row) < width:
+                    row = row + padding[len(row):]
+                yield dict(zip(columns, [convert(value) for convert, value in zip(converters, row)]))
+
+    def _scan(self, rows: Iterable[Sequence[Any]], spool) -> Tuple[Optional[List[Any]], int, List[_ColumnStats], int]:
+        """
+        第一遍扫描：读取表头，统计列类型，暂存数据行
+
+        Returns:
+            Tuple: (表头, 有效数据行数, 列统计, 列数)
+        """
+        header = None
+        stats: List[_ColumnStats] = []
+        width = 0
+        row_index = 0
+        last_data_row = 0
+        min_data_width = None
+        pending_blank = False
+        blank_in_middle = False
+
+        for raw_row in rows:
+            if header is None:
+                header = [_convert_header_cell(value) for value in raw_row]
+                while header and header[-1] is _NA:
+                    header.pop()
+                width = len(header)
+                continue
+
+            row = [_convert_cell(value) for value in raw_row]
+            while row and row[-1] is _NA:
+                row.pop()
+
+            row_index += 1
+            pickle.dump(tuple(row), spool, pickle.HIGHEST_PROTOCOL)
+
+            if not row:
+                pending_blank = True
+                continue
+
+            if pending_blank:
+                blank_in_middle = True
+                pending_blank = False
+            last_data_row = row_index
+
+            if len(row) > width:
+                width = len(row)
+            if len(stats) < len(row):
+                stats.extend(_ColumnStats() for _ in range(len(row) - len(stats)))
+            if min_data_width is None or len(row) < min_data_width:
+                min_data_width = len(row)
+
+            for column, value in zip(stats, row):
+                if value is _NA:
+                    column.has_na = True
+                else:
+                    column.observe(value)
+
+        if header is None:
+            return None, 0, [], 0
+
+        # 补齐列统计：短行、空行在pandas中会填充为空值
+        stats.extend(_ColumnStats() for _ in range(width - len(stats)))
+        for i, column in enumerate(stats):
+            if blank_in_middle or min_data_width is None or i >= min_data_width:
+                column.has_na = True
+
+        return header, last_data_row, stats, width
+
+
+class OpenpyxlStreamReader(RowStreamReader):
+    """基于openpyxl只读模式的流式工作表读取器"""
+
+    name = 'openpyxl'
+    module = 'openpyxl'
+    package = 'openpyxl'
+    extensions = frozenset({'.xlsx', '.xlsm'})
+
+    def _open_workbook(self) -> Any:
+        from openpyxl import load_workbook
+        return load_workbook(self.excel_file, read_only=True, data_only=True, keep_links=False)
+
+    def _close_workbook(self, workbook: Any) -> None:
+        workbook.close()
+
+    def _workbook_sheet_names(self, workbook: Any) -> List[str]:
+        return workbook.sheetnames
+
+    def _iter_rows(self, workbook: Any, name: str) -> Iterable[Sequence[Any]]:
+        worksheet = workbook[name]
+        if hasattr(worksheet, 'reset_dimensions'):
+            worksheet.reset_dimensions()
+        return worksheet.iter_rows(values_only=True)
+
+
+class XlrdStreamReader(RowStreamReader):
+    """基于xlrd的旧版.xls读取器，按需加载工作表，读完即释放"""
+
+    name = 'xlrd'
+    module = 'xlrd'
+    package = 'xlrd'
+    extensions = frozenset({'.xls'})
+
+    def _open_workbook(self) -> Any:
+        import xlrd
+        return xlrd.open_workbook(str(self.excel_file), on_demand=True)
+
+    def _close_workbook(self, workbook: Any) -> None:
+        workbook.release_resources()
+
+    def _workbook_sheet_names(self, workbook: Any) -> List[str]:
+        return workbook.sheet_names()
+
+    def _iter_rows(self, workbook: Any, name: str) -> Iterator[Sequence[Any]]:
+        from xlrd import XL_CELL_TEXT, XL_CELL_NUMBER, XL_CELL_DATE, XL_CELL_BOOLEAN
+
+        sheet = workbook.sheet_by_name(name)
+        try:
+            for row_index in range(sheet.nrows):
+                row = []
+                for cell_type, value in zip(sheet.row_types(row_index), sheet.row_values(row_index)):
+                    if cell_type == XL_CELL_TEXT or cell_type == XL_CELL_NUMBER:
+                        row.append(value)
+                    elif cell_type == XL_CELL_DATE:
+                        row.append(self._convert_date(value, workbook.datemode))
+                    elif cell_type == XL_CELL_BOOLEAN:
+                        row.append(bool(value))
+                    else:
+                        # 空单元格和错误值
+                        row.append(None)
+                yield row
+        finally:
+            workbook.unload_sheet(name)
+
+    @staticmethod
+    def _convert_date(value: float, datemode: int) -> Any:
+        """转换日期单元格，规则与pandas的xlrd读取器一致：只有时间的值转换为time"""
+        from xlrd import xldate
+
+        try:
+            result = xldate.xldate_as_datetime(value, datemode)
+        except OverflowError:
+            return value
+        epoch_day = (1904, 1, 1) if datemode else (1899, 12, 31)
+        if result.timetuple()[0:3] == epoch_day:
+            return time(result.hour, result.minute, result.second, result.microsecond)
+        return result
+
+
+class CalamineStreamReader(RowStreamReader):
+    """基于python-calamine（Rust实现）的读取器，支持.xlsx/.xlsm/.xlsb/.xls/.ods"""
+
+    name = 'calamine'
+    module = 'python_calamine'
+    package = 'python-calamine'
+    extensions = frozenset({'.xlsx', '.xlsm', '.xlsb', '.xls', '.ods'})
+
+    def _open_workbook(self) -> Any:
+        from python_calamine import CalamineWorkbook
+        return CalamineWorkbook.from_path(str(self.excel_file))
+
+    def _close_workbook(self, workbook: Any) -> None:
+        if hasattr(workbook, 'close'):
+            workbook.close()
+
+    def _workbook_sheet_names(self, workbook: Any) -> List[str]:
+        return workbook.sheet_names
+
+    def _iter_rows(self, workbook: Any, name: str) -> Iterator[Sequence[Any]]:
+        sheet = workbook.get_sheet_by_name(name)
+        # 保留左上角的空白区域，使列与其他引擎对齐
+        for raw_row in sheet.to_python(skip_empty_area=False):
+            yield [self._convert_value(value) for value in raw_row]
+
+    @staticmethod
+    def _convert_value(value: Any) -> Any:
+        """calamine用空字符串表示空单元格，纯日期值统一为datetime（与openpyxl一致）"""
+        if value == '':
+            return None
+        if isinstance(value, date) and not isinstance(value, datetime):
+            return datetime(value.year, value.month, value.day)
+        return value
+
+
+# 已注册的流式读取引擎
+STREAM_READERS: Dict[str, Type[RowStreamReader]] = {}
+
+# 自动选择读取引擎时的优先顺序（均不可用或不支持该格式时使用pandas）
+AUTO_READER_ORDER = ['calamine', 'openpyxl', 'xlrd']
+
+
+def register_reader(reader_class: Type[RowStreamReader]) -> Type[RowStreamReader]:
+    """
+    注册流式读取引擎
+
+    Args:
+        reader_class (Type[RowStreamReader]): 读取器类，以其 name 属性注册
+
+    Returns:
+        Type[RowStreamReader]: 读取器类（可用作装饰器）
+    """
+    STREAM_READERS[reader_class.name] = reader_class
+    return reader_class
+
+
+for _reader_class in (OpenpyxlStreamReader, XlrdStreamReader, CalamineStreamReader):
+    register_reader(_reader_class)
+
+
+def select_reader(backend: str, excel_file: Path) -> Optional[Type[RowStreamReader]]:
+    """
+    为文件选择流式读取引擎
+
+    Args:
+        backend (str): 配置的读取后端，'auto' 按 AUTO_READER_ORDER 选择第一个可用且支持该格式的引擎
+        excel_file (Path): Excel文件路径
+
+    Returns:
+        Optional[Type[RowStreamReader]]: 读取器类，为None时使用pandas读取
+    """
+    if backend == 'auto':
+        for name in AUTO_READER_ORDER:
+            reader_class = STREAM_READERS.get(name)
+            if reader_class is not None and reader_class.supports(excel_file) and reader_class.available():
+                return reader_class
+        return None
+
+    reader_class = STREAM_READERS.get(backend)
+    if reader_class is not None and reader_class.supports(excel_file):
+        return reader_class
+    # pandas后端，或引擎不支持该格式（如openpyxl读取旧版.xls）时回退到pandas
+    return None
+
+
+def iter_excel_sheets(excel_file: Path, sheet_name: Union[str, List[str]] = "",
+                      backend: str = 'openpyxl') -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+    """
+    使用流式读取器逐个工作表读取Excel文件
+
+    Args:
+        excel_file (Path): Excel文件路径
+        sheet_name (Union[str, List[str]]): 工作表名称或名称列表，为空时读取所有工作表
+        backend (str): 读取引擎名称
+
+    Yields:
+        Tuple[str, Iterator[Dict[str, Any]]]: (工作表名称, 记录迭代器)
+    """
+    return STREAM_READERS[backend](excel_file).iter_sheets(sheet_name)
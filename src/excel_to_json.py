@@ -8,13 +8,29 @@ Excel到JSON批量转换工具
 """
 
 import os
+import sys
 import json
-import pandas as pd
+import hashlib
 from pathlib import Path
 import argparse
 import logging
-from typing import List, Dict, Any, Optional
-from gdscript_generator import GDScriptGenerator
+import configparser
+from collections import deque
+from contextlib import nullcontext
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable, Type, Union
+from gdscript_generator import GDScriptGenerator, StructureTracker
+from build_manifest import BuildManifest, MANIFEST_FILENAME, snapshot_file
+from excel_readers import STREAM_READERS, RowStreamReader, select_reader, dataframe_records
+from json_writer import (RawJson, FragmentSink, WriteLog, WriteBatch, WritePipeline,
+                         record_writes, merge_write_log, defer_writes)
+from json_shards import ShardedJsonWriter
+from output_profiles import DEFAULT_OUTPUT_PROFILE, load_output_profiles
+from sparse_records import SparseRecordFilter
+from columnar_json import JSON_LAYOUTS, ColumnarJsonBuilder
+from binary_writer import ColumnarTableBuilder
+from sheet_cache import SheetCache, SHEET_CACHE_DIRNAME, compute_sheet_fingerprints
+from run_report import RunReport, FileReport
+from progress import ProgressReporter, ProgressLogHandler, stream_sink, redirect_stderr
 
 # 配置日志
 logging.basicConfig(
@@ -23,11 +39,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 转换器版本，输出格式变化时递增以使增量构建清单失效
+CONVERTER_VERSION = "1.4"
+
+# 可选的Excel读取后端：pandas、按文件格式自动选择 (auto) 或已注册的流式读取引擎
+READER_BACKENDS = ('pandas', 'auto', *STREAM_READERS)
+
+# 流水线写入时最多有多少个已读取完、输出仍在后台提交的文件
+PIPELINE_DEPTH = 2
+
+
+class _FileConversion:
+    """已读取完毕、输出可能仍在后台提交的文件转换"""
+    
+    def __init__(self, excel_file: Path, file_report: Optional[FileReport]):
+        self.excel_file = excel_file
+        self.file_report = file_report
+        self.outputs: Optional[List[Path]] = None
+        # 读取前的源文件状态，记入构建清单
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.write_log = WriteLog()
+        self.batch: Optional[WriteBatch] = None
+        self.error: Optional[Exception] = None
+
 
 class ExcelToJsonConverter:
     """Excel到JSON转换器类"""
     
-    def __init__(self, input_dir: str, output_dir: str, generate_gdscript: bool = False, gdscript_output_dir: Optional[str] = None):
+    def __init__(self, input_dir: str, output_dir: str, generate_gdscript: bool = False, gdscript_output_dir: Optional[str] = None,
+                 incremental: bool = True, force: bool = False, jobs: int = 1,
+                 config_path: str = "config.ini", reader_backend: Optional[str] = None,
+                 binary_output: Optional[bool] = None, sheets: Optional[List[str]] = None,
+                 use_sheet_cache: Optional[bool] = None, collect_report: bool = False,
+                 progress: Optional[ProgressReporter] = None, shard_output: Optional[bool] = None,
+                 shard_rows: Optional[int] = None, pipeline_writes: Optional[bool] = None,
+                 write_threads: Optional[int] = None, output_profile: Optional[Union[str, List[str]]] = None,
+                 json_layout: Optional[str] = None):
         """
         初始化转换器
         
@@ -36,11 +83,63 @@ class ExcelToJsonConverter:
             output_dir (str): 输出JSON文件目录
             generate_gdscript (bool): 是否生成GDScript脚本
             gdscript_output_dir (str): GDScript输出目录
+            incremental (bool): 是否使用构建清单跳过未变化的文件
+            force (bool): 忽略构建清单，强制重新转换所有文件
+            jobs (int): 批量转换的并行进程数，0表示使用全部CPU核心
+            config_path (str): 配置文件路径
+            reader_backend (str): Excel读取后端 (pandas/auto/openpyxl/xlrd/calamine)，为None时使用配置文件中的设置
+            binary_output (bool): 是否同时输出Godot二进制列式文件(.bin)，为None时使用配置文件中的设置
+            sheets (List[str]): 只重新解析这些工作表，其余工作表沿用工作表缓存中的输出，为None时不筛选
+            use_sheet_cache (bool): 是否使用工作表级缓存，为None时与incremental相同
+            collect_report (bool): 是否收集各阶段耗时和内存，生成运行报告
+            progress (ProgressReporter): 进度事件报告器，为None时不产出进度事件
+            shard_output (bool): 是否按工作表输出分片JSON和分片清单，为None时使用配置文件中的设置
+            shard_rows (int): 每个分片的最大行数，0表示不按行切分，为None时使用配置文件中的设置
+            pipeline_writes (bool): 串行批量转换时是否在后台线程提交输出文件，与下一个文件的解析同时进行，
+                为None时使用配置文件中的设置
+            write_threads (int): 后台写入线程数，为None时使用配置文件中的设置
+            output_profile (Union[str, List[str]]): JSON输出配置名（多个用逗号分隔时一次写出全部），
+                为None时使用配置文件中的设置
+            json_layout (str): JSON布局 (records/columnar)，为None时使用配置文件中的设置
         """
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.generate_gdscript = generate_gdscript
         self.gdscript_output_dir = Path(gdscript_output_dir) if gdscript_output_dir else None
+        self.force = force
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.config_path = config_path
+        self.sheets = sheets
+        
+        # 加载配置文件
+        self.config = configparser.ConfigParser()
+        if Path(config_path).exists():
+            self.config.read(config_path, encoding='utf-8')
+        
+        self.reader_backend = reader_backend or self.config.get('EXCEL', 'reader_backend', fallback='pandas')
+        if self.reader_backend not in READER_BACKENDS:
+            raise ValueError(f"不支持的Excel读取后端: {self.reader_backend}")
+        if self.reader_backend in STREAM_READERS and not STREAM_READERS[self.reader_backend].available():
+            raise ValueError(f"Excel读取后端 {self.reader_backend} 不可用，"
+                             f"请安装 {STREAM_READERS[self.reader_backend].package}")
+        
+        if binary_output is None:
+            binary_output = self.config.getboolean('OUTPUT', 'binary_output', fallback=False)
+        self.binary_output = binary_output
+        
+        if shard_output is None:
+            shard_output = self.config.getboolean('OUTPUT', 'shard_output', fallback=False)
+        if shard_rows is None:
+            shard_rows = self.config.getint('OUTPUT', 'shard_rows', fallback=0)
+        self.shard_output = shard_output
+        self.shard_rows = max(shard_rows, 0)
+        
+        if pipeline_writes is None:
+            pipeline_writes = self.config.getboolean('OUTPUT', 'pipeline_writes', fallback=False)
+        if write_threads is None:
+            write_threads = self.config.getint('OUTPUT', 'write_threads', fallback=2)
+        self.pipeline_writes = pipeline_writes
+        self.write_threads = max(write_threads, 1)
         
         # 确保输出目录存在
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -48,9 +147,104 @@ class ExcelToJsonConverter:
         # 支持的Excel文件格式
         self.supported_extensions = {'.xlsx', '.xls'}
         
+        # 稀疏记录：去掉null字段，可选去掉等于数据类默认值的字段
+        self.include_null_values = self.config.getboolean('DEFAULT', 'include_null_values', fallback=True)
+        self.omit_default_values = self.config.getboolean('OUTPUT', 'omit_default_values', fallback=False)
+        if self.omit_default_values and not generate_gdscript:
+            logger.warning("omit_default_values 需要生成GDScript以确定字段默认值，本次只省略null字段")
+        
+        # JSON布局：records为记录数组，columnar为按列存放并对低基数字符串列做字典编码
+        if json_layout is None:
+            json_layout = self.config.get('OUTPUT', 'json_layout', fallback='records').strip()
+        if json_layout not in JSON_LAYOUTS:
+            raise ValueError(f"不支持的JSON布局: {json_layout}")
+        if json_layout == 'columnar' and shard_output:
+            logger.warning("分片输出使用记录布局，忽略 json_layout = columnar")
+            json_layout = 'records'
+        self.json_layout = json_layout
+        self.columnar_builder = ColumnarJsonBuilder() if json_layout == 'columnar' else None
+        
+        # 列式布局中每列都是完整的数组，不省略字段
+        self.sparse_filter = None
+        if self.columnar_builder is not None:
+            if self.omit_default_values:
+                logger.warning("列式JSON布局不省略字段，忽略 omit_default_values")
+        elif not self.include_null_values or self.omit_default_values:
+            self.sparse_filter = SparseRecordFilter(self.include_null_values, self.omit_default_values)
+        
+        # JSON输出配置：第一个写入输出目录，其余写入以配置名命名的子目录
+        if output_profile is None:
+            output_profile = self.config.get('OUTPUT', 'output_profile', fallback=DEFAULT_OUTPUT_PROFILE)
+        self.output_profiles = load_output_profiles(self.config, output_profile)
+        if self.shard_output and len(self.output_profiles) > 1:
+            logger.warning(f"分片输出只使用第一个输出配置: {self.output_profiles[0].name}")
+            self.output_profiles = self.output_profiles[:1]
+        
+        # JSON流式写入器
+        self.json_writer = self.output_profiles[0].create_writer()
+        self.json_encoding = self.output_profiles[0].encoding
+        self.mirror_profiles = [(profile, profile.create_writer()) for profile in self.output_profiles[1:]]
+        self.shard_writer = ShardedJsonWriter(self.json_writer, self.shard_rows) if self.shard_output else None
+        
+        # 运行报告及正在转换的文件的统计
+        self.report = RunReport(CONVERTER_VERSION) if collect_report else None
+        self.file_report = None
+        
+        self.progress = progress
+        
         # 初始化GDScript生成器
         if self.generate_gdscript:
-            self.gdscript_generator = GDScriptGenerator()
+            self.gdscript_generator = GDScriptGenerator(config_path)
+            self.gdscript_generator.generate_binary_loader = self.binary_output
+            self.gdscript_generator.generate_shard_loader = self.shard_output
+            self.gdscript_generator.generate_columnar_loader = self.columnar_builder is not None
+        
+        # 初始化增量构建清单
+        self.manifest = None
+        if incremental:
+            self.manifest = BuildManifest(self.output_dir / MANIFEST_FILENAME, self.get_build_signature())
+        # 是否在读取前记录源文件状态（大小、修改时间和哈希），供构建清单使用
+        self.snapshot_sources = self.manifest is not None
+        
+        # 初始化工作表级缓存，缓存内容与工作表筛选无关
+        self.sheet_cache = None
+        if incremental if use_sheet_cache is None else use_sheet_cache:
+            self.sheet_cache = SheetCache(self.output_dir / SHEET_CACHE_DIRNAME,
+                                          self.get_build_signature(include_sheets=False))
+    
+    def get_build_signature(self, include_sheets: bool = True) -> str:
+        """
+        获取转换器/配置签名，任何影响输出内容的设置变化都会改变签名
+        
+        Args:
+            include_sheets (bool): 是否包含工作表筛选
+        
+        Returns:
+            str: 签名哈希
+        """
+        options = {
+            'converter_version': CONVERTER_VERSION,
+            'output_dir': str(self.output_dir.resolve()),
+            'generate_gdscript': self.generate_gdscript,
+            'gdscript_output_dir': str(self.gdscript_output_dir) if self.gdscript_output_dir else None,
+            'reader_backend': self.reader_backend,
+            'binary_output': self.binary_output,
+            'shard_output': self.shard_output,
+            'shard_rows': self.shard_rows if self.shard_output else 0,
+            'output_profiles': [profile.to_dict() for profile in self.output_profiles],
+            'include_null_values': self.include_null_values,
+            'omit_default_values': self.omit_default_values,
+            'json_layout': self.json_layout,
+        }
+        if self.generate_gdscript:
+            options['gdscript_config'] = dict(self.gdscript_generator.config.items('GDSCRIPT'))
+            if self.gdscript_generator.config.has_section('INDEXES'):
+                options['gdscript_indexes'] = dict(self.gdscript_generator.config.items('INDEXES'))
+        if include_sheets and self.sheets:
+            options['sheets'] = self.sheets
+        
+        payload = json.dumps(options, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
     
     def get_excel_files(self) -> List[Path]:
         """
@@ -62,10 +256,58 @@ class ExcelToJsonConverter:
         excel_files = []
         
         for file_path in self.input_dir.iterdir():
+            # 跳过Excel打开工作簿时产生的 ~$ 锁文件
+            if file_path.name.startswith('~$'):
+                continue
             if file_path.is_file() and file_path.suffix.lower() in self.supported_extensions:
                 excel_files.append(file_path)
         
-        return excel_files
+        # 排序以保证批量转换和日志顺序确定
+        return sorted(excel_files)
+    
+    def iter_excel_to_json(self, excel_file: Path, sheet_name: Union[str, List[str]] = "",
+                           tracker: Optional[StructureTracker] = None) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+        """
+        逐个工作表读取Excel文件，产出每个工作表的记录迭代器
+        
+        Args:
+            excel_file (Path): Excel文件路径
+            sheet_name (Union[str, List[str]], optional): 工作表名称或名称列表，默认为空（所有工作表）
+            tracker (StructureTracker, optional): 字段类型推断器，pandas后端直接按列类型为其提供表结构
+        
+        Yields:
+            Tuple[str, Iterator[Dict[str, Any]]]: (工作表名称, 记录迭代器)
+        """
+        # 流式读取后端，不构建DataFrame（引擎不支持该格式时回退到pandas）
+        reader_class = self.get_stream_reader(excel_file)
+        if reader_class is not None:
+            yield from reader_class(excel_file).iter_sheets(sheet_name)
+            return
+        
+        # pandas导入耗时较长，只在使用pandas后端时导入
+        import pandas as pd
+        
+        # 打开Excel文件，逐个工作表解析，同一时间只保留一个DataFrame
+        with pd.ExcelFile(excel_file) as excel_data:
+            if isinstance(sheet_name, list):
+                sheet_names = sheet_name
+            elif sheet_name:
+                sheet_names = [sheet_name]
+            else:
+                # 读取所有工作表
+                sheet_names = excel_data.sheet_names
+            
+            for sheet_name in sheet_names:
+                df = excel_data.parse(sheet_name)
+                
+                if tracker is not None:
+                    tracker.provide(sheet_name, self.gdscript_generator.analyze_dataframe_structure(df))
+                
+                # 按列处理NaN值，转换为None，记录在写出时逐条构建
+                with self.report_stage('clean', sheet_name):
+                    records = dataframe_records(df)
+                del df
+                yield sheet_name, records
     
     def convert_excel_to_json(self, excel_file: Path, sheet_name: str = "") -> Dict[str, Any]:
         """
@@ -73,27 +315,18 @@ class ExcelToJsonConverter:
         
         Args:
             excel_file (Path): Excel文件路径
-            sheet_name (str, optional): 工作表名称，默认为None（第一个工作表）
+            sheet_name (str, optional): 工作表名称，默认为空（所有工作表）
         
         Returns:
             Dict[str, Any]: 转换后的JSON数据
         """
         try:
-            # 读取Excel文件
-            if sheet_name:
-                df = pd.read_excel(excel_file, sheet_name=sheet_name)
-                sheets_data = {sheet_name: df.to_dict('records')}
-            else:
-                # 读取所有工作表
-                excel_data = pd.read_excel(excel_file, sheet_name=None)
-                sheets_data = {}
-                
-                for sheet_name, df in excel_data.items():
-                    # 处理NaN值，转换为None
-                    df = df.where(pd.notnull(df), None)
-                    sheets_data[sheet_name] = df.to_dict('records')
-            
-            return sheets_data
+            sheets = self.iter_excel_to_json(excel_file, sheet_name)
+            if self.sparse_filter is not None:
+                sheets = self.sparse_filter.track(sheets)
+            if self.columnar_builder is not None:
+                sheets = self.columnar_builder.track(sheets)
+            return {name: records if isinstance(records, dict) else list(records) for name, records in sheets}
             
         except Exception as e:
             logger.error(f"读取Excel文件 {excel_file} 时出错: {str(e)}")
@@ -107,75 +340,645 @@ class ExcelToJsonConverter:
             data (Dict[str, Any]): JSON数据
             output_file (Path): 输出文件路径
         """
+        self.save_json_stream(data.items(), output_file)
+    
+    def save_json_stream(self, sheets: Iterable[Tuple[str, Iterable[Dict[str, Any]]]], output_file: Path,
+                         fragments: Optional[FragmentSink] = None) -> List[Path]:
+        """
+        流式保存JSON数据到文件，记录在写出时才从迭代器中读取
+        
+        选择了多个输出配置时，在同一遍读取中把其他格式写入输出目录下以配置名命名的子目录。
+        
+        Args:
+            sheets (Iterable[Tuple[str, Iterable[Dict[str, Any]]]]): (工作表名称, 记录迭代器) 序列
+            output_file (Path): 输出文件路径
+            fragments (FragmentSink, optional): 传入时把每个新序列化工作表的JSON片段写入其中，用于工作表缓存
+        
+        Returns:
+            List[Path]: 生成的JSON文件（主输出在前）
+        """
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            mirrors = []
+            for profile, writer in self.mirror_profiles:
+                profile_dir = self.output_dir / profile.name
+                profile_dir.mkdir(parents=True, exist_ok=True)
+                mirrors.append((writer, profile_dir / output_file.name, profile.encoding))
+            
+            file_wrapper = self.file_report.wrap_file if self.file_report is not None else None
+            self.json_writer.write(sheets, output_file, self.json_encoding, fragments=fragments,
+                                   file_wrapper=file_wrapper, mirrors=mirrors)
             
             logger.info(f"成功保存JSON文件: {output_file}")
+            for _, mirror_file, _ in mirrors:
+                logger.info(f"成功保存JSON文件: {mirror_file}")
+            return [output_file] + [mirror_file for _, mirror_file, _ in mirrors]
             
         except Exception as e:
             logger.error(f"保存JSON文件 {output_file} 时出错: {str(e)}")
             raise
     
-    def convert_single_file(self, excel_file: Path) -> None:
+    def save_json_shards(self, sheets: Iterable[Tuple[str, Iterable[Dict[str, Any]]]], shard_dir: Path,
+                         fragments: Optional[FragmentSink] = None) -> List[Path]:
         """
-        转换单个Excel文件
+        流式保存分片JSON文件和分片清单
         
         Args:
-            excel_file (Path): Excel文件路径
+            sheets (Iterable[Tuple[str, Iterable[Dict[str, Any]]]]): (工作表名称, 记录迭代器) 序列
+            shard_dir (Path): 分片目录
+            fragments (FragmentSink, optional): 传入时把每个新序列化工作表的JSON片段写入其中，用于工作表缓存
+        
+        Returns:
+            List[Path]: 生成的分片文件和清单文件
         """
         try:
-            logger.info(f"开始转换文件: {excel_file}")
-            
-            # 转换Excel到JSON
-            json_data = self.convert_excel_to_json(excel_file)
+            file_wrapper = self.file_report.wrap_file if self.file_report is not None else None
+            outputs = self.shard_writer.write(sheets, shard_dir, self.json_encoding, fragments=fragments,
+                                              file_wrapper=file_wrapper)
             
-            # 生成输出文件名
-            output_filename = excel_file.stem + '.json'
-            output_file = self.output_dir / output_filename
+            logger.info(f"成功保存分片JSON: {shard_dir} ({len(outputs) - 1}个分片)")
+            return outputs
             
-            # 保存JSON文件
-            self.save_json(json_data, output_file)
+        except Exception as e:
+            logger.error(f"保存分片JSON {shard_dir} 时出错: {str(e)}")
+            raise
+    
+    def get_stream_reader(self, excel_file: Path) -> Optional[Type[RowStreamReader]]:
+        """
+        获取读取该文件使用的流式读取引擎
+        
+        Args:
+            excel_file (Path): Excel文件路径
+        
+        Returns:
+            Optional[Type[RowStreamReader]]: 读取器类，为None时使用pandas读取
+        """
+        return select_reader(self.reader_backend, excel_file)
+    
+    def get_sheet_names(self, excel_file: Path, fingerprints: Optional[Dict[str, str]] = None) -> Optional[List[str]]:
+        """
+        获取工作表筛选选中的工作表（按工作簿中的顺序），未选中的工作表沿用缓存中上次的输出
+        
+        Args:
+            excel_file (Path): Excel文件路径
+            fingerprints (Dict[str, str], optional): 已计算的工作表指纹，可直接提供工作表列表
+        
+        Returns:
+            Optional[List[str]]: 工作表名称列表，未设置工作表筛选时为None
+        """
+        if not self.sheets:
+            return None
+        
+        reader_class = self.get_stream_reader(excel_file)
+        if fingerprints is not None:
+            workbook_sheets = list(fingerprints)
+        elif reader_class is not None:
+            workbook_sheets = reader_class(excel_file).sheet_names()
+        else:
+            import pandas as pd
+            with pd.ExcelFile(excel_file) as excel_data:
+                workbook_sheets = excel_data.sheet_names
+        
+        return [name for name in workbook_sheets if name in self.sheets]
+    
+    def iter_cached_sheets(self, excel_file: Path, sheet_names: List[str], cached: Dict[str, Dict[str, Any]],
+                           tracker: Optional[StructureTracker] = None,
+                           table_builder: Optional[ColumnarTableBuilder] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        按工作簿顺序产出工作表，命中缓存的工作表直接产出缓存的JSON片段，其余工作表重新读取
+        
+        Args:
+            excel_file (Path): Excel文件路径
+            sheet_names (List[str]): 需要输出的工作表
+            cached (Dict[str, Dict[str, Any]]): 指纹未变化的缓存条目
+            tracker (StructureTracker, optional): 字段类型推断器
+            table_builder (ColumnarTableBuilder, optional): 二进制列式数据收集器
+        
+        Yields:
+            Tuple[str, Any]: (工作表名称, 记录迭代器或RawJson)
+        """
+        fresh_names = [name for name in sheet_names if name not in cached]
+        if fresh_names:
+            logger.info(f"重新解析工作表: {', '.join(fresh_names)}")
+        fresh_sheets = self.iter_excel_to_json(excel_file, fresh_names, tracker=tracker) if fresh_names else iter(())
+        
+        for name in sheet_names:
+            entry = cached.get(name)
+            if entry is None:
+                yield next(fresh_sheets)
+                continue
             
-            # 生成GDScript脚本（如果启用）
-            if self.generate_gdscript:
-                logger.info(f"开始生成GDScript脚本: {excel_file.stem}")
+            if tracker is not None:
+                tracker.provide(name, entry['structure'])
+            if table_builder is not None and entry['binary'] is not None:
+                table_builder.provide(name, entry['binary'].read_bytes())
+            # 每个输出配置各有一份片段，多个配置的输出都与重新序列化的结果相同
+            primary, *mirrors = [path.read_text(encoding='utf-8') for path in entry['json']]
+            yield name, RawJson(primary, mirrors)
+    
+    def report_stage(self, name: str, sheet_name: Optional[str] = None):
+        """
+        在运行报告中统计一个阶段的耗时，未启用报告时不做任何统计
+        
+        Args:
+            name (str): 阶段名
+            sheet_name (str, optional): 所属工作表，为None时计入文件级统计
+        """
+        if self.file_report is None:
+            return nullcontext()
+        return self.file_report.stage(name, sheet_name)
+    
+    def convert_single_file(self, excel_file: Path, force: Optional[bool] = None) -> List[Path]:
+        """
+        转换单个Excel文件
+        
+        Args:
+            excel_file (Path): Excel文件路径
+            force (bool, optional): 本次是否忽略构建清单和工作表缓存，为None时使用构造时的设置
+        
+        Returns:
+            List[Path]: 生成的输出文件路径列表
+        """
+        return self.complete_conversion(self.begin_conversion(excel_file, force=force))
+    
+    def begin_conversion(self, excel_file: Path, pipeline: Optional[WritePipeline] = None,
+                         force: Optional[bool] = None) -> _FileConversion:
+        """
+        读取Excel文件并写出（或提交写出）所有输出文件
+        
+        Args:
+            excel_file (Path): Excel文件路径
+            pipeline (WritePipeline, optional): 传入时输出文件的提交交给后台线程，返回时提交可能尚未完成
+            force (bool, optional): 本次是否忽略构建清单和工作表缓存，为None时使用构造时的设置
+        
+        Returns:
+            _FileConversion: 进行中的转换，需调用 complete_conversion 完成
+        """
+        if self.report is not None:
+            self.file_report = self.report.start_file(excel_file)
+        if self.progress is not None:
+            self.progress.start_file(excel_file)
+        
+        conversion = _FileConversion(excel_file, self.file_report)
+        try:
+            # 在读取前记录源文件状态，转换期间文件被保存时下次仍会重新转换
+            if self.snapshot_sources:
+                conversion.snapshot = snapshot_file(excel_file)
+            with record_writes(merge=pipeline is None) as conversion.write_log, \
+                    defer_writes(pipeline) as conversion.batch:
+                conversion.outputs = self.write_outputs(excel_file, force)
+        except Exception as e:
+            conversion.error = e
+            self.report_failure(conversion, e)
+        finally:
+            self.file_report = None
+        
+        return conversion
+    
+    def complete_conversion(self, conversion: _FileConversion) -> List[Path]:
+        """
+        等待文件的输出写完，更新运行报告、构建清单并产出完成事件
+        
+        Args:
+            conversion (_FileConversion): begin_conversion 返回的转换
+        
+        Returns:
+            List[Path]: 生成的输出文件路径列表
+        
+        Raises:
+            Exception: 读取或写入失败时抛出原异常
+        """
+        excel_file = conversion.excel_file
+        write_log = conversion.write_log
+        
+        try:
+            if conversion.error is not None:
+                raise conversion.error
+            if conversion.batch is not None:
                 try:
-                    self.gdscript_generator.generate_scripts_from_json(
-                        output_file, 
-                        self.gdscript_output_dir
-                    )
-                    logger.info(f"GDScript脚本生成完成: {excel_file.stem}")
+                    conversion.batch.wait()
                 except Exception as e:
-                    logger.error(f"生成GDScript脚本失败 {excel_file.stem}: {str(e)}")
-            
-            logger.info(f"文件转换完成: {excel_file} -> {output_file}")
-            
-        except Exception as e:
-            logger.error(f"转换文件 {excel_file} 失败: {str(e)}")
+                    self.report_failure(conversion, e)
+                    raise
+                # 后台写入的结果在写完后才并入外层记录
+                merge_write_log(write_log)
+        finally:
+            if conversion.file_report is not None:
+                self.report.add_file(conversion.file_report.finish(write_log))
+        
+        outputs = conversion.outputs
+        if outputs is None:
+            return []
+        
+        # 内容未变化的输出保留原文件，修改时间不变，Godot不会重新导入
+        logger.info(f"输出文件: {len(write_log.changed)} 个有变化, {len(write_log.unchanged)} 个未变化")
+        for output in write_log.changed:
+            logger.info(f"已更新: {output}")
+        
+        # 记录到构建清单
+        if self.manifest is not None:
+            self.manifest.record(excel_file, outputs, conversion.snapshot)
+        
+        if self.progress is not None:
+            self.progress.finish_file(excel_file, outputs, write_log.changed)
+        
+        return outputs
+    
+    def report_failure(self, conversion: _FileConversion, error: Exception) -> None:
+        """
+        记录文件转换失败
+        
+        Args:
+            conversion (_FileConversion): 失败的转换
+            error (Exception): 异常
+        """
+        logger.error(f"转换文件 {conversion.excel_file} 失败: {str(error)}")
+        if conversion.file_report is not None:
+            conversion.file_report.fail(error)
+        if self.progress is not None:
+            self.progress.emit('error', file=str(conversion.excel_file), message=str(error))
+    
+    def write_outputs(self, excel_file: Path, force: Optional[bool] = None) -> Optional[List[Path]]:
+        """
+        读取Excel文件，写出JSON、缓存、二进制文件和GDScript脚本
+        
+        Args:
+            excel_file (Path): Excel文件路径
+            force (bool, optional): 是否忽略工作表缓存，为None时使用构造时的设置
+        
+        Returns:
+            Optional[List[Path]]: 生成的输出文件路径列表，没有匹配的工作表时为None
+        """
+        logger.info(f"开始转换文件: {excel_file}")
+        
+        # 生成输出文件名
+        output_filename = excel_file.stem + '.json'
+        output_file = self.output_dir / output_filename
+        
+        # 启用GDScript生成时，在记录写出的同时推断字段类型，无需再读回JSON
+        tracker = StructureTracker(self.gdscript_generator) if self.generate_gdscript else None
+        
+        # 启用二进制输出时，在写出JSON的同时按列收集数据
+        table_builder = ColumnarTableBuilder() if self.binary_output else None
+        
+        # 多工作表的.xlsx文件使用工作表级缓存，只重新解析指纹变化的工作表
+        fingerprints = compute_sheet_fingerprints(excel_file) if self.sheet_cache is not None else None
+        use_cache = fingerprints is not None and len(fingerprints) > 1
+        
+        # 工作表筛选只决定重新解析哪些工作表，输出中总是包含全部工作表
+        selected = self.get_sheet_names(excel_file, fingerprints)
+        if selected is not None and not selected:
+            logger.warning(f"文件 {excel_file} 中没有匹配的工作表，跳过")
+            return None
+        if selected is not None and not use_cache:
+            logger.info(f"文件 {excel_file} 无法使用工作表缓存，转换全部工作表")
+        
+        cached = {}
+        fragments = None
+        if use_cache:
+            force = self.force if force is None else force
+            cached = {
+                name: entry for name, entry in self.sheet_cache.load(excel_file).items()
+                if not force and name in fingerprints and len(entry['json']) == len(self.output_profiles)
+                # 未选中的工作表沿用上次的输出（即使已修改），不重新解析
+                and (entry.get('fingerprint') == fingerprints[name] or (selected is not None and name not in selected))
+            }
+            fragments = self.sheet_cache.fragment_sink(excel_file, fingerprints)
+            sheets = self.iter_cached_sheets(excel_file, list(fingerprints), cached, tracker, table_builder)
+        else:
+            sheets = self.iter_excel_to_json(excel_file, tracker=tracker)
+        
+        if self.file_report is not None:
+            sheets = self.file_report.track_source(sheets)
+        if tracker is not None:
+            sheets = tracker.track(sheets)
+        if table_builder is not None:
+            sheets = table_builder.track(sheets)
+        # 类型推断和二进制输出使用完整记录，只有JSON写出稀疏记录
+        if self.sparse_filter is not None:
+            sheets = self.sparse_filter.track(sheets, tracker)
+        if self.file_report is not None:
+            sheets = self.file_report.track_output(sheets)
+        if self.progress is not None:
+            sheets = self.progress.track(excel_file, sheets)
+        # 列式布局在最后收集整表的列，进度和统计仍按记录计算
+        if self.columnar_builder is not None:
+            sheets = self.columnar_builder.track(sheets)
+        
+        # 边读取Excel边保存JSON文件
+        if self.shard_writer is not None:
+            outputs = self.save_json_shards(sheets, self.output_dir / excel_file.stem, fragments)
+            output_file = outputs[-1]
+        else:
+            outputs = self.save_json_stream(sheets, output_file, fragments)
+        
+        # 更新工作表缓存：保留指纹未变的条目，加入本次重新解析的工作表
+        if use_cache:
+            with self.report_stage('save_cache'):
+                for name in fragments.written:
+                    fragment_files = fragments.fragment_files(name, len(self.output_profiles))
+                    if fragment_files is None:
+                        continue
+                    cached[name] = {
+                        'fingerprint': fingerprints[name],
+                        'json': fragment_files,
+                        'structure': tracker.sheets_structure.get(name) if tracker is not None else None,
+                        'binary': table_builder.encoded_table(name) if table_builder is not None else None,
+                    }
+                outputs.extend(self.sheet_cache.save(excel_file, cached))
+        
+        # 保存二进制列式文件
+        if table_builder is not None:
+            binary_file = self.output_dir / (excel_file.stem + '.bin')
+            with self.report_stage('write_binary'):
+                table_builder.write(binary_file)
+            outputs.append(binary_file)
+        
+        # 生成GDScript脚本（如果启用）
+        if tracker is not None:
+            logger.info(f"开始生成GDScript脚本: {excel_file.stem}")
+            try:
+                with self.report_stage('generate_scripts'):
+                    outputs.extend(self.gdscript_generator.generate_scripts_from_structure(
+                        tracker.sheets_structure,
+                        self.gdscript_output_dir,
+                        excel_file.stem
+                    ))
+                logger.info(f"GDScript脚本生成完成: {excel_file.stem}")
+            except Exception as e:
+                # 脚本未生成时文件按失败处理，不记入构建清单，下次转换时重试
+                logger.error(f"生成GDScript脚本失败 {excel_file.stem}: {str(e)}")
+                raise
+        
+        logger.info(f"文件转换完成: {excel_file} -> {output_file}")
+        
+        return outputs
     
-    def convert_all_files(self) -> None:
-        """批量转换所有Excel文件"""
+    def convert_all_files(self, force: Optional[bool] = None) -> Dict[str, int]:
+        """
+        批量转换所有Excel文件
+        
+        Args:
+            force (bool, optional): 本次是否忽略构建清单和工作表缓存，为None时使用构造时的设置
+        
+        Returns:
+            Dict[str, int]: 转换统计 (success/failed/skipped)
+        """
         excel_files = self.get_excel_files()
         
         if not excel_files:
             logger.warning(f"在目录 {self.input_dir} 中没有找到Excel文件")
-            return
+            if self.progress is not None:
+                self.progress.emit('batch_finished', success=0, failed=0, skipped=0)
+            return {'success': 0, 'failed': 0, 'skipped': 0}
         
         logger.info(f"找到 {len(excel_files)} 个Excel文件，开始批量转换...")
+        if self.progress is not None:
+            self.progress.emit('batch_started', total=len(excel_files))
         
         success_count = 0
         error_count = 0
+        skipped_count = 0
+        batch_log = WriteLog()
+        force = self.force if force is None else force
         
-        for excel_file in excel_files:
-            try:
-                self.convert_single_file(excel_file)
+        try:
+            # 清理已删除工作簿的输出
+            if self.manifest is not None:
+                self.manifest.prune(excel_files, self.input_dir)
+            
+            pending_files = []
+            for excel_file in excel_files:
+                if self.is_up_to_date(excel_file, force):
+                    skipped_count += 1
+                    logger.info(f"文件未变化，跳过: {excel_file}")
+                    if self.report is not None:
+                        self.report.skip_file(excel_file)
+                    if self.progress is not None:
+                        self.progress.emit('file_skipped', file=str(excel_file))
+                else:
+                    pending_files.append(excel_file)
+            
+            with record_writes() as batch_log:
+                if self.jobs > 1 and len(pending_files) > 1:
+                    success_count, error_count = self.convert_files_parallel(pending_files, force)
+                elif self.pipeline_writes and len(pending_files) > 1:
+                    success_count, error_count = self.convert_files_pipelined(pending_files, force)
+                else:
+                    for excel_file in pending_files:
+                        try:
+                            self.convert_single_file(excel_file, force)
+                            success_count += 1
+                        except Exception:
+                            # 错误已在convert_single_file中记录
+                            error_count += 1
+        finally:
+            self.save_manifest()
+        
+        logger.info(f"批量转换完成！成功: {success_count}, 失败: {error_count}, 跳过: {skipped_count}")
+        logger.info(f"输出文件有变化: {len(batch_log.changed)} 个, 未变化: {len(batch_log.unchanged)} 个")
+        if self.progress is not None:
+            self.progress.emit('batch_finished', success=success_count, failed=error_count, skipped=skipped_count,
+                               changed=[str(output) for output in batch_log.changed])
+        return {'success': success_count, 'failed': error_count, 'skipped': skipped_count}
+    
+    def convert_files_pipelined(self, excel_files: List[Path], force: Optional[bool] = None) -> Tuple[int, int]:
+        """
+        以流水线方式串行转换多个Excel文件
+        
+        主线程依次读取工作簿并把输出流式写入临时文件，比较与替换目标文件的提交交给后台线程，
+        下一个工作簿的解析与前面工作簿的JSON、缓存和GDScript脚本的提交同时进行。
+        最多 PIPELINE_DEPTH 个文件在等待提交，等待提交的数据过多时读取暂停（背压）。
+        文件按输入顺序完成，构建清单、运行报告和 file_finished 事件的顺序与串行转换一致。
+        
+        Args:
+            excel_files (List[Path]): 待转换的Excel文件列表
+            force (bool, optional): 本次是否忽略构建清单和工作表缓存，为None时使用构造时的设置
+        
+        Returns:
+            Tuple[int, int]: (成功数量, 失败数量)
+        """
+        success_count = 0
+        error_count = 0
+        in_flight = deque()
+        
+        logger.info(f"使用 {self.write_threads} 个后台线程写入输出文件")
+        
+        with WritePipeline(self.write_threads) as pipeline:
+            for index, excel_file in enumerate(excel_files):
+                in_flight.append(self.begin_conversion(excel_file, pipeline, force))
+                
+                # 最后一个文件读完后等待所有写入完成
+                while in_flight and (len(in_flight) > PIPELINE_DEPTH or index == len(excel_files) - 1):
+                    try:
+                        self.complete_conversion(in_flight.popleft())
+                        success_count += 1
+                    except Exception:
+                        # 错误已在begin_conversion或complete_conversion中记录
+                        error_count += 1
+        
+        return success_count, error_count
+    
+    def convert_files_parallel(self, excel_files: List[Path], force: Optional[bool] = None) -> Tuple[int, int]:
+        """
+        使用进程池并行转换多个Excel文件
+        
+        每个工作进程持有独立的转换器和GDScript生成器；工作进程的日志和进度事件被缓存后
+        按输入顺序回放，构建清单只在主进程中更新。
+        
+        Args:
+            excel_files (List[Path]): 待转换的Excel文件列表
+            force (bool, optional): 本次是否忽略构建清单和工作表缓存，为None时使用构造时的设置
+        
+        Returns:
+            Tuple[int, int]: (成功数量, 失败数量)
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        success_count = 0
+        error_count = 0
+        workers = min(self.jobs, len(excel_files))
+        
+        logger.info(f"使用 {workers} 个进程并行转换")
+        
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(self.get_worker_options(force), self.progress is not None)) as executor:
+            # map按提交顺序返回结果，保证日志顺序与串行转换一致
+            for excel_file, (outputs, snapshot, records, file_report, events, write_log) in zip(excel_files, executor.map(_convert_in_worker, excel_files)):
+                for record in records:
+                    logging.getLogger(record.name).handle(record)
+                
+                merge_write_log(write_log)
+                
+                if self.progress is not None:
+                    self.progress.replay(events)
+                
+                if file_report is not None and self.report is not None:
+                    self.report.add_file(file_report)
+                
+                if outputs is None:
+                    error_count += 1
+                    continue
+                
                 success_count += 1
-            except Exception as e:
-                error_count += 1
-                logger.error(f"转换文件 {excel_file} 失败: {str(e)}")
+                if self.manifest is not None:
+                    self.manifest.record(excel_file, outputs, snapshot)
+        
+        return success_count, error_count
+    
+    def get_worker_options(self, force: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        获取在工作进程中重建转换器所需的参数
+        
+        Args:
+            force (bool, optional): 本次是否忽略构建清单和工作表缓存，为None时使用构造时的设置
+        
+        Returns:
+            Dict[str, Any]: 转换器构造参数
+        """
+        return {
+            'input_dir': str(self.input_dir),
+            'output_dir': str(self.output_dir),
+            'generate_gdscript': self.generate_gdscript,
+            'gdscript_output_dir': str(self.gdscript_output_dir) if self.gdscript_output_dir else None,
+            'incremental': False,
+            'config_path': self.config_path,
+            'reader_backend': self.reader_backend,
+            'binary_output': self.binary_output,
+            'shard_output': self.shard_output,
+            'shard_rows': self.shard_rows,
+            'output_profile': [profile.name for profile in self.output_profiles],
+            'json_layout': self.json_layout,
+            'sheets': self.sheets,
+            'use_sheet_cache': self.sheet_cache is not None,
+            'force': self.force if force is None else force,
+            'collect_report': self.report is not None,
+        }
+    
+    def is_up_to_date(self, excel_file: Path, force: Optional[bool] = None) -> bool:
+        """
+        判断Excel文件的输出是否为最新（可跳过转换）
         
-        logger.info(f"批量转换完成！成功: {success_count}, 失败: {error_count}")
+        Args:
+            excel_file (Path): Excel文件路径
+            force (bool, optional): 本次是否忽略构建清单和工作表缓存，为None时使用构造时的设置
+        
+        Returns:
+            bool: 是否可以跳过
+        """
+        if (self.force if force is None else force) or self.manifest is None:
+            return False
+        return self.manifest.is_up_to_date(excel_file)
+    
+    def save_manifest(self) -> None:
+        """保存构建清单"""
+        if self.manifest is not None:
+            self.manifest.save()
+
+
+class _LogCapture(logging.Handler):
+    """缓存工作进程日志记录的处理器"""
+    
+    def __init__(self):
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        # 预先格式化消息，保证记录可以被序列化回主进程
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+# 工作进程中的转换器实例、日志缓存和进度事件缓存
+_worker_converter: Optional[ExcelToJsonConverter] = None
+_worker_log_capture: Optional[_LogCapture] = None
+_worker_progress_events: List[Dict[str, Any]] = []
+
+
+def _init_worker(options: Dict[str, Any], collect_progress: bool = False) -> None:
+    """进程池工作进程初始化函数"""
+    global _worker_converter, _worker_log_capture
+    
+    _worker_log_capture = _LogCapture()
+    root_logger = logging.getLogger()
+    root_logger.handlers = [_worker_log_capture]
+    
+    progress = ProgressReporter(_worker_progress_events.append) if collect_progress else None
+    _worker_converter = ExcelToJsonConverter(**options, progress=progress)
+    # 工作进程没有构建清单，仍需记录源文件状态交给主进程
+    _worker_converter.snapshot_sources = True
+
+
+def _convert_in_worker(excel_file: Path) -> Tuple[Optional[List[Path]], Optional[Dict[str, Any]],
+                                                  List[logging.LogRecord], Optional[Dict[str, Any]],
+                                                  List[Dict[str, Any]], WriteLog]:
+    """
+    在工作进程中转换单个文件
+    
+    Returns:
+        Tuple[Optional[List[Path]], Optional[Dict[str, Any]], List[logging.LogRecord], Optional[Dict[str, Any]], List[Dict[str, Any]], WriteLog]:
+            (输出文件列表，失败时为None; 读取前的源文件状态; 日志记录; 文件报告，未启用报告时为None; 进度事件; 写入记录)
+    """
+    _worker_log_capture.records = []
+    _worker_progress_events.clear()
+    report = _worker_converter.report
+    if report is not None:
+        report.files = []
+    with record_writes() as write_log:
+        conversion = _worker_converter.begin_conversion(excel_file)
+        try:
+            outputs = _worker_converter.complete_conversion(conversion)
+        except Exception:
+            # 错误已在begin_conversion或complete_conversion中记录
+            outputs = None
+    # 读取前的源文件状态由主进程记入构建清单
+    snapshot = conversion.snapshot
+    file_report = report.files[0] if report is not None and report.files else None
+    return outputs, snapshot, _worker_log_capture.records, file_report, list(_worker_progress_events), write_log
 
 
 def main():
@@ -195,22 +998,152 @@ def main():
     parser.add_argument('--gdscript-output', '-go',
                        default='./gdscript_output',
                        help='GDScript输出目录 (默认: ./gdscript_output)')
+    parser.add_argument('--force',
+                       action='store_true',
+                       help='忽略增量构建清单，强制重新转换所有文件')
+    parser.add_argument('--no-incremental',
+                       action='store_true',
+                       help='禁用增量构建清单')
+    parser.add_argument('--jobs', '-j',
+                       type=int,
+                       default=1,
+                       help='并行转换的进程数，0表示使用全部CPU核心 (默认: 1)')
+    parser.add_argument('--reader',
+                       choices=READER_BACKENDS,
+                       help='Excel读取后端 (默认: 使用配置文件中的reader_backend)')
+    parser.add_argument('--sheets', '-s',
+                       help='只重新解析指定的工作表，多个名称用逗号分隔；其余工作表沿用工作表缓存中上次的输出')
+    parser.add_argument('--binary',
+                       action='store_true',
+                       default=None,
+                       help='同时输出Godot二进制列式文件(.bin) (默认: 使用配置文件中的binary_output)')
+    parser.add_argument('--shard',
+                       action='store_true',
+                       default=None,
+                       help='每个工作表输出单独的JSON分片并生成分片清单 (默认: 使用配置文件中的shard_output)')
+    parser.add_argument('--shard-rows',
+                       type=int,
+                       help='每个分片的最大行数，0表示不按行切分 (默认: 使用配置文件中的shard_rows)')
+    parser.add_argument('--output-profile',
+                       help='JSON输出配置 (default/dev/release 或自定义)，多个用逗号分隔时一次写出全部 '
+                            '(默认: 使用配置文件中的output_profile)')
+    parser.add_argument('--json-layout',
+                       choices=JSON_LAYOUTS,
+                       help='JSON布局: records为记录数组，columnar为按列存放并对重复值多的字符串列做字典编码 '
+                            '(默认: 使用配置文件中的json_layout)')
+    parser.add_argument('--pipeline',
+                       action='store_true',
+                       default=None,
+                       help='在后台线程提交输出文件，与下一个文件的解析同时进行 (默认: 使用配置文件中的pipeline_writes)')
+    parser.add_argument('--report',
+                       help='把各文件、各工作表的阶段耗时和内存写入JSON运行报告')
+    parser.add_argument('--profile',
+                       help='使用cProfile分析转换过程，把pstats数据写入指定文件')
+    parser.add_argument('--progress',
+                       action='store_true',
+                       help='以逐行JSON事件向标准输出报告转换进度（日志也转为事件）')
+    parser.add_argument('--config', '-c',
+                       default='config.ini',
+                       help='配置文件路径 (默认: config.ini)')
+    parser.add_argument('--serve',
+                       action='store_true',
+                       help='以常驻服务模式运行，通过标准输入/输出接收JSON-RPC转换请求')
+    parser.add_argument('--log-file',
+                       help='把标准错误输出重定向到该日志文件（与 --progress 或 --serve 配合，前端无需读取stderr）')
+    parser.add_argument('--watch', '-w',
+                       action='store_true',
+                       help='监视输入目录，工作簿保存后自动重新转换')
+    parser.add_argument('--watch-interval',
+                       type=float,
+                       default=1.0,
+                       help='监视模式的轮询间隔（秒） (默认: 1.0)')
     
     args = parser.parse_args()
     
+    if args.serve:
+        # 常驻服务模式，转换参数由每个请求提供
+        from converter_server import ConverterServer
+        ConverterServer().serve_forever()
+        return
+    
+    if args.log_file:
+        redirect_stderr(args.log_file)
+    
+    progress = None
+    if args.progress:
+        # 标准输出只包含进度事件，便于前端逐行解析
+        if hasattr(sys.stdout, 'reconfigure'):
+            sys.stdout.reconfigure(encoding='utf-8')
+        progress = ProgressReporter(stream_sink(sys.stdout))
+        logging.getLogger().handlers = [ProgressLogHandler(progress)]
+        # 库的警告也转为日志事件，避免写入无人读取的标准错误
+        logging.captureWarnings(True)
+    
     # 创建转换器实例
     converter = ExcelToJsonConverter(
         args.input, 
         args.output, 
         args.generate_gdscript,
-        args.gdscript_output if args.generate_gdscript else None
+        args.gdscript_output if args.generate_gdscript else None,
+        incremental=not args.no_incremental,
+        force=args.force,
+        jobs=args.jobs,
+        config_path=args.config,
+        reader_backend=args.reader,
+        binary_output=args.binary,
+        shard_output=args.shard,
+        shard_rows=args.shard_rows,
+        pipeline_writes=args.pipeline,
+        output_profile=args.output_profile,
+        json_layout=args.json_layout,
+        sheets=[name.strip() for name in args.sheets.split(',') if name.strip()] if args.sheets else None,
+        collect_report=bool(args.report),
+        progress=progress
     )
     
-    if args.file:
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
+    try:
+        run_conversion(converter, args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            logger.info(f"性能分析数据已保存: {args.profile} (可用 python -m pstats 查看)")
+        if args.report:
+            converter.report.save(Path(args.report))
+            logger.info(f"运行报告已保存: {args.report}")
+            for sheet in converter.report.slowest_sheets():
+                logger.info(f"耗时工作表: {sheet['file']} [{sheet['sheet']}] {sheet['seconds']:.3f}秒, {sheet['rows']}行")
+
+
+def run_conversion(converter: ExcelToJsonConverter, args: argparse.Namespace) -> None:
+    """
+    按命令行参数执行转换（监视、单文件或批量）
+    
+    Args:
+        converter (ExcelToJsonConverter): 转换器实例
+        args (argparse.Namespace): 命令行参数
+    """
+    if args.watch:
+        # 监视模式，进程常驻，只重新转换被修改的工作簿
+        from file_watcher import WorkbookWatcher
+        WorkbookWatcher(converter, interval=args.watch_interval).watch()
+    elif args.file:
         # 转换单个文件
         file_path = Path(args.file)
         if file_path.exists() and file_path.suffix.lower() in converter.supported_extensions:
-            converter.convert_single_file(file_path)
+            try:
+                converter.convert_single_file(file_path)
+            except Exception:
+                # 错误已在convert_single_file中记录
+                pass
+            finally:
+                converter.save_manifest()
         else:
             logger.error(f"文件不存在或格式不支持: {args.file}")
     else:
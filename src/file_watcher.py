@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel目录监视工具
+
+以 `excel_to_json.py --watch` 启动，监视输入目录并在工作簿保存后只重新转换被修改的文件。
+安装了watchdog时使用系统文件事件（inotify等）及时唤醒，否则按固定间隔轮询。
+两种方式最终都以文件的大小和修改时间为准，Excel保存时产生的 `~$` 锁文件、
+临时文件和"写临时文件再重命名覆盖"的过程会被去抖动合并为一次转换。
+"""
+
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Tuple, Optional, Any
+
+from excel_to_json import ExcelToJsonConverter
+
+logger = logging.getLogger(__name__)
+
+# 文件快照: 路径 -> (大小, 修改时间)
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+class WorkbookWatcher:
+    """监视输入目录并增量转换被修改的工作簿"""
+
+    def __init__(self, converter: ExcelToJsonConverter, interval: float = 1.0, debounce: float = 1.0):
+        """
+        初始化监视器
+
+        Args:
+            converter (ExcelToJsonConverter): 转换器，进程内复用
+            interval (float): 轮询间隔（秒）
+            debounce (float): 文件保持不变多久后才转换（秒）
+        """
+        self.converter = converter
+        self.interval = interval
+        self.debounce = debounce
+
+        self.snapshot: Snapshot = {}
+        # 已变化但尚未稳定的文件: 路径 -> 最后一次变化的时间
+        self.pending: Dict[Path, float] = {}
+
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.observer: Optional[Any] = None
+
+    def take_snapshot(self) -> Snapshot:
+        """记录输入目录中每个Excel文件的大小和修改时间"""
+        snapshot = {}
+        for excel_file in self.converter.get_excel_files():
+            try:
+                stat = excel_file.stat()
+            except FileNotFoundError:
+                # 列出目录后文件被重命名或删除
+                continue
+            snapshot[excel_file] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def start_observer(self) -> None:
+        """如果安装了watchdog，使用文件系统事件唤醒扫描"""
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            logger.info(f"未安装watchdog，使用轮询方式监视 (间隔 {self.interval} 秒)")
+            return
+
+        wake_event = self.wake_event
+
+        class _WakeHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                wake_event.set()
+
+        self.observer = Observer()
+        self.observer.schedule(_WakeHandler(), str(self.converter.input_dir), recursive=False)
+        self.observer.start()
+        logger.info("使用文件系统事件监视目录")
+
+    def watch(self) -> None:
+        """先做一次增量批量转换，然后持续监视，直到被中断或调用stop"""
+        self.converter.convert_all_files()
+        self.snapshot = self.take_snapshot()
+
+        self.start_observer()
+        logger.info(f"开始监视目录: {self.converter.input_dir} (按Ctrl+C停止)")
+
+        try:
+            while not self.stop_event.is_set():
+                self.wake_event.wait(self.next_timeout())
+                self.wake_event.clear()
+                self.poll()
+        except KeyboardInterrupt:
+            logger.info("停止监视")
+        finally:
+            if self.observer is not None:
+                self.observer.stop()
+                self.observer.join()
+
+    def stop(self) -> None:
+        """停止监视"""
+        self.stop_event.set()
+        self.wake_event.set()
+
+    def next_timeout(self) -> float:
+        """计算下一次扫描前的等待时间，有待转换文件时在其稳定后立即扫描"""
+        if not self.pending:
+            return self.interval
+        deadline = min(self.pending.values()) + self.debounce
+        return max(0.0, min(self.interval, deadline - time.monotonic()))
+
+    def poll(self) -> None:
+        """扫描一次目录，转换已稳定的变化文件，清理已删除文件的输出"""
+        now = time.monotonic()
+        current = self.take_snapshot()
+
+        for excel_file, state in current.items():
+            if self.snapshot.get(excel_file) != state:
+                # 文件仍在写入时大小和修改时间会继续变化，每次变化都重新计时
+                self.pending[excel_file] = now
+
+        deleted = [excel_file for excel_file in self.snapshot if excel_file not in current]
+        self.snapshot = current
+
+        if deleted:
+            for excel_file in deleted:
+                self.pending.pop(excel_file, None)
+            self.prune_deleted()
+
+        for excel_file, changed_at in list(self.pending.items()):
+            if now - changed_at >= self.debounce:
+                del self.pending[excel_file]
+                self.convert(excel_file)
+
+    def convert(self, excel_file: Path) -> None:
+        """
+        重新转换一个工作簿
+
+        Args:
+            excel_file (Path): Excel文件路径
+        """
+        if not excel_file.exists():
+            return
+
+        if self.converter.is_up_to_date(excel_file):
+            # 仅修改时间变化（如重新保存但内容未变）
+            logger.info(f"文件内容未变化，跳过: {excel_file}")
+            self.converter.save_manifest()
+            return
+
+        try:
+            self.converter.convert_single_file(excel_file)
+        except Exception:
+            # 错误已在convert_single_file中记录，文件再次保存时会重试
+            pass
+        finally:
+            self.converter.save_manifest()
+
+    def prune_deleted(self) -> None:
+        """清理已删除工作簿的输出"""
+        if self.converter.manifest is None:
+            return
+        self.converter.manifest.prune(self.snapshot.keys(), self.converter.input_dir)
+        self.converter.save_manifest()
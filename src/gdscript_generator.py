@@ -9,13 +9,13 @@ GDScript自动生成工具
 
 import os
 import json
-import pandas as pd
 from pathlib import Path
 import argparse
 import logging
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Iterable, Iterator
 import configparser
 import re
+from json_writer import atomic_open
 
 # 配置日志
 logging.basicConfig(
@@ -46,9 +46,18 @@ class GDScriptGenerator:
             'class_name_prefix': '',
             'class_name_suffix': 'Data',
             'loader_class_suffix': 'Loader',
-            'base_resource_path': ''
+            'base_resource_path': '',
+            'lazy_loading': 'false',
+            'optimized_scripts': 'false'
         }
         
+        # 是否在加载器中生成 load_binary（由转换器在启用二进制输出时设置）
+        self.generate_binary_loader = False
+        # 是否在加载器中生成分片加载函数（由转换器在启用分片输出时设置）
+        self.generate_shard_loader = False
+        # 是否在加载器中支持列式JSON布局（由转换器在 json_layout = columnar 时设置）
+        self.generate_columnar_loader = False
+        
         self.load_config()
     
     def load_config(self):
@@ -80,35 +89,89 @@ class GDScriptGenerator:
         Returns:
             Dict[str, Dict[str, str]]: 每个表的字段类型信息
         """
-        sheets_structure = {}
+        tracker = StructureTracker(self)
         
         for sheet_name, records in json_data.items():
             if not records or not isinstance(records, list):
                 continue
             
-            field_types = {}
+            for _ in tracker.track_records(sheet_name, records):
+                pass
+        
+        return tracker.sheets_structure
+    
+    def analyze_dataframe_structure(self, df: Any) -> Optional[Dict[str, str]]:
+        """
+        按列推断DataFrame的字段类型，结果与对其记录调用 analyze_json_structure 相同
+        
+        数值和布尔列直接根据dtype和空值掩码确定类型，只有object等列才逐值检查，
+        且一旦某列退化为Variant即停止检查该列。
+        
+        Args:
+            df (pandas.DataFrame): 未做空值替换的原始DataFrame
+        
+        Returns:
+            Optional[Dict[str, str]]: 字段类型信息，空表返回None
+        """
+        if len(df) == 0:
+            return None
+        
+        field_types = {}
+        null_counts = df.isna().sum()
+        
+        for position, field_name in enumerate(df.columns):
+            column = df.iloc[:, position]
+            kind = column.dtype.kind
             
-            # 分析第一条记录的字段类型
-            first_record = records[0]
-            if isinstance(first_record, dict):
-                for field_name, value in first_record.items():
-                    field_types[field_name] = self.infer_gdscript_type(value)
+            if null_counts.iloc[position]:
+                # 空值推断为Variant，与任何类型的公共类型都是Variant
+                field_types[field_name] = "Variant"
+            elif kind == 'b':
+                field_types[field_name] = "bool"
+            elif kind in 'iu':
+                field_types[field_name] = "int"
+            elif kind == 'f':
+                field_types[field_name] = "float"
+            else:
+                field_types[field_name] = self.infer_column_type(column.tolist())
+        
+        return field_types
+    
+    def infer_column_type(self, values: List[Any], chunk_size: int = 4096) -> str:
+        """
+        逐值推断一列的公共类型
+        
+        按块收集值的Python类型，每种类型只推断一次；类型退化为Variant时提前结束。
+        
+        Args:
+            values (List[Any]): 列中的值
+            chunk_size (int): 每块的值数量
+        
+        Returns:
+            str: GDScript类型
+        """
+        common_type = None
+        seen_types = set()
+        
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            # 每种Python类型取一个代表值，按首次出现顺序排列
+            representatives = dict(zip(map(type, chunk), chunk))
+            for value_type in representatives:
+                if value_type in seen_types:
+                    continue
+                seen_types.add(value_type)
                 
-                # 检查其他记录以确保类型一致性
-                for record in records[1:]:
-                    if isinstance(record, dict):
-                        for field_name, value in record.items():
-                            if field_name in field_types:
-                                inferred_type = self.infer_gdscript_type(value)
-                                # 如果类型不一致，使用更通用的类型
-                                if field_types[field_name] != inferred_type:
-                                    field_types[field_name] = self.get_common_type(
-                                        field_types[field_name], inferred_type
-                                    )
-            
-            sheets_structure[sheet_name] = field_types
+                inferred_type = self.infer_gdscript_type(representatives[value_type])
+                if common_type is None:
+                    common_type = inferred_type
+                elif common_type != inferred_type:
+                    common_type = self.get_common_type(common_type, inferred_type)
+                
+                if common_type == "Variant":
+                    return common_type
         
-        return sheets_structure
+        return common_type or "Variant"
     
     def infer_gdscript_type(self, value: Any) -> str:
         """
@@ -171,6 +234,7 @@ class GDScriptGenerator:
             str: 数据类脚本内容
         """
         class_name = self.get_data_class_name(sheet_name)
+        optimized = self.is_optimized()
         
         script_lines = [
             f"## {sheet_name}数据类，由Excel工具自动生成",
@@ -197,11 +261,47 @@ class GDScriptGenerator:
         # 生成字段赋值代码
         for field_name, field_type in field_types.items():
             gd_field_name = self.convert_to_gdscript_name(field_name)
-            script_lines.append(f'\t\tif data.has("{field_name}"):')
-            script_lines.append(f'\t\t\t{gd_field_name} = data["{field_name}"]')
+            if optimized:
+                # 每个字段只查一次字典，缺少的字段保持默认值
+                script_lines.append(f'\t\t{gd_field_name} = data.get({json.dumps(field_name, ensure_ascii=False)}, {gd_field_name})')
+            else:
+                script_lines.append(f'\t\tif data.has("{field_name}"):')
+                script_lines.append(f'\t\t\t{gd_field_name} = data["{field_name}"]')
+        
+        if optimized:
+            script_lines.extend([
+                "",
+                f"\t## 按列数据构造 (columns为按字段顺序排列的列数组，row为行号)",
+                f"\tstatic func from_columns(columns: Array, row: int) -> {class_name}:",
+                f"\t\tvar item := {class_name}.new()",
+            ])
+            for column_index, field_name in enumerate(field_types):
+                gd_field_name = self.convert_to_gdscript_name(field_name)
+                script_lines.append(f"\t\titem.{gd_field_name} = columns[{column_index}][row]")
+            script_lines.append(f"\t\treturn item")
         
         return "\n".join(script_lines)
     
+    def is_optimized(self) -> bool:
+        """是否生成优化脚本（配置 optimized_scripts = true）"""
+        return self.config.getboolean('GDSCRIPT', 'optimized_scripts', fallback=False)
+    
+    def get_item_type(self, sheet_name: str) -> str:
+        """
+        获取加载器中数据项的类型
+        
+        优化脚本使用数据类类型，得到强类型容器和返回值；否则使用Variant。
+        
+        Args:
+            sheet_name (str): 表名
+        
+        Returns:
+            str: GDScript类型
+        """
+        if self.is_optimized():
+            return f"DataScript.{self.get_data_class_name(sheet_name)}"
+        return "Variant"
+    
     def generate_loader_class(self, sheet_name: str, field_types: Dict[str, str], output_dir: Optional[Path] = None) -> str:
         """
         生成数据加载类脚本
@@ -229,6 +329,10 @@ class GDScriptGenerator:
         id_field = self.find_id_field(field_types)
         id_type = field_types.get(id_field, "int") if id_field else "int"
         
+        # 配置文件中声明的二级索引
+        indexes = self.get_index_specs(sheet_name, field_types, id_field)
+        item_type = self.get_item_type(sheet_name)
+        
         script_lines = [
             f"## {sheet_name}数据加载器，由Excel工具自动生成",
             f"class_name {loader_class_name}",
@@ -236,12 +340,80 @@ class GDScriptGenerator:
             f"## 引入数据类脚本",
             f'const DataScript = preload("{resource_path}")',
             "",
-            f"## 数据字典和数组 (使用Variant类型避免循环依赖)",
-            f"var data_dict: Dictionary[{id_type}, Variant] = {{}}",
-            f"var data_array: Array[Variant] = []",
+        ]
+        
+        if self.config.getboolean('GDSCRIPT', 'lazy_loading', fallback=False):
+            script_lines.extend(self.generate_lazy_loader_lines(sheet_name, field_types, id_field, indexes))
+            return "\n".join(script_lines)
+        
+        script_lines.extend([
+            f"## 数据字典和数组" + (" (使用Variant类型避免循环依赖)" if item_type == "Variant" else ""),
+            f"var data_dict: Dictionary[{id_type}, {item_type}] = {{}}",
+            f"var data_array: Array[{item_type}] = []",
+            *self.generate_index_declarations(field_types, indexes, item_type),
             "",
             f"## 加载数据",
             f"func load_data(json_path: String):",
+            *self.generate_json_parse_lines(sheet_name),
+            *self.generate_columnar_dispatch_lines(),
+            f"\tfor record in records:",
+            f"\t\tvar data_item = DataScript.{data_class_name}.new(record)",
+            f"\t\tdata_array.append(data_item)",
+        ])
+        
+        if id_field:
+            gd_id_field = self.convert_to_gdscript_name(id_field)
+            script_lines.extend([
+                f"\t\tdata_dict[data_item.{gd_id_field}] = data_item"
+            ])
+        
+        if indexes:
+            script_lines.append(f"\t\t_index_item(data_item)")
+        
+        if self.generate_columnar_loader:
+            script_lines.extend(self.generate_columnar_loader_lines(sheet_name, field_types, id_field, bool(indexes)))
+        
+        if self.generate_binary_loader:
+            script_lines.extend(self.generate_binary_loader_lines(sheet_name, field_types, id_field, bool(indexes)))
+        
+        if self.generate_shard_loader:
+            script_lines.extend(self.generate_shard_loader_lines(sheet_name, field_types, id_field, item_type))
+        
+        if indexes:
+            script_lines.extend(self.generate_index_lines(field_types, indexes, item_type))
+        
+        script_lines.extend([
+            "",
+            f"## 根据ID获取数据",
+            f"func get_by_id(id: {id_type}) -> {item_type}:",
+            f"\treturn data_dict.get(id, null)",
+            "",
+            f"## 获取所有数据",
+            f"func get_all() -> Array[{item_type}]:",
+            f"\treturn data_array",
+            "",
+            f"## 获取数据数量",
+            f"func get_count() -> int:",
+            f"\treturn data_array.size()",
+            "",
+            f"## 创建新的数据项实例",
+            f"func create_data_item(data: Dictionary) -> {item_type}:",
+            f"\treturn DataScript.{data_class_name}.new(data)"
+        ])
+        
+        return "\n".join(script_lines)
+    
+    def generate_json_parse_lines(self, sheet_name: str) -> List[str]:
+        """
+        生成 load_data 中读取并解析JSON文件的语句，结束时表的记录数组位于局部变量 records
+        
+        Args:
+            sheet_name (str): 表名
+        
+        Returns:
+            List[str]: 脚本行
+        """
+        return [
             f"\tvar file = FileAccess.open(json_path, FileAccess.READ)",
             f"\tif file == null:",
             f'\t\tprint("无法打开文件: ", json_path)',
@@ -262,37 +434,605 @@ class GDScriptGenerator:
             f"\t\treturn",
             f"\t",
             f"\tvar records = json_data[\"{sheet_name}\"]",
-            f"\tfor record in records:",
-            f"\t\tvar data_item = DataScript.{data_class_name}.new(record)",
-            f"\t\tdata_array.append(data_item)",
         ]
+    
+    def generate_lazy_loader_lines(self, sheet_name: str, field_types: Dict[str, str], id_field: Optional[str],
+                                   indexes: List[Tuple[List[str], bool]]) -> List[str]:
+        """
+        生成延迟创建数据项的加载器主体（配置 lazy_loading = true）
+        
+        加载时只保留原始数据（JSON记录数组或二进制列数组），并只读取ID和索引字段建立
+        键 -> 行号的映射；数据项在首次通过 get_by_id / get_at 等访问时才创建并缓存，
+        release_cache 可释放已创建的数据项。
+        
+        Args:
+            sheet_name (str): 表名
+            field_types (Dict[str, str]): 字段类型信息
+            id_field (str): ID字段名，没有ID字段时 get_by_id 总是返回null
+            indexes (List[Tuple[List[str], bool]]): 二级索引声明
+        
+        Returns:
+            List[str]: 脚本行（不含类头）
+        """
+        data_class_name = self.get_data_class_name(sheet_name)
+        item_type = self.get_item_type(sheet_name)
+        id_type = field_types.get(id_field, "int") if id_field else "int"
+        column_names = ", ".join(json.dumps(str(field_name), ensure_ascii=False) for field_name in field_types)
+        
+        script_lines = [
+            f"## 字段名（按列顺序）",
+            f"const FIELD_NAMES: Array[String] = [{column_names}]",
+            "",
+            f"## 原始数据：JSON记录数组或二进制列数组，数据项在首次访问时才创建",
+            f"var _records: Array = []",
+            f"var _columns: Array = []",
+            f"var _row_count: int = 0",
+            f"## 已创建的数据项 (行号 -> 数据项，未创建时为null)",
+            f"var _items: Array[{item_type}] = []",
+            f"## ID -> 行号",
+            f"var _row_by_id: Dictionary[{id_type}, int] = {{}}",
+        ]
+        
+        if indexes:
+            script_lines.extend(["", f"## 二级索引 (唯一索引: 键 -> 行号; 普通索引: 键 -> 行号数组; 复合键为数组)"])
+            for fields, unique in indexes:
+                key_type = field_types[fields[0]] if len(fields) == 1 else "Array"
+                value_type = "int" if unique else "Array"
+                script_lines.append(f"var index_by_{self.get_index_name(fields)}: Dictionary[{key_type}, {value_type}] = {{}}")
+        
+        script_lines.extend([
+            "",
+            f"## 加载数据（只建立ID和索引，不创建数据项）",
+            f"func load_data(json_path: String):",
+            *self.generate_json_parse_lines(sheet_name),
+            *self.generate_columnar_dispatch_lines(),
+            f"\t_records = records",
+            f"\t_columns = []",
+            f"\t_reset_rows(records.size())",
+        ])
         
+        if self.generate_columnar_loader:
+            script_lines.extend(self.generate_columnar_loader_lines(sheet_name, field_types, id_field, lazy=True))
+        
+        if self.generate_binary_loader:
+            script_lines.extend(self.generate_binary_loader_lines(sheet_name, field_types, id_field, lazy=True))
+        
+        if self.generate_shard_loader:
+            script_lines.extend(self.generate_shard_loader_lines(sheet_name, field_types, id_field, item_type, lazy=True))
+        
+        field_positions = {field_name: position for position, field_name in enumerate(field_types)}
+        
+        def key_expression(field_name: str) -> str:
+            # 从原始数据读取键字段，按字段类型转换，与数据项中的值一致
+            position = field_positions[field_name]
+            field_type = field_types[field_name]
+            value = f"_field_value(row, {position}, {self.get_default_value(field_type)})"
+            cast = {"int": "int", "float": "float", "String": "str", "bool": "bool"}.get(field_type)
+            return f"{cast}({value})" if cast else value
+        
+        script_lines.extend([
+            "",
+            f"## 重置缓存，按行建立ID和二级索引",
+            f"func _reset_rows(row_count: int):",
+            f"\t_row_count = 0",
+            f"\t_items.clear()",
+            f"\t_row_by_id.clear()",
+        ])
+        for fields, unique in indexes:
+            script_lines.append(f"\tindex_by_{self.get_index_name(fields)}.clear()")
+        script_lines.extend([
+            f"\t_index_rows(row_count)",
+            "",
+            f"## 把新增的行 (_row_count 到 row_count - 1) 加入ID和二级索引",
+            f"func _index_rows(row_count: int):",
+            f"\tvar first_row = _row_count",
+            f"\t_row_count = row_count",
+            f"\t_items.resize(row_count)",
+            f"\tfor row in range(first_row, row_count):",
+        ])
         if id_field:
-            gd_id_field = self.convert_to_gdscript_name(id_field)
-            script_lines.extend([
-                f"\t\tdata_dict[data_item.{gd_id_field}] = data_item"
-            ])
+            script_lines.append(f"\t\t_row_by_id[{key_expression(id_field)}] = row")
+        elif not indexes:
+            script_lines.append(f"\t\tpass")
+        
+        for fields, unique in indexes:
+            index_name = self.get_index_name(fields)
+            if len(fields) == 1:
+                key = key_expression(fields[0])
+            else:
+                key = "[" + ", ".join(key_expression(field) for field in fields) + "]"
+            
+            if unique:
+                script_lines.append(f"\t\tindex_by_{index_name}[{key}] = row")
+            else:
+                script_lines.extend([
+                    f"\t\tvar {index_name}_key = {key}",
+                    f"\t\tif not index_by_{index_name}.has({index_name}_key):",
+                    f"\t\t\tindex_by_{index_name}[{index_name}_key] = []",
+                    f"\t\tindex_by_{index_name}[{index_name}_key].append(row)",
+                ])
+        
+        script_lines.extend([
+            "",
+            f"## 读取原始数据中某行某列的值",
+            f"func _field_value(row: int, column: int, default_value: Variant = null) -> Variant:",
+            f"\tif _columns.is_empty():",
+            f"\t\treturn _records[row].get(FIELD_NAMES[column], default_value)",
+            f"\treturn _columns[column][row]",
+            "",
+            f"## 根据原始数据创建数据项",
+            f"func _create_item(row: int) -> {item_type}:",
+            f"\tif _columns.is_empty():",
+            f"\t\treturn DataScript.{data_class_name}.new(_records[row])",
+        ])
+        if self.is_optimized():
+            script_lines.append(f"\treturn DataScript.{data_class_name}.from_columns(_columns, row)")
+        else:
+            script_lines.append(f"\tvar data_item = DataScript.{data_class_name}.new()")
+            for position, field_name in enumerate(field_types):
+                script_lines.append(f"\tdata_item.{self.convert_to_gdscript_name(field_name)} = _columns[{position}][row]")
+            script_lines.append(f"\treturn data_item")
+        script_lines.extend([
+            "",
+            f"## 按行号获取数据项，首次访问时创建并缓存",
+            f"func get_at(row: int) -> {item_type}:",
+            f"\tvar data_item = _items[row]",
+            f"\tif data_item == null:",
+            f"\t\tdata_item = _create_item(row)",
+            f"\t\t_items[row] = data_item",
+            f"\treturn data_item",
+        ])
+        
+        for fields, unique in indexes:
+            index_name = self.get_index_name(fields)
+            gd_fields = [self.convert_to_gdscript_name(field) for field in fields]
+            parameters = ", ".join(f"{gd_field}: {field_types[field]}" for gd_field, field in zip(gd_fields, fields))
+            key = gd_fields[0] if len(fields) == 1 else "[" + ", ".join(gd_fields) + "]"
+            label = "、".join(fields)
+            
+            script_lines.append("")
+            if unique:
+                script_lines.extend([
+                    f"## 根据{label}获取数据 (唯一索引)",
+                    f"func get_by_{index_name}({parameters}) -> {item_type}:",
+                    f"\tvar row = index_by_{index_name}.get({key}, -1)",
+                    f"\treturn null if row < 0 else get_at(row)",
+                ])
+            else:
+                script_lines.extend([
+                    f"## 根据{label}获取所有匹配的数据",
+                    f"func get_by_{index_name}({parameters}) -> Array:",
+                    f"\tvar items = []",
+                    f"\tfor row in index_by_{index_name}.get({key}, []):",
+                    f"\t\titems.append(get_at(row))",
+                    f"\treturn items",
+                ])
         
         script_lines.extend([
             "",
             f"## 根据ID获取数据",
-            f"func get_by_id(id: {id_type}) -> Variant:",
-            f"\treturn data_dict.get(id, null)",
+            f"func get_by_id(id: {id_type}) -> {item_type}:",
+            f"\tvar row = _row_by_id.get(id, -1)",
+            f"\treturn null if row < 0 else get_at(row)",
             "",
-            f"## 获取所有数据",
-            f"func get_all() -> Array[Variant]:",
-            f"\treturn data_array",
+            f"## 获取所有数据（会创建全部数据项）",
+            f"func get_all() -> Array[{item_type}]:",
+            f"\tfor row in _row_count:",
+            f"\t\tget_at(row)",
+            f"\treturn _items",
             "",
             f"## 获取数据数量",
             f"func get_count() -> int:",
-            f"\treturn data_array.size()",
+            f"\treturn _row_count",
+            "",
+            f"## 释放已创建的数据项，之后访问时根据原始数据重新创建",
+            f"func release_cache():",
+            f"\t_items.fill(null)",
             "",
             f"## 创建新的数据项实例",
-            f"func create_data_item(data: Dictionary) -> Variant:",
+            f"func create_data_item(data: Dictionary) -> {item_type}:",
             f"\treturn DataScript.{data_class_name}.new(data)"
         ])
         
-        return "\n".join(script_lines)
+        return script_lines
+    
+    def generate_binary_loader_lines(self, sheet_name: str, field_types: Dict[str, str], id_field: Optional[str],
+                                     has_indexes: bool = False, lazy: bool = False) -> List[str]:
+        """
+        生成从二进制列式文件加载数据的 load_binary 函数
+        
+        二进制文件由 bytes_to_var 一次解码为按列存放的 Packed*Array，
+        加载时按行下标直接给字段赋值，不再经过JSON解析和中间字典。
+        
+        Args:
+            sheet_name (str): 表名
+            field_types (Dict[str, str]): 字段类型信息
+            id_field (str): ID字段名
+            has_indexes (bool): 是否需要把数据项加入二级索引
+            lazy (bool): 是否生成延迟加载器的版本（只保存列数据并建立索引）
+        
+        Returns:
+            List[str]: 脚本行
+        """
+        script_lines = [
+            "",
+            f"## 从二进制列式数据加载 (转换时启用binary_output生成的.bin文件)",
+            f"func load_binary(bin_path: String):",
+            f"\tvar bytes = FileAccess.get_file_as_bytes(bin_path)",
+            f"\tif bytes.is_empty():",
+            f'\t\tprint("无法打开文件: ", bin_path)',
+            f"\t\treturn",
+            f"\t",
+            f"\tvar binary_data = bytes_to_var(bytes)",
+            f'\tif typeof(binary_data) != TYPE_DICTIONARY or not binary_data.get("sheets", {{}}).has("{sheet_name}"):',
+            f'\t\tprint("二进制数据中没有找到{sheet_name}数据")',
+            f"\t\treturn",
+            f"\t",
+            f"\tvar sheet = binary_data[\"sheets\"][\"{sheet_name}\"]",
+            f"\tvar columns: PackedStringArray = sheet[\"columns\"]",
+        ]
+        script_lines.extend(self.generate_column_items_lines(sheet_name, field_types, id_field, has_indexes, lazy,
+                                                             "二进制数据", "sheet[\"data\"][column_index]"))
+        return script_lines
+    
+    def generate_columnar_dispatch_lines(self) -> List[str]:
+        """
+        生成 load_data 中把列式JSON布局的表交给 _load_columns 的语句（未启用列式布局时为空）
+        
+        Returns:
+            List[str]: 脚本行
+        """
+        if not self.generate_columnar_loader:
+            return []
+        return [
+            f"\tif typeof(records) == TYPE_DICTIONARY:",
+            f"\t\t_load_columns(records)",
+            f"\t\treturn",
+            f"\t",
+        ]
+    
+    def generate_columnar_loader_lines(self, sheet_name: str, field_types: Dict[str, str], id_field: Optional[str],
+                                       has_indexes: bool = False, lazy: bool = False) -> List[str]:
+        """
+        生成从列式JSON布局加载数据的 _load_columns 函数（转换时 json_layout = columnar）
+        
+        列式布局中每列只出现一次列名，低基数的字符串列按字典编码为 {"values": [...], "codes": [...]}。
+        加载时先把字典编码的列还原为数组，再与 load_binary 一样按行下标给字段赋值。
+        
+        Args:
+            sheet_name (str): 表名
+            field_types (Dict[str, str]): 字段类型信息
+            id_field (str): ID字段名
+            has_indexes (bool): 是否需要把数据项加入二级索引
+            lazy (bool): 是否生成延迟加载器的版本（只保存列数据并建立索引）
+        
+        Returns:
+            List[str]: 脚本行
+        """
+        script_lines = [
+            "",
+            f"## 还原字典编码的列 (values为不重复的值，codes为每行的值在values中的下标)",
+            f"static func _decode_column(column: Variant) -> Array:",
+            f"\tif typeof(column) != TYPE_DICTIONARY:",
+            f"\t\treturn column",
+            f"\tvar values: Array = column[\"values\"]",
+            f"\tvar codes: Array = column[\"codes\"]",
+            f"\tvar decoded = []",
+            f"\tdecoded.resize(codes.size())",
+            f"\tfor i in codes.size():",
+            f"\t\tdecoded[i] = values[int(codes[i])]",
+            f"\treturn decoded",
+            "",
+            f"## 从列式JSON布局加载 (转换时 json_layout = columnar)",
+            f"func _load_columns(sheet: Dictionary):",
+            f"\tvar columns: Array = sheet[\"columns\"]",
+        ]
+        script_lines.extend(self.generate_column_items_lines(sheet_name, field_types, id_field, has_indexes, lazy,
+                                                             "列式JSON", "_decode_column(sheet[\"data\"][column_index])"))
+        return script_lines
+    
+    def generate_column_items_lines(self, sheet_name: str, field_types: Dict[str, str], id_field: Optional[str],
+                                    has_indexes: bool, lazy: bool, source: str, column_expression: str) -> List[str]:
+        """
+        生成按列名找到字段对应的列并按行创建数据项的语句（二进制和列式JSON加载共用）
+        
+        调用前局部变量 sheet 为表数据，columns 为列名数组。
+        
+        Args:
+            sheet_name (str): 表名
+            field_types (Dict[str, str]): 字段类型信息
+            id_field (str): ID字段名
+            has_indexes (bool): 是否需要把数据项加入二级索引
+            lazy (bool): 是否生成延迟加载器的版本（只保存列数据并建立索引）
+            source (str): 数据来源名称，用于缺少列时的提示
+            column_expression (str): 由列下标 column_index 取得列数组的表达式
+        
+        Returns:
+            List[str]: 脚本行
+        """
+        data_class_name = self.get_data_class_name(sheet_name)
+        column_names = ", ".join(json.dumps(str(field_name), ensure_ascii=False) for field_name in field_types)
+        
+        script_lines = [
+            f"\tvar field_columns = []",
+            f"\tfor column_name in [{column_names}]:",
+            f"\t\tvar column_index = columns.find(column_name)",
+            f"\t\tif column_index < 0:",
+            f'\t\t\tprint("{source}中缺少列: ", column_name)',
+            f"\t\t\treturn",
+            f"\t\tfield_columns.append({column_expression})",
+            f"\t",
+        ]
+        
+        if lazy:
+            script_lines.extend([
+                f"\t_records = []",
+                f"\t_columns = field_columns",
+                f"\t_reset_rows(int(sheet[\"row_count\"]))",
+            ])
+            return script_lines
+        
+        script_lines.append(f"\tfor i in int(sheet[\"row_count\"]):")
+        
+        if self.is_optimized():
+            script_lines.append(f"\t\tvar data_item = DataScript.{data_class_name}.from_columns(field_columns, i)")
+        else:
+            script_lines.append(f"\t\tvar data_item = DataScript.{data_class_name}.new()")
+            for column_index, field_name in enumerate(field_types):
+                gd_field_name = self.convert_to_gdscript_name(field_name)
+                script_lines.append(f"\t\tdata_item.{gd_field_name} = field_columns[{column_index}][i]")
+        
+        script_lines.append(f"\t\tdata_array.append(data_item)")
+        
+        if id_field:
+            gd_id_field = self.convert_to_gdscript_name(id_field)
+            script_lines.append(f"\t\tdata_dict[data_item.{gd_id_field}] = data_item")
+        
+        if has_indexes:
+            script_lines.append(f"\t\t_index_item(data_item)")
+        
+        return script_lines
+    
+    def generate_shard_loader_lines(self, sheet_name: str, field_types: Dict[str, str], id_field: Optional[str],
+                                    item_type: str = "Variant", lazy: bool = False) -> List[str]:
+        """
+        生成按需加载分片JSON的函数
+        
+        分片清单 (shards.json) 记录了每个工作表的分片文件和各分片的ID范围，
+        加载器打开清单后可以只加载需要的分片，或在按ID查询时自动加载所在分片。
+        
+        Args:
+            sheet_name (str): 表名
+            field_types (Dict[str, str]): 字段类型信息
+            id_field (str): ID字段名，没有ID字段时不生成按ID加载的函数
+            item_type (str): 数据项类型
+            lazy (bool): 是否生成延迟加载器的版本（追加原始记录并建立索引）
+        
+        Returns:
+            List[str]: 脚本行
+        """
+        id_type = field_types.get(id_field, "int") if id_field else "int"
+        
+        script_lines = [
+            "",
+            f"## 分片加载 (转换时启用shard_output生成的分片清单)",
+            f"var _shard_dir: String = \"\"",
+            f"var _shards: Array = []",
+            f"var _loaded_shards: Dictionary[int, bool] = {{}}",
+            "",
+            f"## 打开分片清单，之后按需加载分片",
+            f"func open_shards(manifest_path: String) -> bool:",
+            f"\tvar file = FileAccess.open(manifest_path, FileAccess.READ)",
+            f"\tif file == null:",
+            f'\t\tprint("无法打开文件: ", manifest_path)',
+            f"\t\treturn false",
+            f"\t",
+            f"\tvar manifest = JSON.parse_string(file.get_as_text())",
+            f"\tfile.close()",
+            f'\tif typeof(manifest) != TYPE_DICTIONARY or not manifest.get("sheets", {{}}).has("{sheet_name}"):',
+            f'\t\tprint("分片清单中没有找到{sheet_name}数据")',
+            f"\t\treturn false",
+            f"\t",
+            f"\t_shard_dir = manifest_path.get_base_dir()",
+            f"\t_shards = manifest[\"sheets\"][\"{sheet_name}\"][\"shards\"]",
+            f"\t_loaded_shards.clear()",
+            f"\treturn true",
+            "",
+            f"## 获取分片数量",
+            f"func get_shard_count() -> int:",
+            f"\treturn _shards.size()",
+            "",
+            f"## 加载指定分片，已加载的分片会跳过",
+            f"func load_shard(shard_index: int):",
+            f"\tif _loaded_shards.has(shard_index):",
+            f"\t\treturn",
+            f"\t_loaded_shards[shard_index] = true",
+        ]
+        
+        if lazy:
+            script_lines.extend([
+                f"\t_append_shard(_shard_dir.path_join(_shards[shard_index][\"file\"]))",
+                "",
+                f"## 追加分片中的原始记录并建立ID和索引",
+                f"func _append_shard(json_path: String):",
+                *self.generate_json_parse_lines(sheet_name),
+                f"\tif not _columns.is_empty():",
+                f"\t\t_columns = []",
+                f"\t\t_reset_rows(0)",
+                f"\t_records.append_array(records)",
+                f"\t_index_rows(_records.size())",
+            ])
+        else:
+            # load_data 会把记录追加到已加载的数据中
+            script_lines.append(f"\tload_data(_shard_dir.path_join(_shards[shard_index][\"file\"]))")
+        
+        script_lines.extend([
+            "",
+            f"## 加载全部分片",
+            f"func load_all_shards():",
+            f"\tfor shard_index in _shards.size():",
+            f"\t\tload_shard(shard_index)",
+        ])
+        
+        if id_field:
+            script_lines.extend([
+                "",
+                f"## 加载ID范围包含指定ID的分片（没有ID范围的分片也会加载），返回是否有匹配的分片",
+                f"func load_shard_for_id(id: {id_type}) -> bool:",
+                f"\tvar found = false",
+                f"\tfor shard_index in _shards.size():",
+                f"\t\tvar shard = _shards[shard_index]",
+                f'\t\tif not shard.has("min_id") or (id >= shard["min_id"] and id <= shard["max_id"]):',
+                f"\t\t\tload_shard(shard_index)",
+                f"\t\t\tfound = true",
+                f"\treturn found",
+                "",
+                f"## 根据ID获取数据，所在分片未加载时先加载",
+                f"func fetch_by_id(id: {id_type}) -> {item_type}:",
+                f"\tvar data_item = get_by_id(id)",
+                f"\tif data_item == null and load_shard_for_id(id):",
+                f"\t\tdata_item = get_by_id(id)",
+                f"\treturn data_item",
+            ])
+        
+        return script_lines
+    
+    def get_index_specs(self, sheet_name: str, field_types: Dict[str, str],
+                        id_field: Optional[str] = None) -> List[Tuple[List[str], bool]]:
+        """
+        读取配置文件 [INDEXES] 节中该表的二级索引声明
+        
+        格式为 `表名 = 索引1, 索引2, ...`：多个字段用 + 组成复合键，字段前加 ! 表示唯一索引。
+        例如 `items = type, !name, type+quality`。
+        
+        Args:
+            sheet_name (str): 表名
+            field_types (Dict[str, str]): 字段类型信息
+            id_field (str): ID字段名，与ID相同的单字段索引会被忽略
+        
+        Returns:
+            List[Tuple[List[str], bool]]: [(字段列表, 是否唯一)]
+        """
+        if not self.config.has_section('INDEXES'):
+            return []
+        
+        declaration = self.config.get('INDEXES', sheet_name, fallback='').strip()
+        if not declaration or sheet_name.lower() in self.config.defaults():
+            return []
+        
+        indexes = []
+        seen_names = set()
+        for spec in declaration.split(','):
+            spec = spec.strip()
+            if not spec:
+                continue
+            unique = spec.startswith('!')
+            fields = [field.strip() for field in spec.lstrip('!').split('+') if field.strip()]
+            
+            missing = [field for field in fields if field not in field_types]
+            if not fields or missing:
+                logger.warning(f"表 {sheet_name} 的索引 {spec} 引用了不存在的字段: {', '.join(missing)}")
+                continue
+            if fields == [id_field]:
+                logger.warning(f"表 {sheet_name} 的索引 {spec} 与ID字段相同，已有 get_by_id")
+                continue
+            
+            index_name = self.get_index_name(fields)
+            if index_name in seen_names:
+                logger.warning(f"表 {sheet_name} 的索引 {spec} 重复声明")
+                continue
+            seen_names.add(index_name)
+            indexes.append((fields, unique))
+        
+        return indexes
+    
+    def get_index_name(self, fields: List[str]) -> str:
+        """获取索引名（字段名的GDScript形式，用 _and_ 连接）"""
+        return "_and_".join(self.convert_to_gdscript_name(field) for field in fields)
+    
+    def generate_index_declarations(self, field_types: Dict[str, str], indexes: List[Tuple[List[str], bool]],
+                                    item_type: str = "Variant") -> List[str]:
+        """
+        生成二级索引字典的声明
+        
+        Args:
+            field_types (Dict[str, str]): 字段类型信息
+            indexes (List[Tuple[List[str], bool]]): 索引声明
+            item_type (str): 数据项类型
+        
+        Returns:
+            List[str]: 脚本行
+        """
+        if not indexes:
+            return []
+        
+        script_lines = ["", f"## 二级索引 (唯一索引: 键 -> 数据项; 普通索引: 键 -> 数据项数组; 复合键为数组)"]
+        for fields, unique in indexes:
+            key_type = field_types[fields[0]] if len(fields) == 1 else "Array"
+            value_type = item_type if unique else "Array"
+            script_lines.append(f"var index_by_{self.get_index_name(fields)}: Dictionary[{key_type}, {value_type}] = {{}}")
+        return script_lines
+    
+    def generate_index_lines(self, field_types: Dict[str, str], indexes: List[Tuple[List[str], bool]],
+                             item_type: str = "Variant") -> List[str]:
+        """
+        生成维护二级索引的 _index_item 函数和 get_by_<字段> 查询函数
+        
+        Args:
+            field_types (Dict[str, str]): 字段类型信息
+            indexes (List[Tuple[List[str], bool]]): 索引声明
+            item_type (str): 数据项类型
+        
+        Returns:
+            List[str]: 脚本行
+        """
+        script_lines = [
+            "",
+            f"## 把数据项加入二级索引",
+            f"func _index_item(data_item: {item_type}) -> void:",
+        ]
+        
+        for fields, unique in indexes:
+            index_var = f"index_by_{self.get_index_name(fields)}"
+            gd_fields = [self.convert_to_gdscript_name(field) for field in fields]
+            if len(fields) == 1:
+                key = f"data_item.{gd_fields[0]}"
+            else:
+                key = "[" + ", ".join(f"data_item.{gd_field}" for gd_field in gd_fields) + "]"
+            
+            if unique:
+                script_lines.append(f"\t{index_var}[{key}] = data_item")
+            else:
+                key_var = f"{self.get_index_name(fields)}_key"
+                script_lines.extend([
+                    f"\tvar {key_var} = {key}",
+                    f"\tif not {index_var}.has({key_var}):",
+                    f"\t\t{index_var}[{key_var}] = []",
+                    f"\t{index_var}[{key_var}].append(data_item)",
+                ])
+        
+        for fields, unique in indexes:
+            index_name = self.get_index_name(fields)
+            gd_fields = [self.convert_to_gdscript_name(field) for field in fields]
+            parameters = ", ".join(f"{gd_field}: {field_types[field]}" for gd_field, field in zip(gd_fields, fields))
+            key = gd_fields[0] if len(fields) == 1 else "[" + ", ".join(gd_fields) + "]"
+            label = "、".join(fields)
+            
+            script_lines.append("")
+            if unique:
+                script_lines.extend([
+                    f"## 根据{label}获取数据 (唯一索引)",
+                    f"func get_by_{index_name}({parameters}) -> {item_type}:",
+                    f"\treturn index_by_{index_name}.get({key}, null)",
+                ])
+            else:
+                script_lines.extend([
+                    f"## 根据{label}获取所有匹配的数据 (返回的数组为索引内部数据，请勿修改)",
+                    f"func get_by_{index_name}({parameters}) -> Array:",
+                    f"\treturn index_by_{index_name}.get({key}, [])",
+                ])
+        
+        return script_lines
     
     def find_id_field(self, field_types: Dict[str, str]) -> str:
         """
@@ -479,13 +1219,16 @@ class GDScriptGenerator:
             # 回退到默认路径
             return f"res://scripts/generated/{data_class_dir}/{data_filename}"
     
-    def generate_scripts_from_json(self, json_file: Path, output_dir: Optional[Path] = None) -> None:
+    def generate_scripts_from_json(self, json_file: Path, output_dir: Optional[Path] = None) -> List[Path]:
         """
         从JSON文件生成GDScript脚本
         
         Args:
             json_file (Path): JSON文件路径
             output_dir (Path): 输出目录
+        
+        Returns:
+            List[Path]: 生成的脚本文件路径列表
         """
         if output_dir is None:
             output_dir = Path(self.config.get('GDSCRIPT', 'gdscript_output_dir'))
@@ -498,47 +1241,71 @@ class GDScriptGenerator:
             # 分析数据结构
             sheets_structure = self.analyze_json_structure(json_data)
             
-            if not sheets_structure:
-                logger.warning(f"JSON文件 {json_file} 中没有找到有效的数据结构")
-                return
+            return self.generate_scripts_from_structure(sheets_structure, output_dir, json_file.stem)
+            
+        except Exception as e:
+            logger.error(f"生成GDScript脚本失败: {str(e)}")
+            raise
+    
+    def generate_scripts_from_structure(self, sheets_structure: Dict[str, Dict[str, str]],
+                                        output_dir: Optional[Path] = None, source_name: str = "") -> List[Path]:
+        """
+        根据已推断的字段类型信息生成GDScript脚本，无需重新读取JSON文件
+        
+        Args:
+            sheets_structure (Dict[str, Dict[str, str]]): 每个表的字段类型信息
+            output_dir (Path): 输出目录
+            source_name (str): 数据来源名称，用于日志
+        
+        Returns:
+            List[Path]: 生成的脚本文件路径列表
+        """
+        if output_dir is None:
+            output_dir = Path(self.config.get('GDSCRIPT', 'gdscript_output_dir'))
+        
+        if not sheets_structure:
+            logger.warning(f"{source_name} 中没有找到有效的数据结构")
+            return []
+        
+        # 创建输出目录
+        data_dir = output_dir / self.config.get('GDSCRIPT', 'data_class_dir', fallback='data')
+        loader_dir = output_dir / self.config.get('GDSCRIPT', 'loader_class_dir', fallback='loader')
+        
+        data_dir.mkdir(parents=True, exist_ok=True)
+        loader_dir.mkdir(parents=True, exist_ok=True)
+        
+        generated_files = []
+        
+        # 生成脚本文件
+        for sheet_name, field_types in sheets_structure.items():
+            if not field_types:  # 跳过空表
+                continue
+            
+            # 生成数据类脚本
+            data_script = self.generate_data_class(sheet_name, field_types)
+            data_filename = self.get_data_class_filename(sheet_name)
+            data_file_path = data_dir / data_filename
             
-            # 创建输出目录
-            data_dir = output_dir / self.config.get('GDSCRIPT', 'data_class_dir', fallback='data')
-            loader_dir = output_dir / self.config.get('GDSCRIPT', 'loader_class_dir', fallback='loader')
+            # 内容未变化时保留原文件，避免Godot重新导入
+            with atomic_open(data_file_path) as f:
+                f.write(data_script)
             
-            data_dir.mkdir(parents=True, exist_ok=True)
-            loader_dir.mkdir(parents=True, exist_ok=True)
+            generated_files.append(data_file_path)
+            logger.info(f"生成数据类脚本: {data_file_path}")
             
-            # 生成脚本文件
-            for sheet_name, field_types in sheets_structure.items():
-                if not field_types:  # 跳过空表
-                    continue
-                
-                # 生成数据类脚本
-                data_script = self.generate_data_class(sheet_name, field_types)
-                data_filename = self.get_data_class_filename(sheet_name)
-                data_file_path = data_dir / data_filename
-                
-                with open(data_file_path, 'w', encoding='utf-8') as f:
-                    f.write(data_script)
-                
-                logger.info(f"生成数据类脚本: {data_file_path}")
-                
-                # 生成加载器类脚本
-                loader_script = self.generate_loader_class(sheet_name, field_types, output_dir)
-                loader_filename = self.get_loader_class_filename(sheet_name)
-                loader_file_path = loader_dir / loader_filename
-                
-                with open(loader_file_path, 'w', encoding='utf-8') as f:
-                    f.write(loader_script)
-                
-                logger.info(f"生成加载器类脚本: {loader_file_path}")
+            # 生成加载器类脚本
+            loader_script = self.generate_loader_class(sheet_name, field_types, output_dir)
+            loader_filename = self.get_loader_class_filename(sheet_name)
+            loader_file_path = loader_dir / loader_filename
             
-            logger.info(f"成功生成 {json_file.stem} 的GDScript脚本")
+            with atomic_open(loader_file_path) as f:
+                f.write(loader_script)
             
-        except Exception as e:
-            logger.error(f"生成GDScript脚本失败: {str(e)}")
-            raise
+            generated_files.append(loader_file_path)
+            logger.info(f"生成加载器类脚本: {loader_file_path}")
+        
+        logger.info(f"成功生成 {source_name} 的GDScript脚本")
+        return generated_files
     
     def batch_generate_from_directory(self, json_dir: Path, output_dir: Optional[Path] = None) -> None:
         """
@@ -574,6 +1341,105 @@ class GDScriptGenerator:
         logger.info(f"批量生成完成！成功: {success_count}, 失败: {error_count}")
 
 
+class StructureTracker:
+    """
+    增量字段类型推断器
+    
+    在记录流经时推断每个表的字段类型，规则与 analyze_json_structure 相同：
+    字段取自第一条记录，后续记录中类型不一致时取公共类型。
+    稀疏记录（省略了null字段的JSON）中缺少的字段按null处理，推断为Variant。
+    """
+    
+    def __init__(self, generator: GDScriptGenerator):
+        """
+        初始化推断器
+        
+        Args:
+            generator (GDScriptGenerator): 提供类型推断规则的生成器
+        """
+        self.generator = generator
+        self.sheets_structure: Dict[str, Dict[str, str]] = {}
+        # 已通过列类型推断得到的表结构，这些表的记录无需逐条检查
+        self.known_structures: Dict[str, Optional[Dict[str, str]]] = {}
+    
+    def provide(self, sheet_name: str, field_types: Optional[Dict[str, str]]) -> None:
+        """
+        提供预先推断好的表结构（如来自DataFrame的列类型）
+        
+        Args:
+            sheet_name (str): 表名
+            field_types (Optional[Dict[str, str]]): 字段类型信息，空表为None
+        """
+        self.known_structures[sheet_name] = field_types
+    
+    def track(self, sheets: Iterable[Tuple[str, Iterable[Dict[str, Any]]]]) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+        """
+        包装 (工作表名称, 记录迭代器) 序列，记录被消费时同步推断类型
+        
+        Args:
+            sheets (Iterable[Tuple[str, Iterable[Dict[str, Any]]]]): 工作表序列
+        
+        Yields:
+            Tuple[str, Iterator[Dict[str, Any]]]: 原样产出的工作表名称和记录
+        """
+        for sheet_name, records in sheets:
+            if sheet_name in self.known_structures:
+                field_types = self.known_structures.pop(sheet_name)
+                if field_types is not None:
+                    self.sheets_structure[sheet_name] = field_types
+                yield sheet_name, records
+            else:
+                yield sheet_name, self.track_records(sheet_name, records)
+    
+    def track_records(self, sheet_name: str, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        逐条产出记录并推断类型，记录迭代完毕后结果写入 sheets_structure
+        
+        Args:
+            sheet_name (str): 表名
+            records (Iterable[Dict[str, Any]]): 记录
+        
+        Yields:
+            Dict[str, Any]: 原样产出的记录
+        """
+        infer = self.generator.infer_gdscript_type
+        field_types = None
+        check_records = True
+        
+        for record in records:
+            if field_types is None:
+                # 分析第一条记录的字段类型，第一条记录不是字典时不推断字段
+                field_types = {}
+                check_records = isinstance(record, dict)
+                if check_records:
+                    for field_name, value in record.items():
+                        field_types[field_name] = infer(value)
+            elif check_records and isinstance(record, dict):
+                # 检查其他记录以确保类型一致性
+                for field_name, value in record.items():
+                    current_type = field_types.get(field_name)
+                    if current_type is None:
+                        # 之前的稀疏记录中缺少该字段（即为null）
+                        field_types[field_name] = "Variant"
+                    # 已经是Variant的字段不会再变化，跳过检查
+                    elif current_type != "Variant":
+                        inferred_type = infer(value)
+                        # 如果类型不一致，使用更通用的类型
+                        if current_type != inferred_type:
+                            field_types[field_name] = self.generator.get_common_type(
+                                current_type, inferred_type
+                            )
+                # 稀疏记录中缺少的字段为null
+                if len(record) < len(field_types):
+                    for field_name in field_types:
+                        if field_name not in record:
+                            field_types[field_name] = "Variant"
+            yield record
+        
+        if field_types is not None:
+            self.sheets_structure[sheet_name] = field_types
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='GDScript自动生成工具')
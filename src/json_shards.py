@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON分片写入
+
+把每个工作表写成单独的JSON文件，可再按行数切分为多个分片，并写出分片清单，
+游戏中只需加载用到的表（或包含某个ID的分片），不必解析整个工作簿的JSON。
+
+每个分片文件的格式与整表JSON相同（{"工作表": [记录]}），生成的加载器的 load_data 可以直接加载。
+分片清单 shards.json 的格式:
+
+    {
+      "version": 1,
+      "sheets": {
+        "工作表": {
+          "id_field": "ID",
+          "rows": 总行数,
+          "shards": [{"file": "工作表.0.json", "rows": 行数, "min_id": 最小ID, "max_id": 最大ID}]
+        }
+      }
+    }
+
+ID不是统一的数字或字符串时分片不包含 min_id / max_id。
+"""
+
+import re
+import json
+from contextlib import ExitStack, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, IO
+
+from json_writer import FragmentSink, JsonStreamWriter, RawJson, atomic_open
+
+# 分片清单格式版本，格式不兼容时递增
+SHARD_MANIFEST_VERSION = 1
+
+# 分片清单文件名（保存在工作簿的分片目录中）
+SHARD_MANIFEST_FILENAME = 'shards.json'
+
+# 用于记录分片ID范围的字段名，与GDScript加载器查找ID字段的顺序一致；都没有时使用第一列
+ID_FIELD_CANDIDATES = ('ID', 'id', 'Id', 'key', 'Key', 'index', 'Index')
+
+
+def find_id_key(record: Dict[str, Any]) -> Optional[str]:
+    """
+    查找记录中的ID字段
+
+    Args:
+        record (Dict[str, Any]): 记录
+
+    Returns:
+        Optional[str]: ID字段名，记录为空时为None
+    """
+    for candidate in ID_FIELD_CANDIDATES:
+        if candidate in record:
+            return candidate
+    return next(iter(record), None)
+
+
+def _id_kind(value: Any) -> Optional[str]:
+    """ID值的可比较类别，不能比较时为None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    return None
+
+
+class ShardedJsonWriter:
+    """把工作表写成分片JSON文件和分片清单的写入器"""
+
+    def __init__(self, writer: JsonStreamWriter, shard_rows: int = 0):
+        """
+        初始化写入器
+
+        Args:
+            writer (JsonStreamWriter): 提供缩进、编码器和分块大小的JSON写入器
+            shard_rows (int): 每个分片的最大行数，0表示每个工作表一个文件
+        """
+        self.writer = writer
+        self.shard_rows = shard_rows
+
+    def write(self, sheets: Iterable[Tuple[str, Any]], shard_dir: Path, encoding: str = 'utf-8',
+              fragments: Optional[FragmentSink] = None,
+              file_wrapper: Optional[Callable[[IO[str]], IO[str]]] = None) -> List[Path]:
+        """
+        写出分片文件和分片清单
+
+        Args:
+            sheets (Iterable[Tuple[str, Any]]): (工作表名称, 记录迭代器) 序列；值为RawJson时先解析再分片
+            shard_dir (Path): 分片目录
+            encoding (str): 文件编码
+            fragments (FragmentSink, optional): 传入时把每个新序列化工作表的整表JSON片段写入其中
+            file_wrapper (Callable, optional): 包装输出文件对象（如统计写入耗时）
+
+        Returns:
+            List[Path]: 生成的分片文件和清单文件
+        """
+        shard_dir = Path(shard_dir)
+
+        manifest = {'version': SHARD_MANIFEST_VERSION, 'sheets': {}}
+        outputs = []
+        used_names = set()
+
+        for sheet_name, records in sheets:
+            # 缓存的工作表只有整表JSON片段，解析后重新分片
+            cached = isinstance(records, RawJson)
+            if cached:
+                records = json.loads(records)
+
+            base_name = self._shard_basename(sheet_name, used_names)
+            with fragments.open(sheet_name) if fragments is not None and not cached else nullcontext() as fragment:
+                entry = self._write_sheet(sheet_name, records, shard_dir, base_name, encoding,
+                                          fragment, file_wrapper)
+            manifest['sheets'][sheet_name] = entry
+            outputs.extend(shard_dir / shard['file'] for shard in entry['shards'])
+
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        manifest_file = shard_dir / SHARD_MANIFEST_FILENAME
+        with atomic_open(manifest_file, encoding=encoding) as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        outputs.append(manifest_file)
+
+        return outputs
+
+    def _shard_basename(self, sheet_name: str, used_names: set) -> str:
+        """由工作表名称生成不重复的分片文件名前缀"""
+        base_name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', sheet_name).strip(' .') or 'sheet'
+        if base_name.lower() == Path(SHARD_MANIFEST_FILENAME).stem:
+            base_name += '_'
+
+        unique_name = base_name
+        suffix = 1
+        while unique_name.lower() in used_names:
+            unique_name = f"{base_name}_{suffix}"
+            suffix += 1
+        used_names.add(unique_name.lower())
+        return unique_name
+
+    def _shard_filename(self, base_name: str, shard_index: int) -> str:
+        """获取分片文件名，按行切分时带分片序号"""
+        return f"{base_name}.{shard_index}.json" if self.shard_rows else f"{base_name}.json"
+
+    def _write_sheet(self, sheet_name: str, records: Any, shard_dir: Path, base_name: str, encoding: str,
+                     fragment: Optional[IO[str]],
+                     file_wrapper: Optional[Callable[[IO[str]], IO[str]]]) -> Dict[str, Any]:
+        """
+        写出一个工作表的分片，fragment不为None时同时写入整表JSON片段
+
+        Returns:
+            Dict[str, Any]: 清单中该工作表的条目
+        """
+        writer = self.writer
+        newline, outer, inner = writer.newline, writer.outer, writer.inner
+        header = f"{{{newline}{outer}{writer.encoder.encode(sheet_name)}{writer.colon}"
+
+        def open_shard(stack: ExitStack, shard_index: int) -> IO[str]:
+            # 读取出错时不留下空的分片目录
+            shard_dir.mkdir(parents=True, exist_ok=True)
+            f = stack.enter_context(atomic_open(shard_dir / self._shard_filename(base_name, shard_index),
+                                                encoding=encoding))
+            f = file_wrapper(f) if file_wrapper else f
+            f.write(header)
+            return f
+
+        # 非列表值（如元数据字典）整体写成一个文件
+        if isinstance(records, (dict, str)) or not hasattr(records, '__iter__'):
+            with ExitStack() as stack:
+                f = open_shard(stack, 0)
+                text = writer.encode(records).replace('\n', '\n' + outer)
+                f.write(text + newline + '}')
+            if fragment is not None:
+                fragment.write(text)
+            return {'id_field': None, 'rows': None,
+                    'shards': [{'file': self._shard_filename(base_name, 0), 'rows': None}]}
+
+        shards: List[Dict[str, Any]] = []
+        pieces: List[str] = []
+        id_field = None
+        total = 0
+
+        with ExitStack() as stack:
+            f = None
+            shard = None
+            chunk: List[str] = []
+            id_kind = None
+
+            def close_shard() -> None:
+                f.write(''.join(chunk) + f"{newline}{outer}]{newline}}}")
+                chunk.clear()
+                if not shard.pop('comparable'):
+                    shard.pop('min_id', None)
+                    shard.pop('max_id', None)
+                stack.close()
+
+            for record in records:
+                if shard is None:
+                    f = open_shard(stack, len(shards))
+                    shard = {'file': self._shard_filename(base_name, len(shards)), 'rows': 0, 'comparable': True}
+                    shards.append(shard)
+                    id_kind = None
+
+                if id_field is None and isinstance(record, dict):
+                    id_field = find_id_key(record)
+
+                body = newline + inner + writer.encode(record).replace('\n', '\n' + inner)
+                chunk.append(('[' if shard['rows'] == 0 else ',') + body)
+                if fragment is not None:
+                    pieces.append(('[' if total == 0 else ',') + body)
+
+                # 记录分片的ID范围，ID类型不统一时不记录
+                if shard['comparable']:
+                    value = record.get(id_field) if isinstance(record, dict) else None
+                    kind = _id_kind(value)
+                    if kind is None or (id_kind is not None and kind != id_kind):
+                        shard['comparable'] = False
+                    else:
+                        id_kind = kind
+                        shard['min_id'] = value if 'min_id' not in shard else min(shard['min_id'], value)
+                        shard['max_id'] = value if 'max_id' not in shard else max(shard['max_id'], value)
+
+                shard['rows'] += 1
+                total += 1
+
+                if len(chunk) >= writer.chunk_size:
+                    f.write(''.join(chunk))
+                    chunk.clear()
+                if len(pieces) >= writer.chunk_size:
+                    fragment.write(''.join(pieces))
+                    pieces.clear()
+
+                if self.shard_rows and shard['rows'] >= self.shard_rows:
+                    close_shard()
+                    shard = None
+
+            if shard is not None:
+                close_shard()
+
+            # 空表也写出一个分片，保证加载器总能找到文件
+            if not shards:
+                f = open_shard(stack, 0)
+                f.write('[]' + newline + '}')
+                shards.append({'file': self._shard_filename(base_name, 0), 'rows': 0})
+
+        if fragment is not None:
+            fragment.write('[]' if total == 0 else ''.join(pieces) + f"{newline}{outer}]")
+
+        return {'id_field': id_field, 'rows': total, 'shards': shards}
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON流式写入工具
+
+按工作表逐条写出记录，输出格式与 json.dump(data, ensure_ascii=False, indent=2)
+（或配置的缩进/紧凑格式）完全一致，内存占用与表的大小无关。写入先落到临时文件，完成后原子替换目标文件，
+中途崩溃不会留下半截的JSON文件；内容与已有文件相同时保留原文件不动，
+修改时间不变，Godot不会重新导入，版本控制和CI缓存也不会失效。
+
+在 defer_writes 代码块内，atomic_open 仍然流式写入临时文件，只把最后的提交（与已有文件比较、原子替换）
+交给 WritePipeline 的后台线程，调用方可以继续读取下一个工作簿，提交与解析同时进行，内存占用仍与表的大小无关。
+"""
+
+import os
+import json
+import logging
+import threading
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, IO
+
+logger = logging.getLogger(__name__)
+
+
+class WriteLog:
+    """记录原子写入的文件中内容有变化（已替换）和内容相同（已跳过）的文件"""
+
+    def __init__(self):
+        self.changed: List[Path] = []
+        self.unchanged: List[Path] = []
+
+    def merge(self, other: 'WriteLog') -> None:
+        """并入另一份记录（如嵌套记录或来自工作进程的记录）"""
+        self.changed.extend(other.changed)
+        self.unchanged.extend(other.unchanged)
+
+
+# 当前的写入记录，由 record_writes 设置
+_current_write_log: ContextVar[Optional[WriteLog]] = ContextVar('current_write_log', default=None)
+
+
+@contextmanager
+def record_writes(merge: bool = True) -> Iterator[WriteLog]:
+    """
+    记录代码块内所有 atomic_open 写入的结果
+
+    Args:
+        merge (bool): 代码块结束时是否并入外层记录；后台写入的结果需在写完后用 merge_write_log 并入
+
+    Yields:
+        WriteLog: 写入记录，代码块结束后完整
+    """
+    write_log = WriteLog()
+    outer = _current_write_log.get()
+    token = _current_write_log.set(write_log)
+    try:
+        yield write_log
+    finally:
+        _current_write_log.reset(token)
+        if merge and outer is not None:
+            outer.merge(write_log)
+
+
+class WritePipeline:
+    """
+    后台提交线程池
+
+    atomic_open 写完的临时文件由提交线程与已有文件比较并原子替换目标文件。
+    等待提交的临时文件总大小超过上限时提交方阻塞（背压），磁盘上的临时文件不会随读取速度无限增长；
+    同一文件的多次提交按提交顺序进行。
+    """
+
+    def __init__(self, workers: int = 2, max_pending_bytes: int = 64 * 1024 * 1024):
+        """
+        初始化提交线程池
+
+        Args:
+            workers (int): 提交线程数
+            max_pending_bytes (int): 等待提交的临时文件总大小上限（字节）
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='writer')
+        self.max_pending_bytes = max_pending_bytes
+        self.pending_bytes = 0
+        self.condition = threading.Condition()
+        self.last_writes: Dict[Path, Future] = {}
+
+    def __enter__(self) -> 'WritePipeline':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def submit(self, output_file: Path, temp_file: Path, skip_unchanged: bool = True,
+               write_log: Optional[WriteLog] = None) -> Future:
+        """
+        提交一个已写完的临时文件
+
+        Args:
+            output_file (Path): 目标文件路径
+            temp_file (Path): 内容已完整写入的临时文件
+            skip_unchanged (bool): 内容未变化时是否跳过替换
+            write_log (WriteLog, optional): 写入结果记录到该记录中
+
+        Returns:
+            Future: 提交完成时结束，失败时包含异常
+        """
+        size = os.path.getsize(temp_file)
+        with self.condition:
+            # 单个超过上限的文件也允许提交，否则会永远等待
+            while self.pending_bytes and self.pending_bytes + size > self.max_pending_bytes:
+                self.condition.wait()
+            self.pending_bytes += size
+
+        previous = self.last_writes.get(output_file)
+        future = self.executor.submit(self._commit, output_file, temp_file, skip_unchanged,
+                                      write_log, previous, size)
+        self.last_writes = {path: f for path, f in self.last_writes.items() if not f.done()}
+        self.last_writes[output_file] = future
+        return future
+
+    def _commit(self, output_file: Path, temp_file: Path, skip_unchanged: bool,
+                write_log: Optional[WriteLog], previous: Optional[Future], size: int) -> None:
+        """在提交线程中用临时文件替换目标文件"""
+        try:
+            # 先提交的同一文件先完成，结果与串行写入相同
+            if previous is not None:
+                wait([previous])
+            token = _current_write_log.set(write_log)
+            try:
+                _commit_temp_file(temp_file, output_file, skip_unchanged)
+            finally:
+                _current_write_log.reset(token)
+        finally:
+            with self.condition:
+                self.pending_bytes -= size
+                self.condition.notify_all()
+
+    def close(self) -> None:
+        """等待所有提交完成并关闭提交线程"""
+        self.executor.shutdown(wait=True)
+
+
+class WriteBatch:
+    """一组交给后台提交的文件（如一个工作簿的全部输出），可等待全部提交完成"""
+
+    def __init__(self, pipeline: WritePipeline):
+        self.pipeline = pipeline
+        self.futures: List[Future] = []
+
+    def submit(self, output_file: Path, temp_file: Path, skip_unchanged: bool) -> None:
+        """提交一个已写完的临时文件，结果记录到当前的 record_writes 记录中"""
+        self.futures.append(self.pipeline.submit(output_file, temp_file, skip_unchanged,
+                                                 _current_write_log.get()))
+
+    def wait(self) -> None:
+        """等待本组提交全部完成，有提交失败时抛出第一个失败的异常"""
+        wait(self.futures)
+        for future in self.futures:
+            future.result()
+
+
+# 当前的后台写入组，由 defer_writes 设置
+_current_write_batch: ContextVar[Optional[WriteBatch]] = ContextVar('current_write_batch', default=None)
+
+
+@contextmanager
+def defer_writes(pipeline: Optional[WritePipeline]) -> Iterator[Optional[WriteBatch]]:
+    """
+    把代码块内所有 atomic_open 写入的提交（比较并替换目标文件）交给后台线程
+
+    代码块结束时提交可能尚未完成，需要调用 WriteBatch.wait 等待；
+    写入结果在提交完成后才记录到 atomic_open 时的 record_writes 记录中。
+
+    Args:
+        pipeline (WritePipeline, optional): 提交线程池，为None时照常同步提交
+
+    Yields:
+        Optional[WriteBatch]: 本代码块提交的写入，pipeline为None时为None
+    """
+    if pipeline is None:
+        yield None
+        return
+
+    batch = WriteBatch(pipeline)
+    token = _current_write_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _current_write_batch.reset(token)
+
+
+def merge_write_log(write_log: WriteLog) -> None:
+    """把其他进程的写入记录并入当前的 record_writes 记录"""
+    current = _current_write_log.get()
+    if current is not None:
+        current.merge(write_log)
+
+
+def same_content(file_a: Path, file_b: Path, chunk_size: int = 1024 * 1024) -> bool:
+    """
+    判断两个文件内容是否相同（先比较大小，再逐块比较）
+
+    Args:
+        file_a (Path): 文件A
+        file_b (Path): 文件B，不存在时视为不同
+        chunk_size (int): 每次读取的字节数
+
+    Returns:
+        bool: 内容是否相同
+    """
+    try:
+        if os.path.getsize(file_a) != os.path.getsize(file_b):
+            return False
+        with open(file_a, 'rb') as fa, open(file_b, 'rb') as fb:
+            while True:
+                chunk = fa.read(chunk_size)
+                if chunk != fb.read(chunk_size):
+                    return False
+                if not chunk:
+                    return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def atomic_open(output_file: Path, mode: str = 'w', encoding: str = 'utf-8',
+                skip_unchanged: bool = True) -> Iterator[IO]:
+    """
+    以原子方式写入文件
+
+    先写入同目录下的临时文件，成功后用 os.replace 替换目标文件；
+    发生异常时删除临时文件，目标文件保持不变。
+    新内容与已有文件相同时删除临时文件，目标文件（及其修改时间）保持不变。
+    写入结果记录到当前的 record_writes 记录中。
+    在 defer_writes 代码块内同样流式写入临时文件，写完后把比较和替换交给后台提交线程。
+
+    Args:
+        output_file (Path): 目标文件路径
+        mode (str): 打开模式，'w' 为文本，'wb' 为二进制
+        encoding (str): 文件编码（文本模式）
+        skip_unchanged (bool): 内容未变化时是否跳过替换
+
+    Yields:
+        IO: 临时文件对象
+    """
+    output_file = Path(output_file)
+    # 后台提交时同一文件可能同时有多个临时文件，文件名需要唯一
+    temp_file = output_file.with_name(f".{output_file.name}.{os.getpid()}.{next(_temp_counter)}.tmp")
+
+    try:
+        with open(temp_file, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+
+        batch = _current_write_batch.get()
+        if batch is not None:
+            batch.submit(output_file, temp_file, skip_unchanged)
+            return
+    except BaseException:
+        _remove_temp_file(temp_file)
+        raise
+
+    _commit_temp_file(temp_file, output_file, skip_unchanged)
+
+
+# 临时文件名序号
+_temp_counter = itertools.count()
+
+
+def _remove_temp_file(temp_file: Path) -> None:
+    """删除临时文件（不存在时忽略）"""
+    try:
+        temp_file.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _commit_temp_file(temp_file: Path, output_file: Path, skip_unchanged: bool) -> None:
+    """
+    用写完的临时文件替换目标文件，内容与已有文件相同时删除临时文件，结果记录到当前的 record_writes 记录中
+
+    Args:
+        temp_file (Path): 临时文件
+        output_file (Path): 目标文件路径
+        skip_unchanged (bool): 内容未变化时是否跳过替换
+    """
+    try:
+        changed = not (skip_unchanged and same_content(temp_file, output_file))
+        if changed:
+            os.replace(temp_file, output_file)
+        else:
+            temp_file.unlink()
+    except BaseException:
+        _remove_temp_file(temp_file)
+        raise
+
+    write_log = _current_write_log.get()
+    if write_log is not None:
+        (write_log.changed if changed else write_log.unchanged).append(output_file)
+
+
+class RawJson(str):
+    """
+    已序列化的JSON片段（如工作表缓存中的记录数组），写出时原样输出
+
+    mirrors 为同一工作表按其他输出配置序列化的片段，与写入器的 mirrors 一一对应。
+    """
+
+    def __new__(cls, text: str, mirrors: Sequence[str] = ()):
+        fragment = super().__new__(cls, text)
+        fragment.mirrors = list(mirrors)
+        return fragment
+
+
+class ColumnarSheet(dict):
+    """列式布局的工作表数据（见 columnar_json），缩进输出时每列写在一行"""
+
+
+class _TeeFile:
+    """把写入同时写到输出文件和片段文件"""
+
+    def __init__(self, output: IO[str], fragment: IO[str]):
+        self.output = output
+        self.fragment = fragment
+
+    def write(self, text: str) -> None:
+        self.output.write(text)
+        self.fragment.write(text)
+
+
+class FragmentSink:
+    """
+    接收写入器新序列化的工作表JSON片段（如工作表缓存）
+
+    写入器开始序列化一个工作表时为每个输出目标调用一次 open，边写出边把该目标格式的片段文本
+    写入返回的文件对象，工作表写完时退出上下文；写出出错时以异常退出上下文，实现应丢弃不完整的片段。
+    """
+
+    def open(self, sheet_name: str, target: int = 0) -> ContextManager[IO[str]]:
+        """
+        开始接收一个工作表的片段
+
+        Args:
+            sheet_name (str): 工作表名称
+            target (int): 输出目标序号，0为主输出，其余与写入器的 mirrors 一一对应
+
+        Returns:
+            ContextManager[IO[str]]: 写入片段文本的文件对象
+        """
+        raise NotImplementedError
+
+
+class JsonStreamWriter:
+    """
+    按工作表流式写出 {sheet: [records]} 结构的JSON写入器
+
+    indent为整数时输出与 json.dump(data, indent=indent) 相同的缩进格式；
+    为None时输出紧凑格式，与 json.dump(data, separators=(',', ':')) 相同。
+    """
+
+    def __init__(self, indent: Optional[int] = 2, ensure_ascii: bool = False, chunk_size: int = 1000,
+                 sort_keys: bool = False, backend: str = 'json'):
+        """
+        初始化写入器
+
+        Args:
+            indent (Optional[int]): 缩进空格数，None表示紧凑输出
+            ensure_ascii (bool): 是否转义非ASCII字符
+            chunk_size (int): 每次写入文件的记录数
+            sort_keys (bool): 是否按键排序记录的字段
+            backend (str): 记录的序列化后端，'json' 或 'orjson'（需已安装；只支持紧凑或2空格缩进、不转义非ASCII）
+        """
+        self.indent = indent
+        self.chunk_size = chunk_size
+        separators = None if indent is not None else (',', ':')
+        self.encoder = json.JSONEncoder(ensure_ascii=ensure_ascii, indent=indent, sort_keys=sort_keys,
+                                        separators=separators)
+
+        # 输出格式的固定部分
+        self.newline = '\n' if indent is not None else ''
+        self.outer = ' ' * indent if indent is not None else ''
+        self.inner = self.outer * 2
+        self.colon = ': ' if indent is not None else ':'
+
+        self.orjson_options = None
+        if backend == 'orjson' and indent in (None, 2) and not ensure_ascii:
+            import orjson
+            self.orjson_options = orjson.OPT_NON_STR_KEYS
+            if indent is not None:
+                self.orjson_options |= orjson.OPT_INDENT_2
+            if sort_keys:
+                self.orjson_options |= orjson.OPT_SORT_KEYS
+
+    def encode(self, value: Any) -> str:
+        """
+        序列化一个值（如一条记录）
+
+        Args:
+            value (Any): 要序列化的值
+
+        Returns:
+            str: JSON文本，顶层缩进为0
+        """
+        if self.orjson_options is not None:
+            import orjson
+            try:
+                return orjson.dumps(value, option=self.orjson_options).decode('utf-8')
+            except TypeError:
+                # orjson不支持的类型（如超过64位的整数）使用标准库序列化
+                pass
+        return self.encoder.encode(value)
+
+    def encode_columnar(self, sheet: Dict[str, Any]) -> str:
+        """
+        序列化列式工作表数据
+
+        缩进输出时每列的数组写在一行，避免每个值单独占一行；紧凑输出与 encode 相同。
+
+        Args:
+            sheet (Dict[str, Any]): 列式工作表数据 (row_count, columns, data)
+
+        Returns:
+            str: JSON文本，顶层缩进为0
+        """
+        if self.indent is None:
+            return self.encode(sheet)
+        step = ' ' * self.indent
+        compact = JsonStreamWriter(indent=None, ensure_ascii=self.encoder.ensure_ascii, sort_keys=self.encoder.sort_keys)
+        fields = []
+        for key, value in sheet.items():
+            if key == 'data' and value:
+                text = '[\n' + ',\n'.join(step * 2 + compact.encode(column) for column in value) + '\n' + step + ']'
+            else:
+                text = compact.encode(value)
+            fields.append(f"{step}{self.encoder.encode(key)}: {text}")
+        return '{\n' + ',\n'.join(fields) + '\n}'
+
+    def encode_value(self, value: Any) -> str:
+        """序列化工作表的非列表值，列式工作表数据使用 encode_columnar"""
+        if isinstance(value, ColumnarSheet):
+            return self.encode_columnar(value)
+        return self.encode(value)
+
+    def write(self, sheets: Iterable[Tuple[str, Any]], output_file: Path, encoding: str = 'utf-8',
+              fragments: Optional[FragmentSink] = None,
+              file_wrapper: Optional[Callable[[IO[str]], IO[str]]] = None,
+              mirrors: Sequence[Tuple['JsonStreamWriter', Path, str]] = ()) -> None:
+        """
+        写出JSON文件
+
+        Args:
+            sheets (Iterable[Tuple[str, Any]]): (工作表名称, 记录迭代器) 序列，
+                记录迭代器在写出时才被消费；值为RawJson时原样写出
+            output_file (Path): 输出文件路径
+            encoding (str): 文件编码
+            fragments (FragmentSink, optional): 传入时把每个新序列化工作表的JSON片段写入其中
+            file_wrapper (Callable, optional): 包装输出文件对象（如统计写入耗时）
+            mirrors (Sequence[Tuple[JsonStreamWriter, Path, str]]): 同一遍读取中以其他格式写出的
+                (写入器, 输出文件, 文件编码)
+        """
+        with ExitStack() as stack:
+            targets = []
+            for writer, path, file_encoding in [(self, output_file, encoding), *mirrors]:
+                f = stack.enter_context(atomic_open(path, encoding=file_encoding))
+                targets.append((writer, file_wrapper(f) if file_wrapper else f))
+            self.write_targets(sheets, targets, fragments)
+
+    def write_to(self, sheets: Iterable[Tuple[str, Any]], f: IO[str],
+                 fragments: Optional[FragmentSink] = None) -> None:
+        """
+        把JSON写入已打开的文件对象
+
+        Args:
+            sheets (Iterable[Tuple[str, Any]]): (工作表名称, 记录迭代器) 序列
+            f (IO[str]): 文件对象
+            fragments (FragmentSink, optional): 传入时把每个新序列化工作表的JSON片段写入其中
+        """
+        self.write_targets(sheets, [(self, f)], fragments)
+
+    def write_targets(self, sheets: Iterable[Tuple[str, Any]], targets: List[Tuple['JsonStreamWriter', IO[str]]],
+                      fragments: Optional[FragmentSink] = None) -> None:
+        """
+        只遍历一次记录，把JSON以各写入器的格式写入对应的文件对象
+
+        Args:
+            sheets (Iterable[Tuple[str, Any]]): (工作表名称, 记录迭代器) 序列
+            targets (List[Tuple[JsonStreamWriter, IO[str]]]): (写入器, 文件对象)，第一个为本写入器
+            fragments (FragmentSink, optional): 传入时把每个新序列化工作表在各写入器格式下的JSON片段
+                边写出边写入其中
+        """
+        first_sheet = True
+        for sheet_name, records in sheets:
+            for writer, f in targets:
+                f.write(('{' if first_sheet else ',') + writer.newline
+                        + f"{writer.outer}{writer.encoder.encode(sheet_name)}{writer.colon}")
+            first_sheet = False
+
+            if isinstance(records, RawJson):
+                # 缓存中每种格式各有一份片段，原样写出，输出与重新序列化完全相同
+                texts = [records, *records.mirrors]
+                if len(texts) != len(targets):
+                    raise ValueError(f"工作表 {sheet_name} 的缓存片段数与输出配置数不一致")
+                for (writer, f), text in zip(targets, texts):
+                    f.write(text)
+                continue
+
+            with ExitStack() as stack:
+                sheet_fragments = None
+                if fragments is not None:
+                    sheet_fragments = [stack.enter_context(fragments.open(sheet_name, index))
+                                       for index in range(len(targets))]
+                self._write_sheet(records, targets, sheet_fragments)
+
+        for writer, f in targets:
+            f.write('{}' if first_sheet else writer.newline + '}')
+
+    def _write_sheet(self, records: Any, targets: List[Tuple['JsonStreamWriter', IO[str]]],
+                     fragments: Optional[List[IO[str]]]) -> None:
+        """写出一个新序列化的工作表，fragments不为None时同时写入各目标格式的片段"""
+        outputs = [f for _, f in targets]
+        if fragments is not None:
+            outputs = [_TeeFile(f, fragment) for f, fragment in zip(outputs, fragments)]
+
+        # 非列表值（如元数据字典、列式工作表）整体编码
+        if isinstance(records, (dict, str)) or not hasattr(records, '__iter__'):
+            for (writer, _), f in zip(targets, outputs):
+                f.write(writer.encode_value(records).replace('\n', '\n' + writer.outer))
+            return
+
+        count = 0
+        chunks = [[] for _ in targets]
+        for record in records:
+            for (writer, f), chunk in zip(targets, chunks):
+                chunk.append(('[' if count == 0 else ',') + writer.newline + writer.inner
+                             + writer.encode(record).replace('\n', '\n' + writer.inner))
+            count += 1
+            if count % self.chunk_size == 0:
+                for f, chunk in zip(outputs, chunks):
+                    f.write(''.join(chunk))
+                    chunk.clear()
+
+        for (writer, _), f, chunk in zip(targets, outputs, chunks):
+            f.write('[]' if count == 0 else ''.join(chunk) + f"{writer.newline}{writer.outer}]")
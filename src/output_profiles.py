@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON输出配置
+
+输出配置决定JSON文件的格式，通过 [OUTPUT] output_profile 或命令行 --output-profile 选择。
+用逗号分隔多个配置时在同一遍读取中全部写出：第一个配置写入输出目录，
+其余配置写入输出目录下以配置名命名的子目录（如 json_files/release/items.json）。
+
+预置配置:
+    default  使用 [DEFAULT] 中的 json_indent 和 json_encoding，保持字段顺序
+    dev      缩进并按字段名排序，便于在版本控制中比较差异
+    release  紧凑输出（无缩进、无多余空格），安装了orjson时用其加速序列化
+
+[PROFILE:名称] 节可以覆盖预置配置或定义新配置:
+
+    [PROFILE:release]
+    # 缩进空格数，none表示紧凑输出
+    indent = none
+    # 是否按字段名排序
+    sort_keys = false
+    # 序列化后端: json、orjson 或 auto (已安装orjson时使用)
+    backend = auto
+    # 文件编码
+    encoding = utf-8
+"""
+
+import importlib.util
+from configparser import ConfigParser
+from typing import Any, Dict, List, Optional, Union
+
+from json_writer import JsonStreamWriter
+
+# 未配置时使用的输出配置
+DEFAULT_OUTPUT_PROFILE = 'default'
+
+# 自定义输出配置的节名前缀
+PROFILE_SECTION_PREFIX = 'PROFILE:'
+
+# 可选的序列化后端
+JSON_BACKENDS = ('json', 'orjson', 'auto')
+
+
+def _parse_indent(value: Optional[str]) -> Optional[int]:
+    """解析缩进配置，none或空值表示紧凑输出"""
+    if value is None or value.strip().lower() in ('', 'none', 'null'):
+        return None
+    return int(value)
+
+
+class OutputProfile:
+    """一种JSON输出格式"""
+
+    def __init__(self, name: str, indent: Optional[int] = 2, sort_keys: bool = False,
+                 backend: str = 'json', encoding: str = 'utf-8'):
+        """
+        初始化输出配置
+
+        Args:
+            name (str): 配置名，也是额外输出的子目录名
+            indent (Optional[int]): 缩进空格数，None表示紧凑输出
+            sort_keys (bool): 是否按字段名排序
+            backend (str): 序列化后端 (json/orjson/auto)
+            encoding (str): 文件编码
+        """
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"输出配置 {name} 的序列化后端不支持: {backend}")
+        orjson_available = importlib.util.find_spec('orjson') is not None
+        if backend == 'orjson' and not orjson_available:
+            raise ValueError(f"输出配置 {name} 使用orjson，但未安装，请安装 orjson")
+        if backend == 'auto':
+            backend = 'orjson' if orjson_available else 'json'
+
+        self.name = name
+        self.indent = indent
+        self.sort_keys = sort_keys
+        self.backend = backend
+        self.encoding = encoding
+
+    def create_writer(self) -> JsonStreamWriter:
+        """创建按该配置输出的JSON写入器"""
+        return JsonStreamWriter(indent=self.indent, sort_keys=self.sort_keys, backend=self.backend)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（用于构建签名）"""
+        return {'name': self.name, 'indent': self.indent, 'sort_keys': self.sort_keys,
+                'backend': self.backend, 'encoding': self.encoding}
+
+
+def builtin_profiles(config: ConfigParser) -> Dict[str, Dict[str, Any]]:
+    """
+    获取预置输出配置的参数
+
+    Args:
+        config (ConfigParser): 转换器配置
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 配置名到构造参数的映射
+    """
+    indent = _parse_indent(config.get('DEFAULT', 'json_indent', fallback='2'))
+    encoding = config.get('DEFAULT', 'json_encoding', fallback='utf-8')
+    return {
+        'default': {'indent': indent, 'sort_keys': False, 'backend': 'json', 'encoding': encoding},
+        'dev': {'indent': indent if indent is not None else 2, 'sort_keys': True, 'backend': 'json',
+                'encoding': encoding},
+        'release': {'indent': None, 'sort_keys': False, 'backend': 'auto', 'encoding': encoding},
+    }
+
+
+def load_output_profiles(config: ConfigParser, names: Union[str, List[str], None] = None) -> List[OutputProfile]:
+    """
+    加载选中的输出配置
+
+    Args:
+        config (ConfigParser): 转换器配置
+        names (Union[str, List[str], None]): 配置名列表或逗号分隔的配置名，为空时使用 DEFAULT_OUTPUT_PROFILE
+
+    Returns:
+        List[OutputProfile]: 输出配置，第一个为主输出
+
+    Raises:
+        ValueError: 配置名未定义或配置无效
+    """
+    if isinstance(names, str):
+        names = names.split(',')
+    selected = []
+    for name in names or []:
+        name = name.strip()
+        if name and name not in selected:
+            selected.append(name)
+    if not selected:
+        selected = [DEFAULT_OUTPUT_PROFILE]
+
+    builtins = builtin_profiles(config)
+    profiles = []
+    for name in selected:
+        section = PROFILE_SECTION_PREFIX + name
+        if name not in builtins and not config.has_section(section):
+            raise ValueError(f"未定义的输出配置: {name}")
+
+        # 自定义配置以default为基础
+        options = dict(builtins.get(name, builtins[DEFAULT_OUTPUT_PROFILE]))
+
+        if config.has_section(section):
+            if config.has_option(section, 'indent'):
+                options['indent'] = _parse_indent(config.get(section, 'indent'))
+            if config.has_option(section, 'sort_keys'):
+                options['sort_keys'] = config.getboolean(section, 'sort_keys')
+            if config.has_option(section, 'backend'):
+                options['backend'] = config.get(section, 'backend').strip()
+            if config.has_option(section, 'encoding'):
+                options['encoding'] = config.get(section, 'encoding').strip()
+
+        profiles.append(OutputProfile(name, **options))
+    return profiles
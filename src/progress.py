@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换进度事件
+
+转换过程中产出结构化的进度事件，供Godot插件等前端实时显示进度。
+命令行使用 `--progress` 时每个事件以一行JSON写到标准输出（日志也转为 "log" 事件），
+常驻服务模式下以 "progress" 通知推送。
+
+事件（均包含 "event" 字段）:
+    batch_started   {"total": 文件数}
+    file_started    {"file": 路径}
+    rows            {"file", "sheet", "rows": 已处理行数}，每处理一定行数产出一次
+    sheet_done      {"file", "sheet", "rows", "cached": 是否直接复用缓存}
+    file_finished   {"file", "outputs": [输出文件], "changed": [内容有变化的输出文件], "seconds": 耗时}
+    file_skipped    {"file"}，文件未变化
+    error           {"file", "message"}
+    batch_finished  {"success", "failed", "skipped", "changed": [内容有变化的输出文件]}
+    log             {"level", "message"}，仅命令行 --progress 模式
+
+命令行和常驻服务模式都可以用 `--log-file` 把标准错误输出重定向到文件（见 redirect_stderr），
+前端只需读取标准输出，不会因为stderr管道写满而互相阻塞。
+
+并行转换时，工作进程的事件在该文件转换完成后按顺序回放。
+流水线写入时，文件仍按顺序完成，但下一个文件的 file_started 可能早于上一个文件的 file_finished。
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, IO
+
+from json_writer import RawJson
+
+# 每处理多少行产出一次 rows 事件
+PROGRESS_ROW_INTERVAL = 1000
+
+ProgressSink = Callable[[Dict[str, Any]], None]
+
+
+def stream_sink(stream: IO[str]) -> ProgressSink:
+    """
+    创建把事件逐行写入文本流的输出函数
+
+    Args:
+        stream (IO[str]): 输出流（如标准输出）
+
+    Returns:
+        ProgressSink: 事件输出函数
+    """
+    def write(event: Dict[str, Any]) -> None:
+        stream.write(json.dumps(event, ensure_ascii=False) + '\n')
+        stream.flush()
+    return write
+
+
+def redirect_stderr(log_file: str) -> None:
+    """
+    把标准错误输出（未捕获的异常、底层库的输出，含子进程继承的文件描述符）重定向到日志文件
+
+    Args:
+        log_file (str): 日志文件路径，已存在时覆盖
+    """
+    log_stream = open(log_file, 'w', encoding='utf-8', buffering=1)
+    os.dup2(log_stream.fileno(), 2)
+    sys.stderr = log_stream
+
+
+class ProgressReporter:
+    """产出转换进度事件"""
+
+    def __init__(self, sink: ProgressSink, row_interval: int = PROGRESS_ROW_INTERVAL):
+        """
+        初始化进度报告器
+
+        Args:
+            sink (ProgressSink): 事件输出函数
+            row_interval (int): 每处理多少行产出一次 rows 事件
+        """
+        self.sink = sink
+        self.row_interval = row_interval
+        # 各文件开始转换的时间，流水线写入时可能有多个文件同时在处理
+        self.file_started: Dict[str, float] = {}
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """
+        产出一个事件
+
+        Args:
+            event (str): 事件名
+            **fields: 事件字段
+        """
+        self.sink({'event': event, **fields})
+
+    def replay(self, events: List[Dict[str, Any]]) -> None:
+        """原样输出已收集的事件（来自工作进程）"""
+        for event in events:
+            self.sink(event)
+
+    def start_file(self, excel_file: Path) -> None:
+        """产出 file_started 事件"""
+        self.file_started[str(excel_file)] = time.perf_counter()
+        self.emit('file_started', file=str(excel_file))
+
+    def finish_file(self, excel_file: Path, outputs: List[Path], changed: Optional[List[Path]] = None) -> None:
+        """产出 file_finished 事件"""
+        now = time.perf_counter()
+        started = self.file_started.pop(str(excel_file), now)
+        self.emit('file_finished', file=str(excel_file), outputs=[str(output) for output in outputs],
+                  changed=[str(output) for output in (outputs if changed is None else changed)],
+                  seconds=round(now - started, 3))
+
+    def track(self, excel_file: Path, sheets: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+        """
+        包装交给JSON写入器的工作表序列，按处理行数产出进度事件
+
+        Args:
+            excel_file (Path): Excel文件路径
+            sheets (Iterable[Tuple[str, Any]]): (工作表名称, 记录迭代器) 序列
+
+        Yields:
+            Tuple[str, Any]: 原样产出的工作表名称和记录
+        """
+        for sheet_name, records in sheets:
+            if isinstance(records, RawJson):
+                yield sheet_name, records
+                self.emit('sheet_done', file=str(excel_file), sheet=sheet_name, rows=None, cached=True)
+            else:
+                yield sheet_name, self._count_rows(excel_file, sheet_name, records)
+
+    def _count_rows(self, excel_file: Path, sheet_name: str, records: Iterable[Any]) -> Iterator[Any]:
+        """逐条产出记录，每处理row_interval行产出一次 rows 事件，结束时产出 sheet_done 事件"""
+        rows = 0
+        for record in records:
+            yield record
+            rows += 1
+            if self.row_interval and rows % self.row_interval == 0:
+                self.emit('rows', file=str(excel_file), sheet=sheet_name, rows=rows)
+        self.emit('sheet_done', file=str(excel_file), sheet=sheet_name, rows=rows, cached=False)
+
+
+class ProgressLogHandler(logging.Handler):
+    """把日志记录转为 log 进度事件的处理器，保证标准输出只包含事件"""
+
+    def __init__(self, reporter: ProgressReporter):
+        super().__init__()
+        self.reporter = reporter
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.reporter.emit('log', level=record.levelname, message=record.getMessage())
+        except Exception:
+            self.handleError(record)
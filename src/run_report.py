@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换运行报告
+
+按文件和工作表记录各阶段耗时、行数、输出字节数和内存增量，输出为JSON报告，
+用于在CI中找出占用导出时间最多的表。
+
+内存增量 (rss_increase_mb) 是转换期间常驻内存相对开始时的最大增长，测量的是整个进程：
+同时转换多个文件（流水线写入的后台提交、常驻服务中的并发请求）时会包含其他文件的占用，
+只有一次转换一个文件时准确。
+
+记录的阶段:
+    read              读取Excel（含打开工作簿和解析工作表）
+    clean             pandas后端的NaN清理和记录转换
+    infer             字段类型推断和二进制列数据收集
+    serialize         JSON编码
+    write             写入JSON文件
+    write_binary      写出二进制列式文件
+    save_cache        保存工作表缓存
+    generate_scripts  生成GDScript脚本
+"""
+
+import sys
+import json
+import time
+import platform
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, IO
+
+from json_writer import atomic_open, RawJson, WriteLog
+
+# 报告格式版本，格式不兼容时递增
+REPORT_VERSION = 2
+
+SHEET_STAGES = ('read', 'clean', 'infer', 'serialize', 'write')
+FILE_STAGES = SHEET_STAGES + ('write_binary', 'save_cache', 'generate_scripts')
+
+
+def _read_memory() -> Tuple[Optional[float], Optional[float]]:
+    """
+    读取进程当前的常驻内存和峰值常驻内存
+
+    Returns:
+        Tuple[Optional[float], Optional[float]]: (当前RSS, 峰值RSS)，单位MB，无法测量时为None
+    """
+    try:
+        with open('/proc/self/status') as f:
+            values = {}
+            for line in f:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    values[line[:5]] = int(line.split()[1]) / 1024
+        return values.get('VmRSS'), values.get('VmHWM')
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS以字节为单位，Linux以KB为单位
+    return None, peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class PeakMemory:
+    """
+    测量一段代码执行期间常驻内存 (RSS) 相对开始时的最大增长
+
+    不重置进程的峰值记录（/proc/self/clear_refs 作用于整个进程，其他线程中的测量会互相覆盖），
+    而是在开始时记下当前RSS和进程峰值：结束时进程峰值升高，说明峰值出现在这段代码内，
+    增量为新峰值减开始时的RSS；否则用结束时的RSS估计。无法读取当前RSS的平台（如macOS）
+    只能得到进程峰值的增长；无法测量时返回None。
+    """
+
+    def __init__(self):
+        self.start_rss: Optional[float] = None
+        self.start_peak: Optional[float] = None
+        self.start()
+
+    def start(self) -> None:
+        """从当前时刻开始测量"""
+        self.start_rss, self.start_peak = _read_memory()
+
+    def increase_mb(self) -> Optional[float]:
+        """获取开始测量以来常驻内存的最大增长（MB）"""
+        rss, peak = _read_memory()
+        if peak is None or self.start_peak is None:
+            return None
+        if rss is None or self.start_rss is None:
+            return max(peak - self.start_peak, 0.0)
+        high = peak if peak > self.start_peak else rss
+        return max(high - self.start_rss, 0.0)
+
+    def peak_mb(self) -> Optional[float]:
+        """获取进程启动以来的峰值常驻内存（MB）"""
+        return _read_memory()[1]
+
+
+class _TimedFile:
+    """统计写入耗时和字节数的文件包装"""
+
+    def __init__(self, f: IO[str], file_report: 'FileReport'):
+        self.f = f
+        self.file_report = file_report
+        self.encoding = getattr(f, 'encoding', None) or 'utf-8'
+
+    def write(self, text: str) -> int:
+        start = time.perf_counter()
+        result = self.f.write(text)
+        sheet = self.file_report.current()
+        sheet['write'] += time.perf_counter() - start
+        sheet['bytes'] += len(text.encode(self.encoding))
+        return result
+
+
+class FileReport:
+    """单个Excel文件的转换统计"""
+
+    def __init__(self, source: Path):
+        """
+        开始统计一个文件
+
+        Args:
+            source (Path): Excel文件路径
+        """
+        self.source = Path(source)
+        self.status = 'success'
+        self.error: Optional[str] = None
+        self.stages: Dict[str, float] = dict.fromkeys(FILE_STAGES, 0.0)
+        self.sheets: Dict[str, Dict[str, Any]] = {}
+
+        # 整个文件和当前工作表的内存增量测量
+        self.memory = PeakMemory()
+        self.sheet_memory = PeakMemory()
+
+        # 当前正在写出的工作表，不属于任何工作表的开销计入 "" 条目
+        self.current_sheet = ''
+        self.sheet_started = 0.0
+
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def sheet(self, name: str) -> Dict[str, Any]:
+        """获取（或创建）工作表的统计条目"""
+        sheet = self.sheets.get(name)
+        if sheet is None:
+            sheet = dict.fromkeys(SHEET_STAGES, 0.0)
+            sheet.update({'rows': 0, 'bytes': 0, 'seconds': 0.0, 'pull': 0.0, 'outer': 0.0,
+                          'cached': False, 'rss_increase_mb': None})
+            self.sheets[name] = sheet
+        return sheet
+
+    def current(self) -> Dict[str, Any]:
+        """获取当前工作表的统计条目"""
+        return self.sheet(self.current_sheet)
+
+    def _open_sheet(self, name: str) -> None:
+        self.current_sheet = name
+        self.sheet(name)
+        self.sheet_started = time.perf_counter()
+        self.sheet_memory.start()
+
+    def _close_sheet(self) -> None:
+        if self.current_sheet:
+            sheet = self.current()
+            sheet['seconds'] += time.perf_counter() - self.sheet_started
+            increase = self.sheet_memory.increase_mb()
+            if increase is not None:
+                sheet['rss_increase_mb'] = max(sheet['rss_increase_mb'] or 0.0, increase)
+        self.current_sheet = ''
+
+    @contextmanager
+    def stage(self, name: str, sheet_name: Optional[str] = None) -> Iterator[None]:
+        """
+        统计一个阶段的耗时
+
+        Args:
+            name (str): 阶段名
+            sheet_name (str, optional): 所属工作表，为None时计入文件级统计
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if sheet_name is None:
+                self.stages[name] = self.stages.get(name, 0.0) + seconds
+            else:
+                self.sheet(sheet_name)[name] += seconds
+
+    def _timed_records(self, records: Iterable[Any], sheet: Dict[str, Any], key: str,
+                       count_rows: bool = False) -> Iterator[Any]:
+        """逐条产出记录，统计从上游取记录的耗时"""
+        iterator = iter(records)
+        while True:
+            start = time.perf_counter()
+            try:
+                record = next(iterator)
+            except StopIteration:
+                sheet[key] += time.perf_counter() - start
+                return
+            sheet[key] += time.perf_counter() - start
+            if count_rows:
+                sheet['rows'] += 1
+            yield record
+
+    def track_source(self, sheets: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+        """
+        包装读取器产出的工作表序列，统计读取记录的耗时
+
+        Args:
+            sheets (Iterable[Tuple[str, Any]]): (工作表名称, 记录迭代器) 序列
+
+        Yields:
+            Tuple[str, Any]: 原样产出的工作表名称和记录
+        """
+        for sheet_name, records in sheets:
+            if isinstance(records, RawJson):
+                self.sheet(sheet_name)['cached'] = True
+                yield sheet_name, records
+            else:
+                yield sheet_name, self._timed_records(records, self.sheet(sheet_name), 'read')
+
+    def track_output(self, sheets: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+        """
+        包装交给JSON写入器的工作表序列，划分每个工作表的时间窗口并统计行数
+
+        Args:
+            sheets (Iterable[Tuple[str, Any]]): (工作表名称, 记录迭代器) 序列
+
+        Yields:
+            Tuple[str, Any]: 原样产出的工作表名称和记录
+        """
+        iterator = iter(sheets)
+        while True:
+            self._close_sheet()
+            start = time.perf_counter()
+            try:
+                sheet_name, records = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                outer_seconds = time.perf_counter() - start
+
+            # 取下一个工作表时的开销（如pandas解析整个工作表）属于该工作表
+            self._open_sheet(sheet_name)
+            self.current()['outer'] += outer_seconds
+            if isinstance(records, RawJson):
+                yield sheet_name, records
+            else:
+                yield sheet_name, self._timed_records(records, self.sheet(sheet_name), 'pull', count_rows=True)
+
+    def wrap_file(self, f: IO[str]) -> _TimedFile:
+        """包装JSON输出文件，统计写入耗时和字节数"""
+        return _TimedFile(f, self)
+
+    def fail(self, error: BaseException) -> None:
+        """标记文件转换失败"""
+        self.status = 'failed'
+        self.error = str(error)
+
+    def finish(self, write_log: Optional[WriteLog] = None) -> Dict[str, Any]:
+        """
+        结束统计并汇总为报告条目
+
+        Args:
+            write_log (WriteLog, optional): 转换期间的写入记录，用于报告哪些输出内容有变化
+
+        Returns:
+            Dict[str, Any]: 文件报告
+        """
+        self._close_sheet()
+        self.seconds = time.perf_counter() - self.started
+
+        overhead = self.sheets.pop('', None)
+        sheets = []
+        for name, sheet in self.sheets.items():
+            # 从写入器视角取记录的耗时 = 读取 + 类型推断等中间处理
+            sheet['infer'] = max(sheet['pull'] - sheet['read'], 0.0)
+            sheet['serialize'] = max(sheet['seconds'] - sheet['pull'] - sheet['write'], 0.0)
+            # 取工作表时的开销 = 解析 + NaN清理
+            sheet['read'] += max(sheet['outer'] - sheet['clean'], 0.0)
+            sheet['seconds'] += sheet['outer']
+            del sheet['pull'], sheet['outer']
+            sheets.append({'name': name, **sheet})
+
+        stages = dict(self.stages)
+        for stage in SHEET_STAGES:
+            stages[stage] += sum(sheet[stage] for sheet in sheets)
+        if overhead is not None:
+            stages['write'] += overhead['write']
+
+        return {
+            'file': str(self.source),
+            'status': self.status,
+            'error': self.error,
+            'seconds': self.seconds,
+            'rows': sum(sheet['rows'] for sheet in sheets),
+            'bytes': sum(sheet['bytes'] for sheet in sheets) + (overhead['bytes'] if overhead else 0),
+            'rss_increase_mb': self.memory.increase_mb(),
+            'peak_rss_mb': self.memory.peak_mb(),
+            'stages': stages,
+            'sheets': sheets,
+            'changed_outputs': [str(output) for output in write_log.changed] if write_log else [],
+            'unchanged_outputs': [str(output) for output in write_log.unchanged] if write_log else [],
+        }
+
+
+class RunReport:
+    """一次转换运行的报告"""
+
+    def __init__(self, converter_version: Optional[str] = None):
+        """
+        初始化报告
+
+        Args:
+            converter_version (str, optional): 写入报告的转换器版本
+        """
+        self.converter_version = converter_version
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.started = time.perf_counter()
+        self.files: List[Dict[str, Any]] = []
+
+    def start_file(self, source: Path) -> FileReport:
+        """开始统计一个文件"""
+        return FileReport(source)
+
+    def add_file(self, file_report: Dict[str, Any]) -> None:
+        """加入一个已完成的文件报告（包括来自工作进程的报告）"""
+        self.files.append(file_report)
+
+    def skip_file(self, source: Path) -> None:
+        """记录一个因未变化而跳过的文件"""
+        self.files.append({
+            'file': str(source),
+            'status': 'skipped',
+            'error': None,
+            'seconds': 0.0,
+            'rows': 0,
+            'bytes': 0,
+            'rss_increase_mb': None,
+            'peak_rss_mb': None,
+            'stages': dict.fromkeys(FILE_STAGES, 0.0),
+            'sheets': [],
+            'changed_outputs': [],
+            'unchanged_outputs': [],
+        })
+
+    def slowest_sheets(self, count: int = 5) -> List[Dict[str, Any]]:
+        """
+        获取耗时最长的工作表
+
+        Args:
+            count (int): 数量
+
+        Returns:
+            List[Dict[str, Any]]: [{"file", "sheet", "seconds", "rows"}]
+        """
+        sheets = [
+            {'file': file_report['file'], 'sheet': sheet['name'], 'seconds': sheet['seconds'], 'rows': sheet['rows']}
+            for file_report in self.files
+            for sheet in file_report['sheets']
+        ]
+        return sorted(sheets, key=lambda sheet: sheet['seconds'], reverse=True)[:count]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """汇总为可序列化的报告"""
+        statuses = [file_report['status'] for file_report in self.files]
+        increases = [file_report['rss_increase_mb'] for file_report in self.files
+                     if file_report['rss_increase_mb'] is not None]
+        peaks = [file_report['peak_rss_mb'] for file_report in self.files if file_report['peak_rss_mb'] is not None]
+        return {
+            'report_version': REPORT_VERSION,
+            'converter_version': self.converter_version,
+            'python': platform.python_version(),
+            'started_at': self.started_at,
+            'seconds': time.perf_counter() - self.started,
+            'summary': {status: statuses.count(status) for status in ('success', 'failed', 'skipped')},
+            'rows': sum(file_report['rows'] for file_report in self.files),
+            'bytes': sum(file_report['bytes'] for file_report in self.files),
+            'rss_increase_mb': max(increases) if increases else None,
+            'peak_rss_mb': max(peaks) if peaks else None,
+            'stages': {
+                stage: sum(file_report['stages'].get(stage, 0.0) for file_report in self.files)
+                for stage in FILE_STAGES
+            },
+            'slowest_sheets': self.slowest_sheets(),
+            # 内容有变化（被替换）的输出文件，未变化的输出保留原文件
+            'changed_outputs': [output for file_report in self.files for output in file_report.get('changed_outputs', [])],
+            'files': self.files,
+        }
+
+    def save(self, output_file: Path) -> None:
+        """
+        保存JSON报告
+
+        Args:
+            output_file (Path): 报告文件路径
+        """
+        output_file = Path(output_file)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_open(output_file) as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作表级指纹与缓存
+
+.xlsx 文件是zip包，每个工作表是独立的XML部件。对每个工作表计算指纹：
+工作表XML + 它引用的共享字符串 + 它引用的数字格式 + 1904日期系统标志。
+只有指纹变化的工作表需要重新解析，其余工作表直接复用上次缓存的JSON片段、
+字段类型和二进制编码结果。缓存以JSON文本和原始字节保存，不使用pickle。
+"""
+
+import re
+import json
+import hashlib
+import logging
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, IO
+
+from json_writer import FragmentSink, atomic_open
+
+logger = logging.getLogger(__name__)
+
+# 缓存文件格式版本，格式不兼容时递增
+SHEET_CACHE_VERSION = 3
+
+# 默认缓存目录名（保存在JSON输出目录中）
+SHEET_CACHE_DIRNAME = '.excel_to_json_sheet_cache'
+
+# 工作簿缓存目录中的索引文件名
+SHEET_CACHE_INDEX = 'sheets.json'
+
+# 支持工作表指纹的文件格式（zip包）
+FINGERPRINT_EXTENSIONS = {'.xlsx', '.xlsm'}
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# 共享字符串单元格 <c ... t="s"><v>索引</v>
+_SHARED_STRING_CELL = re.compile(rb'<c\b[^>]*?\bt="s"[^>]*>\s*<v>(\d+)</v>')
+_SHARED_STRING_ATTR = re.compile(rb'\bt="s"')
+# 带样式的单元格 <c ... s="样式索引">
+_STYLED_CELL = re.compile(rb'<c\b[^>]*?\bs="(\d+)"')
+
+
+class _WorkbookParts:
+    """按需解析工作簿中被多个工作表共享的部件"""
+
+    def __init__(self, archive: zipfile.ZipFile, rel_targets: Dict[str, str]):
+        self.archive = archive
+        self.rel_targets = rel_targets
+        self._shared_strings: Optional[List[str]] = None
+        self._shared_strings_digest: Optional[bytes] = None
+        self._number_formats: Optional[List[bytes]] = None
+
+    def _read_part(self, rel_type: str, default: str) -> Optional[bytes]:
+        """读取指定类型的工作簿部件，不存在时返回None"""
+        path = self.rel_targets.get(rel_type, default)
+        try:
+            return self.archive.read(path)
+        except KeyError:
+            return None
+
+    @property
+    def shared_strings(self) -> List[str]:
+        """共享字符串表"""
+        if self._shared_strings is None:
+            self._shared_strings = []
+            data = self._read_part('sharedStrings', 'xl/sharedStrings.xml')
+            if data is not None:
+                for item in ET.fromstring(data).iter(f'{_MAIN_NS}si'):
+                    # 富文本由多个<r><t>组成，拼接全部文本；忽略拼音注释<rPh>
+                    nodes = item.findall(f'{_MAIN_NS}t') + item.findall(f'{_MAIN_NS}r/{_MAIN_NS}t')
+                    self._shared_strings.append(''.join(node.text or '' for node in nodes))
+        return self._shared_strings
+
+    @property
+    def shared_strings_digest(self) -> bytes:
+        """整个共享字符串表的哈希，无法定位引用的字符串时使用"""
+        if self._shared_strings_digest is None:
+            data = self._read_part('sharedStrings', 'xl/sharedStrings.xml') or b''
+            self._shared_strings_digest = hashlib.sha256(data).digest()
+        return self._shared_strings_digest
+
+    @property
+    def number_formats(self) -> List[bytes]:
+        """每个单元格样式(cellXfs)对应的数字格式描述"""
+        if self._number_formats is None:
+            self._number_formats = []
+            data = self._read_part('styles', 'xl/styles.xml')
+            if data is not None:
+                root = ET.fromstring(data)
+                codes = {
+                    num_fmt.get('numFmtId'): num_fmt.get('formatCode', '')
+                    for num_fmt in root.iter(f'{_MAIN_NS}numFmt')
+                }
+                cell_xfs = root.find(f'{_MAIN_NS}cellXfs')
+                if cell_xfs is not None:
+                    for xf in cell_xfs.iter(f'{_MAIN_NS}xf'):
+                        num_fmt_id = xf.get('numFmtId', '0')
+                        self._number_formats.append(
+                            f"{num_fmt_id}:{codes.get(num_fmt_id, '')}".encode('utf-8')
+                        )
+        return self._number_formats
+
+
+def compute_sheet_fingerprints(excel_file: Path) -> Optional[Dict[str, str]]:
+    """
+    计算工作簿中每个工作表的指纹
+
+    Args:
+        excel_file (Path): Excel文件路径
+
+    Returns:
+        Optional[Dict[str, str]]: 按工作簿顺序排列的 {工作表名称: 指纹}，
+            文件不是可识别的.xlsx包时返回None
+    """
+    excel_file = Path(excel_file)
+    if excel_file.suffix.lower() not in FINGERPRINT_EXTENSIONS:
+        return None
+
+    try:
+        with zipfile.ZipFile(excel_file) as archive:
+            return _fingerprint_archive(archive)
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+        logger.warning(f"无法计算工作表指纹，将完整转换 {excel_file}: {str(e)}")
+        return None
+
+
+def _fingerprint_archive(archive: zipfile.ZipFile) -> Optional[Dict[str, str]]:
+    """计算已打开的.xlsx包中每个工作表的指纹"""
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+
+    targets = {}
+    rel_targets = {}
+    for rel in rels.iter(f'{_PKG_REL_NS}Relationship'):
+        target = rel.get('Target', '')
+        # 目标路径可以是包内绝对路径或相对于xl/的路径
+        path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+        targets[rel.get('Id')] = path
+        rel_targets[rel.get('Type', '').rsplit('/', 1)[-1]] = path
+
+    workbook_pr = workbook.find(f'{_MAIN_NS}workbookPr')
+    date1904 = workbook_pr is not None and workbook_pr.get('date1904') in ('1', 'true')
+
+    parts = _WorkbookParts(archive, rel_targets)
+    fingerprints = {}
+
+    for sheet in workbook.iter(f'{_MAIN_NS}sheet'):
+        name = sheet.get('name')
+        path = targets.get(sheet.get(f'{_REL_NS}id'))
+        if name is None or path is None or 'worksheets/' not in path:
+            # 图表工作表等非普通工作表，不使用工作表级缓存
+            return None
+
+        sheet_xml = archive.read(path)
+
+        digest = hashlib.sha256()
+        digest.update(name.encode('utf-8'))
+        digest.update(b'\x001904' if date1904 else b'\x00')
+        digest.update(hashlib.sha256(sheet_xml).digest())
+
+        # 引用的共享字符串：共享字符串表被所有工作表共用，只计入本表引用的条目
+        indices = _SHARED_STRING_CELL.findall(sheet_xml)
+        if len(indices) != len(_SHARED_STRING_ATTR.findall(sheet_xml)):
+            # 存在无法识别的写法（如带命名空间前缀），退回到整个共享字符串表
+            digest.update(parts.shared_strings_digest)
+        elif indices:
+            shared_strings = parts.shared_strings
+            for index in sorted(set(map(int, indices))):
+                text = shared_strings[index] if index < len(shared_strings) else ''
+                digest.update(f"\x00s{index}:{text}".encode('utf-8'))
+
+        # 引用的数字格式：决定数值是否被识别为日期等
+        number_formats = parts.number_formats
+        for index in sorted(set(map(int, _STYLED_CELL.findall(sheet_xml)))):
+            digest.update(b'\x00f' + (number_formats[index] if index < len(number_formats) else b''))
+
+        fingerprints[name] = digest.hexdigest()
+
+    return fingerprints
+
+
+class SheetCache:
+    """
+    工作表级转换结果缓存
+
+    每个工作簿一个缓存目录，其中 sheets.json 记录各工作表的指纹、字段类型和缓存文件名，
+    JSON片段在写出输出时同步流式写入，每个输出配置一份（<键>.json、<键>.1.json ...），
+    二进制编码结果保存为 <键>.bin。
+    文件名由配置签名、工作表名称和指纹决定，内容相同的片段总是写入同名文件。
+    缓存只包含JSON文本和原始字节，读取时不会执行其中的内容。
+    """
+
+    def __init__(self, cache_dir: Path, signature: str):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir (Path): 缓存目录
+            signature (str): 转换器/配置签名，签名变化时缓存失效
+        """
+        self.cache_dir = Path(cache_dir)
+        self.signature = signature
+
+    def workbook_dir(self, source: Path) -> Path:
+        """获取工作簿对应的缓存目录"""
+        key = hashlib.sha1(str(Path(source).resolve()).encode('utf-8')).hexdigest()[:12]
+        return self.cache_dir / f"{Path(source).stem}.{key}"
+
+    def cache_file(self, source: Path) -> Path:
+        """获取工作簿的缓存索引文件路径"""
+        return self.workbook_dir(source) / SHEET_CACHE_INDEX
+
+    def entry_key(self, sheet_name: str, fingerprint: str) -> str:
+        """获取工作表缓存文件名的键"""
+        digest = hashlib.sha1(f"{self.signature}\0{sheet_name}\0{fingerprint}".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def load(self, source: Path) -> Dict[str, Dict[str, Any]]:
+        """
+        读取工作簿的缓存条目
+
+        Args:
+            source (Path): Excel文件路径
+
+        Returns:
+            Dict[str, Dict[str, Any]]: {工作表名称: 缓存条目}，条目中的 json 为各输出配置的片段文件路径列表，
+                binary 为二进制文件路径；缓存缺失、损坏或失效时为空，缓存文件缺失的条目被忽略
+        """
+        cache_file = self.cache_file(source)
+        if not cache_file.exists():
+            return {}
+
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"工作表缓存 {cache_file} 无法读取，将重新转换: {str(e)}")
+            return {}
+
+        if data.get('version') != SHEET_CACHE_VERSION or data.get('signature') != self.signature:
+            return {}
+
+        workbook_dir = cache_file.parent
+        entries = {}
+        for name, entry in data.get('sheets', {}).items():
+            filenames = list(entry.get('json') or [])
+            binary = entry.get('binary')
+            if binary is not None:
+                filenames.append(binary)
+            # 只接受缓存目录中已存在的文件
+            if not entry.get('json') or not all(
+                    isinstance(filename, str) and Path(filename).name == filename
+                    and (workbook_dir / filename).exists() for filename in filenames):
+                continue
+            entries[name] = {
+                'fingerprint': entry.get('fingerprint'),
+                'structure': entry.get('structure'),
+                'json': [workbook_dir / filename for filename in entry['json']],
+                'binary': workbook_dir / binary if binary is not None else None,
+            }
+        return entries
+
+    def fragment_sink(self, source: Path, fingerprints: Dict[str, str]) -> 'SheetCacheWriter':
+        """
+        创建把新序列化的工作表片段写入缓存目录的接收器
+
+        Args:
+            source (Path): Excel文件路径
+            fingerprints (Dict[str, str]): 各工作表的指纹
+
+        Returns:
+            SheetCacheWriter: 片段接收器
+        """
+        return SheetCacheWriter(self, self.workbook_dir(source), fingerprints)
+
+    def save(self, source: Path, sheets: Dict[str, Dict[str, Any]]) -> List[Path]:
+        """
+        保存工作簿的缓存索引，删除不再引用的缓存文件
+
+        Args:
+            source (Path): Excel文件路径
+            sheets (Dict[str, Dict[str, Any]]): {工作表名称: 缓存条目}，json为各输出配置的片段文件路径列表，
+                binary为二进制编码结果（bytes）、已缓存的文件路径或None
+
+        Returns:
+            List[Path]: 缓存文件（索引文件和被引用的片段、二进制文件）
+        """
+        workbook_dir = self.workbook_dir(source)
+        workbook_dir.mkdir(parents=True, exist_ok=True)
+
+        index = {}
+        files = []
+        for name, entry in sheets.items():
+            json_files = [Path(path) for path in entry['json']]
+            binary = entry.get('binary')
+            if isinstance(binary, bytes):
+                binary_file = json_files[0].with_suffix('.bin')
+                with atomic_open(binary_file, 'wb') as f:
+                    f.write(binary)
+                binary = binary_file
+            index[name] = {
+                'fingerprint': entry['fingerprint'],
+                'structure': entry.get('structure'),
+                'json': [path.name for path in json_files],
+                'binary': Path(binary).name if binary is not None else None,
+            }
+            files.extend(json_files)
+            if binary is not None:
+                files.append(Path(binary))
+
+        cache_file = self.cache_file(source)
+        data = {
+            'version': SHEET_CACHE_VERSION,
+            'signature': self.signature,
+            'sheets': index,
+        }
+        with atomic_open(cache_file) as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+        # 删除已变化或已删除的工作表留下的缓存文件
+        keep = {path.name for path in files} | {cache_file.name}
+        for path in workbook_dir.iterdir():
+            if path.name not in keep and not path.name.startswith('.'):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+        return [cache_file] + files
+
+
+class SheetCacheWriter(FragmentSink):
+    """把写入器新序列化的工作表片段流式写入工作簿的缓存目录"""
+
+    def __init__(self, cache: SheetCache, workbook_dir: Path, fingerprints: Dict[str, str]):
+        """
+        初始化接收器
+
+        Args:
+            cache (SheetCache): 所属缓存
+            workbook_dir (Path): 工作簿的缓存目录
+            fingerprints (Dict[str, str]): 各工作表的指纹
+        """
+        self.cache = cache
+        self.workbook_dir = workbook_dir
+        self.fingerprints = fingerprints
+        # 已完整写入的片段 {工作表名称: {输出目标序号: 片段文件}}
+        self.written: Dict[str, Dict[int, Path]] = {}
+
+    @contextmanager
+    def open(self, sheet_name: str, target: int = 0) -> Iterator[IO[str]]:
+        """开始写入一个工作表在某个输出目标格式下的片段，正常退出时才记为已写入"""
+        self.workbook_dir.mkdir(parents=True, exist_ok=True)
+        key = self.cache.entry_key(sheet_name, self.fingerprints[sheet_name])
+        fragment_file = self.workbook_dir / (f"{key}.json" if target == 0 else f"{key}.{target}.json")
+        with atomic_open(fragment_file) as f:
+            yield f
+        self.written.setdefault(sheet_name, {})[target] = fragment_file
+
+    def fragment_files(self, sheet_name: str, count: int) -> Optional[List[Path]]:
+        """
+        获取工作表各输出目标的片段文件
+
+        Args:
+            sheet_name (str): 工作表名称
+            count (int): 输出目标数
+
+        Returns:
+            Optional[List[Path]]: 按目标序号排列的片段文件，有目标未写完时为None
+        """
+        written = self.written.get(sheet_name, {})
+        if any(target not in written for target in range(count)):
+            return None
+        return [written[target] for target in range(count)]
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+稀疏记录
+
+配置 include_null_values = false 时，写出JSON前去掉记录中值为null的字段；
+配置 omit_default_values = true 时，还去掉等于数据类字段默认值的字段（0、0.0、false、""）。
+生成的数据类构造函数和延迟加载器对缺少的字段使用字段默认值，加载结果与完整记录相同。
+
+字段的默认值取决于整表推断出的类型（如某列只要出现一个字符串就变为Variant，默认值为null），
+因此省略默认值时先把工作表的记录暂存到临时文件，整表类型确定后再读回过滤，内存占用与行数无关。
+ID字段（分片清单和加载器依赖它）总是保留。
+"""
+
+import pickle
+import tempfile
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from json_writer import RawJson
+from json_shards import find_id_key
+
+# 各GDScript类型的字段默认值判断，与 GDScriptGenerator.get_default_value 对应
+# bool是int的子类，这里按精确类型判断，避免把false当作0
+_DEFAULT_VALUE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    'bool': lambda value: value is False,
+    'int': lambda value: type(value) is int and value == 0,
+    'float': lambda value: type(value) in (int, float) and value == 0,
+    'String': lambda value: value == '' and isinstance(value, str),
+    'Array': lambda value: isinstance(value, list) and not value,
+    'Dictionary': lambda value: isinstance(value, dict) and not value,
+}
+
+
+class SparseRecordFilter:
+    """写出JSON前从记录中去掉null和默认值字段"""
+
+    def __init__(self, include_null_values: bool = False, omit_default_values: bool = False):
+        """
+        初始化过滤器
+
+        Args:
+            include_null_values (bool): 是否保留值为null的字段
+            omit_default_values (bool): 是否去掉等于数据类字段默认值的字段（需要字段类型）
+        """
+        self.include_null_values = include_null_values
+        self.omit_default_values = omit_default_values
+
+    def track(self, sheets: Iterable[Tuple[str, Any]],
+              tracker: Optional[Any] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        包装交给JSON写入器的工作表序列，产出稀疏记录
+
+        Args:
+            sheets (Iterable[Tuple[str, Any]]): (工作表名称, 记录迭代器) 序列
+            tracker (StructureTracker, optional): 字段类型推断器，位于本过滤器上游；
+                为None时无法确定默认值，只去掉null字段
+
+        Yields:
+            Tuple[str, Any]: (工作表名称, 稀疏记录迭代器)；缓存的JSON片段和非列表值原样产出
+        """
+        for sheet_name, records in sheets:
+            if isinstance(records, (RawJson, dict, str)) or not hasattr(records, '__iter__'):
+                yield sheet_name, records
+            elif self.omit_default_values and tracker is not None:
+                yield sheet_name, self._omit_defaults(sheet_name, records, tracker)
+            elif not self.include_null_values:
+                yield sheet_name, self._omit_nulls(records)
+            else:
+                yield sheet_name, records
+
+    def _omit_nulls(self, records: Iterable[Any]) -> Iterator[Any]:
+        """逐条去掉null字段"""
+        id_key = None
+        for record in records:
+            if not isinstance(record, dict):
+                yield record
+                continue
+            if id_key is None:
+                id_key = find_id_key(record)
+            yield {key: value for key, value in record.items() if value is not None or key == id_key}
+
+    def _omit_defaults(self, sheet_name: str, records: Iterable[Any], tracker: Any) -> Iterator[Any]:
+        """暂存整表记录，类型推断完成后去掉默认值字段"""
+        with tempfile.TemporaryFile() as spool:
+            count = 0
+            id_key = None
+            for record in records:
+                if id_key is None and isinstance(record, dict):
+                    id_key = find_id_key(record)
+                pickle.dump(record, spool, pickle.HIGHEST_PROTOCOL)
+                count += 1
+
+            # 上游的推断器在记录读完时已得到整表的字段类型
+            field_types = tracker.sheets_structure.get(sheet_name) or {}
+            checks = {field_name: _DEFAULT_VALUE_CHECKS[field_type]
+                      for field_name, field_type in field_types.items()
+                      if field_type in _DEFAULT_VALUE_CHECKS and field_name != id_key}
+            keep_nulls = self.include_null_values
+
+            spool.seek(0)
+            for _ in range(count):
+                record = pickle.load(spool)
+                if not isinstance(record, dict):
+                    yield record
+                    continue
+                sparse = {}
+                for key, value in record.items():
+                    if key == id_key:
+                        sparse[key] = value
+                    elif value is None:
+                        if keep_nulls:
+                            sparse[key] = value
+                    else:
+                        check = checks.get(key)
+                        if check is None or not check(value):
+                            sparse[key] = value
+                yield sparse
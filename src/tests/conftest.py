@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""测试公共设置：把src目录加入模块搜索路径，并提供生成工作簿和配置文件的fixture"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def make_workbook(tmp_path):
+    """
+    返回在 tmp_path/excel 下生成.xlsx工作簿的函数
+
+    工作簿的每个工作表以 {表名: [表头, 行1, 行2, ...]} 给出。
+    """
+    import openpyxl
+
+    def make(name: str, sheets: Dict[str, List[List[Any]]]) -> Path:
+        workbook = openpyxl.Workbook()
+        workbook.remove(workbook.active)
+        for sheet_name, rows in sheets.items():
+            worksheet = workbook.create_sheet(sheet_name)
+            for row in rows:
+                worksheet.append(row)
+
+        excel_dir = tmp_path / 'excel'
+        excel_dir.mkdir(exist_ok=True)
+        path = excel_dir / f'{name}.xlsx'
+        workbook.save(path)
+        return path
+
+    return make
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """
+    返回在 tmp_path 下生成配置文件的函数
+
+    配置以 {节名: {键: 值}} 给出，未给出的配置使用转换器的默认值。
+    """
+    def make(sections: Dict[str, Dict[str, Any]] = None, name: str = 'config.ini') -> str:
+        lines = []
+        for section, values in (sections or {}).items():
+            lines.append(f'[{section}]')
+            lines.extend(f'{key} = {value}' for key, value in values.items())
+            lines.append('')
+
+        path = tmp_path / name
+        path.write_text('\n'.join(lines), encoding='utf-8')
+        return str(path)
+
+    return make
+
+
+@pytest.fixture
+def read_outputs():
+    """返回读取目录下所有输出文件内容的函数（不含清单、缓存等以.开头的文件）"""
+    def read(output_dir: Path) -> Dict[str, bytes]:
+        return {
+            path.relative_to(output_dir).as_posix(): path.read_bytes()
+            for path in sorted(output_dir.rglob('*'))
+            if path.is_file() and not any(part.startswith('.') for part in path.relative_to(output_dir).parts)
+        }
+
+    return read
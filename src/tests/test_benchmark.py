@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""benchmark.py 的分阶段测量"""
+
+import pytest
+
+from benchmark import STAGES, generate_workbook, measure, merge_runs, run_benchmark
+from run_report import PeakMemory
+
+MB = 1024 * 1024
+
+
+def test_stage_memory_excludes_data_held_by_earlier_stages():
+    memory = PeakMemory()
+    if memory.increase_mb() is None:
+        pytest.skip('无法测量内存')
+
+    held, first = measure(lambda: b'x' * (96 * MB), memory)
+    _, second = measure(lambda: len(b'y' * (16 * MB)), memory)
+    del held
+
+    assert first['rss_increase_mb'] >= 64
+    # 前一阶段仍持有的数据不计入后一阶段
+    assert second['rss_increase_mb'] < 64
+
+
+def test_run_benchmark_reports_every_stage(tmp_path):
+    excel_file = generate_workbook(tmp_path / 'excel' / 'bench.xlsx', rows=50, columns=6, sheets=2)
+
+    runs = [run_benchmark(excel_file, tmp_path / f"run_{index}") for index in range(2)]
+    merged = merge_runs(runs)
+
+    assert tuple(merged) == STAGES
+    assert merged['end_to_end']['rows'] == 100
+    assert merged['write_json']['bytes'] > 0
+    for result in merged.values():
+        assert result['seconds'] >= 0
+        assert result['rss_increase_mb'] is None or result['rss_increase_mb'] >= 0
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Godot二进制编码：与Godot 4 var_to_bytes 的输出逐字节相同，解码后与JSON输出一致"""
+
+import json
+import struct
+
+import pytest
+
+from binary_writer import (
+    PackedFloat64Array, PackedInt64Array, PackedStringArray, encode_variant, pack_column,
+)
+from excel_to_json import ExcelToJsonConverter
+
+# (值, Godot 4中 var_to_bytes(值) 的结果)
+GODOT_VAR_TO_BYTES = [
+    (None, '00000000'),
+    (True, '01000000 01000000'),
+    (False, '01000000 00000000'),
+    (1, '02000000 01000000'),
+    (-1, '02000000 ffffffff'),
+    (2147483647, '02000000 ffffff7f'),
+    (2147483648, '02000100 0000008000000000'),
+    (1 << 40, '02000100 0000000000010000'),
+    (1.5, '03000000 0000c03f'),
+    (-0.25, '03000000 000080be'),
+    (0.1, '03000100 9a9999999999b93f'),
+    ('', '04000000 00000000'),
+    ('abc', '04000000 03000000 61626300'),
+    ('abcd', '04000000 04000000 61626364'),
+    ('铁', '04000000 03000000 e9938100'),
+    ([1, 'a'], '1c000000 02000000 02000000 01000000 04000000 01000000 61000000'),
+    ([], '1c000000 00000000'),
+    ({'a': 1}, '1b000000 01000000 04000000 01000000 61000000 02000000 01000000'),
+    (PackedInt64Array([1, -2]), '1f000000 02000000 0100000000000000 feffffffffffffff'),
+    (PackedFloat64Array([0.5]), '21000000 01000000 000000000000e03f'),
+    (PackedStringArray(['ab', 'cde']), '22000000 02000000 03000000 61620000 04000000 63646500'),
+    (PackedStringArray(['abcd']), '22000000 01000000 05000000 61626364 00000000'),
+]
+
+
+def encode(value):
+    out = bytearray()
+    encode_variant(value, out)
+    return bytes(out)
+
+
+def decode(data, offset=0):
+    """按var_to_bytes格式解码一个值，返回 (值, 结束位置)"""
+    header, = struct.unpack_from('<I', data, offset)
+    value_type, is_64 = header & 0xFFFF, bool(header & (1 << 16))
+    offset += 4
+
+    def read_string(offset, terminated=False):
+        length, = struct.unpack_from('<I', data, offset)
+        text = data[offset + 4:offset + 4 + length]
+        if terminated:
+            assert text.endswith(b'\0')
+            text = text[:-1]
+        return text.decode('utf-8'), offset + 4 + length + (-length % 4)
+
+    if value_type == 0:
+        return None, offset
+    if value_type == 1:
+        return bool(struct.unpack_from('<i', data, offset)[0]), offset + 4
+    if value_type in (2, 3):
+        fmt = ('<q' if is_64 else '<i') if value_type == 2 else ('<d' if is_64 else '<f')
+        return struct.unpack_from(fmt, data, offset)[0], offset + struct.calcsize(fmt)
+    if value_type == 4:
+        return read_string(offset)
+
+    count, = struct.unpack_from('<I', data, offset)
+    offset += 4
+    if value_type == 27:
+        result = {}
+        for _ in range(count):
+            key, offset = decode(data, offset)
+            result[key], offset = decode(data, offset)
+        return result, offset
+    if value_type == 28:
+        result = []
+        for _ in range(count):
+            item, offset = decode(data, offset)
+            result.append(item)
+        return result, offset
+    if value_type in (31, 33):
+        fmt = f'<{count}{"q" if value_type == 31 else "d"}'
+        return list(struct.unpack_from(fmt, data, offset)), offset + struct.calcsize(fmt)
+    if value_type == 34:
+        result = []
+        for _ in range(count):
+            item, offset = read_string(offset, terminated=True)
+            result.append(item)
+        return result, offset
+    raise AssertionError(f'未知的Variant类型: {value_type}')
+
+
+@pytest.mark.parametrize('value, expected', GODOT_VAR_TO_BYTES)
+def test_encoding_matches_godot_var_to_bytes(value, expected):
+    assert encode(value).hex() == expected.replace(' ', '')
+
+
+@pytest.mark.parametrize('value, expected', GODOT_VAR_TO_BYTES)
+def test_encoding_round_trips(value, expected):
+    data = encode(value)
+    decoded, end = decode(data)
+
+    assert end == len(data)
+    assert decoded == value
+
+
+def test_unsupported_value_raises_type_error():
+    with pytest.raises(TypeError):
+        encode(object())
+
+
+def test_pack_column_chooses_packed_arrays():
+    assert type(pack_column([1, 2])) is PackedInt64Array
+    assert type(pack_column([1, 2.5])) is PackedFloat64Array
+    assert type(pack_column(['a', 'b'])) is PackedStringArray
+    assert type(pack_column([1, None])) is list
+    assert type(pack_column([True, False])) is list
+
+
+def test_binary_file_matches_json_output(tmp_path, make_workbook, make_config):
+    make_workbook('items', {
+        'items': [
+            ['ID', 'name', 'rate', 'active', 'note'],
+            [1, '铁剑', 0.5, True, None],
+            [2, '木盾', 0.1, False, '稀有'],
+        ],
+        'drops': [['ID', 'item'], [1, 2]],
+    })
+    config = make_config({'DEFAULT': {'include_null_values': 'true'}})
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'), config_path=config,
+                                     binary_output=True, incremental=False)
+    assert converter.convert_all_files()['success'] == 1
+
+    data = (tmp_path / 'json' / 'items.bin').read_bytes()
+    table, end = decode(data)
+    assert end == len(data)
+    with open(tmp_path / 'json' / 'items.json', encoding='utf-8') as f:
+        records = json.load(f)
+
+    assert table['format'] == 'py_excel_tool.columnar'
+    assert list(table['sheets']) == list(records)
+    for sheet_name, sheet in table['sheets'].items():
+        assert sheet['row_count'] == len(records[sheet_name])
+        rows = [dict(zip(sheet['columns'], row)) for row in zip(*sheet['data'])]
+        assert rows == records[sheet_name]
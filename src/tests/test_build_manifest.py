@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""构建清单：未变化的工作簿跳过转换，转换失败的工作簿不记入清单"""
+
+import pytest
+
+from excel_to_json import ExcelToJsonConverter
+from gdscript_generator import GDScriptGenerator
+
+HERO_ROWS = [
+    ['ID', 'name', 'value'],
+    [1, '铁剑', 1.5],
+    [2, '木盾', 2.5],
+]
+
+ITEM_ROWS = [
+    ['ID', 'type'],
+    [1, 'weapon'],
+    [2, 'potion'],
+]
+
+
+def create_converter(tmp_path, config, **options):
+    """创建输出到 tmp_path/json 的转换器"""
+    return ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'),
+                                config_path=config, **options)
+
+
+def test_unchanged_workbooks_are_skipped(tmp_path, make_workbook, make_config, read_outputs):
+    make_workbook('hero', {'hero': HERO_ROWS})
+    make_workbook('items', {'items': ITEM_ROWS})
+    config = make_config()
+
+    result = create_converter(tmp_path, config).convert_all_files()
+    assert result == {'success': 2, 'failed': 0, 'skipped': 0}
+    first_outputs = read_outputs(tmp_path / 'json')
+
+    result = create_converter(tmp_path, config).convert_all_files()
+    assert result == {'success': 0, 'failed': 0, 'skipped': 2}
+    assert read_outputs(tmp_path / 'json') == first_outputs
+
+
+def test_changed_workbook_is_converted_again(tmp_path, make_workbook, make_config):
+    make_workbook('hero', {'hero': HERO_ROWS})
+    make_workbook('items', {'items': ITEM_ROWS})
+    config = make_config()
+    create_converter(tmp_path, config).convert_all_files()
+
+    make_workbook('hero', {'hero': HERO_ROWS + [[3, '药水', 0.5]]})
+    result = create_converter(tmp_path, config).convert_all_files()
+
+    assert result == {'success': 1, 'failed': 0, 'skipped': 1}
+    assert '药水' in (tmp_path / 'json' / 'hero.json').read_text(encoding='utf-8')
+
+
+def test_missing_output_forces_conversion(tmp_path, make_workbook, make_config):
+    make_workbook('hero', {'hero': HERO_ROWS})
+    config = make_config()
+    create_converter(tmp_path, config).convert_all_files()
+
+    (tmp_path / 'json' / 'hero.json').unlink()
+    result = create_converter(tmp_path, config).convert_all_files()
+
+    assert result == {'success': 1, 'failed': 0, 'skipped': 0}
+    assert (tmp_path / 'json' / 'hero.json').exists()
+
+
+def test_unreadable_workbook_is_not_recorded(tmp_path, make_workbook, make_config):
+    make_workbook('hero', {'hero': HERO_ROWS})
+    (tmp_path / 'excel' / 'broken.xlsx').write_bytes(b'not a workbook')
+    config = make_config()
+
+    result = create_converter(tmp_path, config).convert_all_files()
+    assert result == {'success': 1, 'failed': 1, 'skipped': 0}
+
+    # 失败的文件每次都重新尝试，成功的文件被跳过
+    result = create_converter(tmp_path, config).convert_all_files()
+    assert result == {'success': 0, 'failed': 1, 'skipped': 1}
+
+
+@pytest.mark.parametrize('pipeline_writes', [False, True])
+def test_workbook_saved_during_conversion_is_converted_again(tmp_path, make_workbook, make_config, monkeypatch,
+                                                             pipeline_writes):
+    make_workbook('hero', {'hero': [['ID', 'v'], [1, 'old']]})
+    config = make_config()
+    original = ExcelToJsonConverter.write_outputs
+
+    def save_while_converting(self, excel_file, *args):
+        outputs = original(self, excel_file, *args)
+        # 输出由旧内容生成后，工作簿被重新保存
+        make_workbook('hero', {'hero': [['ID', 'v'], [1, 'new'], [2, 'new']]})
+        return outputs
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ExcelToJsonConverter, 'write_outputs', save_while_converting)
+        converter = create_converter(tmp_path, config, pipeline_writes=pipeline_writes)
+        assert converter.convert_all_files()['success'] == 1
+    assert '"old"' in (tmp_path / 'json' / 'hero.json').read_text(encoding='utf-8')
+
+    # 清单记录的是转换所用的旧内容，新内容不会被当作已是最新
+    converter = create_converter(tmp_path, config)
+    assert not converter.manifest.is_up_to_date(tmp_path / 'excel' / 'hero.xlsx')
+    assert converter.convert_all_files() == {'success': 1, 'failed': 0, 'skipped': 0}
+    assert '"new"' in (tmp_path / 'json' / 'hero.json').read_text(encoding='utf-8')
+
+
+def test_gdscript_failure_fails_the_file_and_retries(tmp_path, make_workbook, make_config, monkeypatch):
+    make_workbook('hero', {'hero': HERO_ROWS})
+    config = make_config()
+    options = {'generate_gdscript': True, 'gdscript_output_dir': str(tmp_path / 'gd')}
+
+    def fail(self, *args, **kwargs):
+        raise OSError('磁盘已满')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(GDScriptGenerator, 'generate_scripts_from_structure', fail)
+        result = create_converter(tmp_path, config, **options).convert_all_files()
+    assert result == {'success': 0, 'failed': 1, 'skipped': 0}
+
+    # 脚本生成失败的文件没有记入清单，下次转换时重新生成
+    result = create_converter(tmp_path, config, **options).convert_all_files()
+    assert result == {'success': 1, 'failed': 0, 'skipped': 0}
+    assert list((tmp_path / 'gd').rglob('*.gd'))
+
+    result = create_converter(tmp_path, config, **options).convert_all_files()
+    assert result == {'success': 0, 'failed': 0, 'skipped': 1}
+
+
+def test_gdscript_failure_in_pipeline_fails_the_file(tmp_path, make_workbook, make_config, monkeypatch):
+    make_workbook('hero', {'hero': HERO_ROWS})
+    make_workbook('items', {'items': ITEM_ROWS})
+    config = make_config()
+    options = {'generate_gdscript': True, 'gdscript_output_dir': str(tmp_path / 'gd'), 'pipeline_writes': True}
+    original = GDScriptGenerator.generate_scripts_from_structure
+
+    def fail_for_items(self, structure, output_dir, name):
+        if name == 'items':
+            raise OSError('磁盘已满')
+        return original(self, structure, output_dir, name)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(GDScriptGenerator, 'generate_scripts_from_structure', fail_for_items)
+        result = create_converter(tmp_path, config, **options).convert_all_files()
+    assert result == {'success': 1, 'failed': 1, 'skipped': 0}
+
+    result = create_converter(tmp_path, config, **options).convert_all_files()
+    assert result == {'success': 1, 'failed': 0, 'skipped': 1}
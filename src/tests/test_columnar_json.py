@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""列式JSON布局：解码后与记录布局的输出相同"""
+
+import json
+
+from build_manifest import MANIFEST_FILENAME
+from columnar_json import ColumnarJsonBuilder, encode_column
+from excel_to_json import ExcelToJsonConverter
+
+ITEM_ROWS = [
+    ['ID', 'name', 'type', 'attack'],
+    [1, '铁剑', 'weapon', 10],
+    [2, '木盾', 'armor', None],
+    [3, '药水', 'potion', 0],
+    [4, '长剑', 'weapon', 12],
+    [5, '短剑', 'weapon', 8],
+    [6, '皮甲', 'armor', None],
+]
+
+DROP_ROWS = [
+    ['ID', 'item', 'rate'],
+    [1, 1, 0.5],
+    [2, 3, 0.25],
+]
+
+
+def decode_sheet(sheet):
+    """把列式工作表还原为记录列表"""
+    columns = []
+    for column in sheet['data']:
+        if isinstance(column, dict):
+            column = [column['values'][code] for code in column['codes']]
+        assert len(column) == sheet['row_count']
+        columns.append(column)
+    return [dict(zip(sheet['columns'], row)) for row in zip(*columns)]
+
+
+def convert(tmp_path, output_name, config, **options):
+    """把 tmp_path/excel 转换到 tmp_path/<output_name>，返回转换统计"""
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / output_name),
+                                     config_path=config, **options)
+    return converter.convert_all_files()
+
+
+def test_encode_column_uses_dictionary_for_repeated_strings():
+    encoded = encode_column(['weapon', 'armor', 'weapon', None, 'weapon', 'armor'])
+
+    assert encoded == {'values': ['weapon', 'armor', None], 'codes': [0, 1, 0, 2, 0, 1]}
+
+
+def test_encode_column_keeps_plain_arrays():
+    assert encode_column([1, 2, 1, 2]) == [1, 2, 1, 2]
+    assert encode_column(['a', 'b', 'c']) == ['a', 'b', 'c']
+    assert encode_column(['a', 1, 'a', 'a']) == ['a', 1, 'a', 'a']
+
+
+def test_builder_fills_missing_fields_with_null():
+    sheet = ColumnarJsonBuilder().build([{'ID': 1}, {'ID': 2, 'name': 'x'}])
+
+    assert sheet == {'row_count': 2, 'columns': ['ID', 'name'], 'data': [[1, 2], [None, 'x']]}
+
+
+def test_columnar_output_decodes_to_records(tmp_path, make_workbook, make_config):
+    make_workbook('items', {'items': ITEM_ROWS, 'drops': DROP_ROWS})
+    config = make_config({'DEFAULT': {'include_null_values': 'true'}})
+    convert(tmp_path, 'records', config, incremental=False)
+    convert(tmp_path, 'columnar', config, incremental=False, json_layout='columnar')
+
+    with open(tmp_path / 'records' / 'items.json', encoding='utf-8') as f:
+        records = json.load(f)
+    with open(tmp_path / 'columnar' / 'items.json', encoding='utf-8') as f:
+        columnar = json.load(f)
+
+    assert list(columnar) == list(records)
+    assert {name: decode_sheet(sheet) for name, sheet in columnar.items()} == records
+    # 类型列重复值多，按字典编码
+    assert columnar['items']['data'][2] == {'values': ['weapon', 'armor', 'potion'],
+                                            'codes': [0, 1, 2, 0, 0, 1]}
+
+
+def test_columnar_sheets_from_cache_match_full_conversion(tmp_path, make_workbook, make_config, read_outputs):
+    make_workbook('items', {'items': ITEM_ROWS, 'drops': DROP_ROWS})
+    config = make_config()
+    options = {'json_layout': 'columnar', 'output_profile': 'release,dev'}
+    convert(tmp_path, 'expected', config, incremental=False, **options)
+
+    for _ in range(2):
+        (tmp_path / 'json' / MANIFEST_FILENAME).unlink(missing_ok=True)
+        assert convert(tmp_path, 'json', config, **options)['success'] == 1
+        assert read_outputs(tmp_path / 'json') == read_outputs(tmp_path / 'expected')
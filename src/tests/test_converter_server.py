@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""常驻服务：转换器按参数和配置内容复用（数量有上限），构建清单在每次请求前重新读取，参数检查"""
+
+import io
+import json
+import os
+
+import converter_server
+from build_manifest import MANIFEST_FILENAME
+from converter_server import ConverterServer
+
+HERO_ROWS = [
+    ['ID', 'name'],
+    [1, '铁剑'],
+    [2, '木盾'],
+]
+
+
+def create_server():
+    """创建使用内存流的服务"""
+    return ConverterServer(io.StringIO(), io.StringIO())
+
+
+def test_deleted_manifest_forces_conversion(tmp_path, make_workbook, make_config):
+    make_workbook('hero', {'hero': HERO_ROWS})
+    server = create_server()
+    params = {'input': str(tmp_path / 'excel'), 'output': str(tmp_path / 'json'), 'config': make_config()}
+
+    assert server.handle_convert(params) == {'success': 1, 'failed': 0, 'skipped': 0}
+    assert server.handle_convert(params) == {'success': 0, 'failed': 0, 'skipped': 1}
+
+    (tmp_path / 'json' / MANIFEST_FILENAME).unlink()
+    assert server.handle_convert(params) == {'success': 1, 'failed': 0, 'skipped': 0}
+    assert (tmp_path / 'json' / MANIFEST_FILENAME).exists()
+
+
+def test_converter_reused_until_config_content_changes(tmp_path, make_config):
+    config = make_config({'OUTPUT': {'json_layout': 'records'}})
+    server = create_server()
+    params = {'input': str(tmp_path / 'excel'), 'output': str(tmp_path / 'json'), 'config': config}
+
+    converter = server.get_converter(params)
+
+    # 重新保存相同内容（只改变修改时间）时继续复用
+    stat = os.stat(config)
+    os.utime(config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert server.get_converter(params) is converter
+
+    make_config({'OUTPUT': {'json_layout': 'columnar'}})
+    rebuilt = server.get_converter(params)
+    assert rebuilt is not converter
+    assert rebuilt.json_layout == 'columnar'
+
+
+def test_handle_line_reports_unknown_method():
+    response = create_server().handle_line(json.dumps({'jsonrpc': '2.0', 'id': 7, 'method': 'missing'}))
+
+    assert response['id'] == 7
+    assert response['error']['code'] == -32601
+
+
+def test_force_applies_only_to_its_request(tmp_path, make_workbook, make_config):
+    make_workbook('hero', {'hero': HERO_ROWS})
+    server = create_server()
+    params = {'input': str(tmp_path / 'excel'), 'output': str(tmp_path / 'json'), 'config': make_config()}
+
+    assert server.handle_convert(params) == {'success': 1, 'failed': 0, 'skipped': 0}
+    assert server.handle_convert({**params, 'force': True}) == {'success': 1, 'failed': 0, 'skipped': 0}
+    assert server.get_converter(params).force is False
+    assert server.handle_convert(params) == {'success': 0, 'failed': 0, 'skipped': 1}
+
+
+def test_sheets_must_be_list_of_strings(tmp_path, make_config):
+    server = create_server()
+    params = {'input': str(tmp_path / 'excel'), 'output': str(tmp_path / 'json'), 'config': make_config()}
+
+    for sheets in ('hero', ['hero', 1], {'hero': True}):
+        request = {'jsonrpc': '2.0', 'id': 3, 'method': 'convert', 'params': {**params, 'sheets': sheets}}
+        response = server.handle_line(json.dumps(request))
+        assert response['error']['code'] == -32602
+    assert not server.converters
+
+    assert server.get_converter({**params, 'sheets': [' hero ', '']}).sheets == ['hero']
+
+
+def test_converter_cache_evicts_least_recently_used(tmp_path, make_config, monkeypatch):
+    monkeypatch.setattr(converter_server, 'MAX_CACHED_CONVERTERS', 2)
+    server = create_server()
+    base = {'input': str(tmp_path / 'excel'), 'config': make_config()}
+
+    first = server.get_converter({**base, 'output': str(tmp_path / 'a')})
+    server.get_converter({**base, 'output': str(tmp_path / 'b')})
+    assert server.get_converter({**base, 'output': str(tmp_path / 'a')}) is first
+
+    server.get_converter({**base, 'output': str(tmp_path / 'c')})
+    assert len(server.converters) == 2
+    # b最久未使用，被淘汰；a仍被复用
+    assert server.get_converter({**base, 'output': str(tmp_path / 'a')}) is first
+    assert all('"b"' not in key and str(tmp_path / 'b') not in key for key in server.converters)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""dataframe_records：空值转换为None，可空整数列保持整数，只有含空值的列才逐值替换"""
+
+import json
+import math
+
+import pandas as pd
+import pytest
+
+from excel_readers import MAX_SAFE_INTEGER, dataframe_column_values, dataframe_records
+
+
+def column(values, dtype=None):
+    return dataframe_column_values(pd.Series(values, dtype=dtype))
+
+
+def test_nullable_int_column_stays_int():
+    values = column([1, None, 3])
+
+    assert values == [1, None, 3]
+    assert [type(value) for value in values] == [int, type(None), int]
+    assert json.dumps(values) == '[1, null, 3]'
+
+
+@pytest.mark.parametrize('dtype', ['Int64', 'Int32', 'float64', 'object'])
+def test_nullable_int_dtypes(dtype):
+    values = column([1, None, 3], dtype)
+
+    assert values == [1, None, 3]
+    assert [type(value) for value in values] == [int, type(None), int]
+
+
+def test_nullable_float_column_keeps_floats():
+    values = column([1.5, None, 3.0])
+
+    assert values == [1.5, None, 3.0]
+    assert [type(value) for value in values] == [float, type(None), float]
+
+
+def test_unsafe_integers_stay_float():
+    # 超出浮点数精确范围的值无法确定原本是否为整数
+    values = column([float(MAX_SAFE_INTEGER) * 4, None])
+
+    assert values == [float(MAX_SAFE_INTEGER) * 4, None]
+    assert type(values[0]) is float
+
+
+def test_columns_without_nulls_are_not_rewritten():
+    df = pd.DataFrame({'ID': [1, 2], 'rate': [1.0, 2.0], 'name': ['a', 'b'], 'flag': [True, False]})
+
+    records = list(dataframe_records(df))
+
+    # 没有空值的浮点列保持浮点，不因为值是整数而转换
+    assert records == [{'ID': 1, 'rate': 1.0, 'name': 'a', 'flag': True},
+                       {'ID': 2, 'rate': 2.0, 'name': 'b', 'flag': False}]
+    assert [type(value) for value in records[0].values()] == [int, float, str, bool]
+
+
+def test_only_columns_with_nulls_are_replaced(monkeypatch):
+    checked = []
+    isna = pd.Series.isna
+
+    def tracking_isna(series):
+        result = isna(series)
+        checked.append((series.name, bool(result.any())))
+        return result
+
+    monkeypatch.setattr(pd.Series, 'isna', tracking_isna)
+    df = pd.DataFrame({'ID': [1, 2, 3], 'level': [1, None, 3], 'name': ['a', None, 'c']})
+
+    records = list(dataframe_records(df))
+
+    assert checked == [('ID', False), ('level', True), ('name', True)]
+    assert records == [
+        {'ID': 1, 'level': 1, 'name': 'a'},
+        {'ID': 2, 'level': None, 'name': None},
+        {'ID': 3, 'level': 3, 'name': 'c'},
+    ]
+
+
+@pytest.mark.parametrize('missing', [None, math.nan, pd.NA, pd.NaT])
+def test_missing_values_become_none(missing):
+    assert column(['a', missing], 'object') == ['a', None]
+
+
+def test_datetime_column_with_nat():
+    values = column([pd.Timestamp('2024-01-02'), None])
+
+    assert values[1] is None
+    assert values[0] == pd.Timestamp('2024-01-02')
+
+
+def test_records_built_lazily():
+    df = pd.DataFrame({'ID': [1, 2], 'level': [1, None]})
+
+    records = dataframe_records(df)
+    df.loc[0, 'ID'] = 99
+
+    # 列在调用时已转换，之后修改DataFrame不影响记录
+    assert next(records) == {'ID': 1, 'level': 1}
+    assert next(records) == {'ID': 2, 'level': None}
+    assert next(records, None) is None
+
+
+def test_empty_and_duplicate_columns():
+    assert list(dataframe_records(pd.DataFrame({'ID': []}))) == []
+
+    df = pd.DataFrame([[1, None], [2, 3]], columns=['a', 'a.1'])
+    assert list(dataframe_records(df)) == [{'a': 1, 'a.1': None}, {'a': 2, 'a.1': 3}]
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""按列推断的 analyze_dataframe_structure 与逐条推断的 analyze_json_structure 结果一致"""
+
+import math
+
+import pandas as pd
+import pytest
+
+from excel_readers import dataframe_records
+from gdscript_generator import GDScriptGenerator
+
+COLUMNS = {
+    'int': pd.Series([1, 2, 3]),
+    'float': pd.Series([1.5, 2.0, -3.25]),
+    'integral_float': pd.Series([1.0, 2.0, 3.0]),
+    'bool': pd.Series([True, False, True]),
+    'nullable_int': pd.Series([1, None, 3], dtype='Int64'),
+    'nullable_int_as_float': pd.Series([1.0, math.nan, 3.0]),
+    'nullable_float': pd.Series([1.5, math.nan, 3.0]),
+    'nullable_bool': pd.Series([True, None, False], dtype='boolean'),
+    'nullable_string': pd.Series(['a', None, 'c'], dtype='string'),
+    'string': pd.Series(['铁剑', '木盾', '']),
+    'object_str': pd.Series(['a', 'b', 'c'], dtype=object),
+    'object_bool': pd.Series([True, False, True], dtype=object),
+    'object_int_float': pd.Series([1, 2.5, 3], dtype=object),
+    'object_int_str': pd.Series([1, 'two', 3], dtype=object),
+    'object_int_bool': pd.Series([1, True, 3], dtype=object),
+    'object_with_none': pd.Series(['a', None, 'c'], dtype=object),
+    'all_null': pd.Series([None, None, None], dtype=object),
+}
+
+
+@pytest.fixture
+def generator(tmp_path):
+    return GDScriptGenerator(str(tmp_path / 'config.ini'))
+
+
+def expected_type(generator, df):
+    """对转换器实际写出的记录逐条推断"""
+    structure = generator.analyze_json_structure({'sheet': list(dataframe_records(df))})
+    return structure['sheet']
+
+
+@pytest.mark.parametrize('name', COLUMNS)
+def test_single_column_matches_record_inference(generator, name):
+    df = pd.DataFrame({name: COLUMNS[name]})
+
+    assert generator.analyze_dataframe_structure(df) == expected_type(generator, df)
+
+
+def test_mixed_frame_matches_record_inference(generator):
+    df = pd.DataFrame(COLUMNS)
+
+    field_types = generator.analyze_dataframe_structure(df)
+
+    assert field_types == expected_type(generator, df)
+    assert list(field_types) == list(COLUMNS)
+    assert field_types['int'] == 'int'
+    assert field_types['float'] == 'float'
+    assert field_types['bool'] == 'bool'
+    assert field_types['object_int_float'] == 'float'
+    assert field_types['object_int_str'] == 'Variant'
+    assert field_types['nullable_int'] == 'Variant'
+
+
+def test_workbook_read_by_pandas_matches_record_inference(generator, make_workbook):
+    excel_file = make_workbook('mixed', {'mixed': [
+        ['ID', 'price', 'rate', 'flag', 'name', 'note', 'mixed'],
+        [1, 10, 0.5, True, '铁剑', None, 1],
+        [2, None, 1.0, False, '木盾', 'x', 'two'],
+        [3, 30, 2.25, True, '', None, 3.5],
+    ]})
+    df = pd.read_excel(excel_file, sheet_name='mixed')
+
+    assert generator.analyze_dataframe_structure(df) == expected_type(generator, df)
+
+
+def test_empty_frame(generator):
+    assert generator.analyze_dataframe_structure(pd.DataFrame({'ID': pd.Series([], dtype=int)})) is None
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""流式读取器与pandas读取路径（read_excel + dataframe_records）输出一致，读取引擎的自动选择"""
+
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from excel_readers import (MAX_SAFE_INTEGER, STREAM_READERS, CalamineStreamReader, OpenpyxlStreamReader,
+                           XlrdStreamReader, dataframe_records, select_reader)
+from excel_to_json import ExcelToJsonConverter
+
+
+def pandas_records(excel_file):
+    """转换器pandas后端的读取结果"""
+    with pd.ExcelFile(excel_file) as excel_data:
+        return {name: list(dataframe_records(excel_data.parse(name))) for name in excel_data.sheet_names}
+
+
+def stream_records(reader_class, excel_file):
+    """流式读取器的读取结果"""
+    return {name: list(records) for name, records in reader_class(excel_file).iter_sheets()}
+
+
+def typed(sheets):
+    """带类型的比较形式，避免 1 == 1.0 == True 掩盖类型差异"""
+    return {
+        name: [[(key, type(value).__name__, value) for key, value in record.items()] for record in records]
+        for name, records in sheets.items()
+    }
+
+
+def assert_parity(reader_class, excel_file):
+    expected = pandas_records(excel_file)
+    assert typed(stream_records(reader_class, excel_file)) == typed(expected)
+    return expected
+
+
+SHEETS = {
+    'duplicate_headers': [
+        ['ID', 'name', 'name', 'name.1', 'name'],
+        [1, 'a', 'b', 'c', 'd'],
+        [2, 'e', 'f', 'g', 'h'],
+    ],
+    'blank_headers': [
+        ['ID', None, 'value', None, None],
+        [1, 'x', 10, None, 'tail'],
+        [2, 'y', 20, 'mid', None],
+    ],
+    'na_strings': [
+        ['ID', 'text', 'number', 'flag'],
+        [1, 'NA', 1, 'TRUE'],
+        [2, 'null', 'N/A', 'false'],
+        [3, '#N/A', 3, 'None'],
+        [4, 'n/a', 'nan', 'True'],
+        [5, 'keep', 5, 'NULL'],
+    ],
+    'mixed_types': [
+        ['ID', 'int_str', 'int_float', 'bool_int', 'bool_str', 'numeric_str', 'date'],
+        [1, 1, 1, True, True, '7', datetime(2024, 1, 2)],
+        [2, 'two', 2.5, 0, 'yes', '8.5', 'later'],
+        [3, 3, 3, False, False, '9', datetime(2024, 3, 4, 5, 6)],
+    ],
+    'big_ints': [
+        ['ID', 'big', 'big_nullable', 'unsafe_nullable', 'huge'],
+        [1, MAX_SAFE_INTEGER, MAX_SAFE_INTEGER, MAX_SAFE_INTEGER + 1, 2 ** 62],
+        [2, -MAX_SAFE_INTEGER, None, 3, -(2 ** 62)],
+        [3, 12345678901234, 5, None, 7],
+    ],
+    'blank_rows': [
+        ['ID', 'name', 'level'],
+        [None, None, None],
+        [1, 'a', 1],
+        [None, None, None],
+        [2, 'b', None],
+        [3, 'c', 3],
+        [None, None, None],
+        [None, None, None],
+    ],
+    'short_rows': [
+        ['ID', 'name', 'level', 'note'],
+        [1, 'a'],
+        [2, 'b', 2],
+        [3, 'c', 3, 'x'],
+    ],
+    'header_only': [
+        ['ID', 'name'],
+    ],
+}
+
+
+HEADERS = [
+    ['a', 'a', 'a'],
+    ['a', 'a.1', 'a', 'a'],
+    ['a.1', 'a', 'a', 'a.2'],
+    ['a', None, 'a', None, 'b'],
+    ['Unnamed: 1', None, 'x'],
+    [1, 1, 2.0, 'x'],
+]
+
+
+@pytest.mark.parametrize('header', HEADERS, ids=[repr(header) for header in HEADERS])
+def test_header_names_match_pandas(make_workbook, header):
+    excel_file = make_workbook('header', {'header': [header, list(range(len(header)))]})
+
+    assert_parity(OpenpyxlStreamReader, excel_file)
+
+
+@pytest.mark.parametrize('sheet', SHEETS)
+def test_openpyxl_stream_matches_pandas(make_workbook, sheet):
+    excel_file = make_workbook(sheet, {sheet: SHEETS[sheet]})
+
+    assert_parity(OpenpyxlStreamReader, excel_file)
+
+
+def test_parity_cases_cover_pandas_rules(make_workbook):
+    """确认用例确实覆盖了需要特殊处理的规则，而不是两边都退化为字符串"""
+    excel_file = make_workbook('all', SHEETS)
+
+    records = assert_parity(OpenpyxlStreamReader, excel_file)
+
+    assert list(records['duplicate_headers'][0]) == ['ID', 'name', 'name.2', 'name.1', 'name.3']
+    assert list(records['blank_headers'][0]) == ['ID', 'Unnamed: 1', 'value', 'Unnamed: 3', 'Unnamed: 4']
+    assert [record['text'] for record in records['na_strings']] == [None, None, None, None, 'keep']
+    assert [record['number'] for record in records['na_strings']] == [1, None, 3, None, 5]
+    assert records['big_ints'][1]['big_nullable'] is None
+    assert records['big_ints'][0]['big'] == MAX_SAFE_INTEGER
+    assert [record['ID'] for record in records['blank_rows']] == [None, 1, None, 2, 3]
+    assert records['header_only'] == []
+
+
+def make_xls(path, sheets):
+    """用xlwt写出旧版.xls工作簿，None写为空单元格"""
+    xlwt = pytest.importorskip('xlwt')
+    workbook = xlwt.Workbook()
+    for sheet_name, rows in sheets.items():
+        worksheet = workbook.add_sheet(sheet_name)
+        for row_index, row in enumerate(rows):
+            for column_index, value in enumerate(row):
+                if value is not None:
+                    worksheet.write(row_index, column_index, value)
+    workbook.save(str(path))
+    return path
+
+
+# 整数超出.xls数值精度、日期需要单元格格式，.xls只比较其余用例
+XLS_SHEETS = [name for name in SHEETS if name not in ('big_ints', 'mixed_types')]
+
+
+@pytest.mark.parametrize('engine', sorted(STREAM_READERS))
+def test_installed_engine_matches_pandas(tmp_path, make_workbook, engine):
+    reader_class = STREAM_READERS[engine]
+    if not reader_class.available():
+        pytest.skip(f"未安装 {reader_class.package}")
+
+    if reader_class.supports(Path('book.xlsx')):
+        excel_file = make_workbook('parity', SHEETS)
+    else:
+        excel_file = make_xls(tmp_path / 'parity.xls', {name: SHEETS[name] for name in XLS_SHEETS})
+
+    assert_parity(reader_class, excel_file)
+
+
+@pytest.fixture
+def installed(monkeypatch):
+    """指定哪些读取引擎视为已安装"""
+    def install(*names):
+        for reader_class in STREAM_READERS.values():
+            monkeypatch.setattr(reader_class, 'available', classmethod(lambda cls: cls.name in names))
+    return install
+
+
+@pytest.mark.parametrize('names, file_name, expected', [
+    (('calamine', 'openpyxl', 'xlrd'), 'book.xlsx', CalamineStreamReader),
+    (('openpyxl', 'xlrd'), 'book.xlsx', OpenpyxlStreamReader),
+    (('openpyxl', 'xlrd'), 'BOOK.XLSM', OpenpyxlStreamReader),
+    (('calamine', 'openpyxl', 'xlrd'), 'book.xls', CalamineStreamReader),
+    (('openpyxl', 'xlrd'), 'book.xls', XlrdStreamReader),
+    (('openpyxl',), 'book.xls', None),
+    (('calamine', 'openpyxl'), 'book.xlsb', CalamineStreamReader),
+    (('openpyxl', 'xlrd'), 'book.xlsb', None),
+    ((), 'book.xlsx', None),
+])
+def test_auto_selects_first_available_engine(installed, names, file_name, expected):
+    installed(*names)
+
+    assert select_reader('auto', Path(file_name)) is expected
+
+
+@pytest.mark.parametrize('backend, file_name, expected', [
+    ('openpyxl', 'book.xlsx', OpenpyxlStreamReader),
+    ('xlrd', 'book.xls', XlrdStreamReader),
+    ('calamine', 'book.ods', CalamineStreamReader),
+    # 引擎不支持该格式时回退到pandas
+    ('openpyxl', 'book.xls', None),
+    ('xlrd', 'book.xlsx', None),
+    ('pandas', 'book.xlsx', None),
+])
+def test_explicit_backend(backend, file_name, expected):
+    assert select_reader(backend, Path(file_name)) is expected
+
+
+def test_unavailable_backend_rejected(tmp_path, make_config, installed):
+    installed('openpyxl', 'xlrd')
+
+    with pytest.raises(ValueError, match='python-calamine'):
+        ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'),
+                             config_path=make_config(), reader_backend='calamine')
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""WorkbookWatcher 轮询快照：去抖动、忽略 ~$ 锁文件和临时文件、删除工作簿时清理清单和输出"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+import file_watcher
+from build_manifest import MANIFEST_FILENAME
+from excel_to_json import ExcelToJsonConverter
+from file_watcher import WorkbookWatcher
+
+HERO = [['ID', 'name'], [1, '剑士']]
+
+
+class Clock:
+    """替代 time.monotonic 的手动时钟"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock_instance = Clock()
+    monkeypatch.setattr(file_watcher.time, 'monotonic', clock_instance)
+    return clock_instance
+
+
+@pytest.fixture
+def save(make_workbook):
+    """保存工作簿并设置确定的修改时间，避免文件系统时间精度导致快照不变"""
+    mtimes = {}
+
+    def save_workbook(name, rows, sheet_name=None):
+        path = make_workbook(name, {sheet_name or name: rows})
+        mtimes[name] = mtimes.get(name, 1_000_000_000_000_000_000) + 1_000_000_000
+        os.utime(path, ns=(mtimes[name], mtimes[name]))
+        return path
+
+    return save_workbook
+
+
+@pytest.fixture
+def watcher(tmp_path, make_config, save):
+    """先做一次批量转换并记录快照（与 watch() 启动时相同），记录之后每次 convert_single_file 的调用"""
+    save('hero', HERO)
+    save('items', [['ID', 'name'], [1, '铁剑']])
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'),
+                                     config_path=make_config())
+    assert converter.convert_all_files()['success'] == 2
+
+    watcher_instance = WorkbookWatcher(converter, interval=1.0, debounce=1.0)
+    watcher_instance.snapshot = watcher_instance.take_snapshot()
+
+    watcher_instance.converted = []
+    convert_single_file = converter.convert_single_file
+
+    def tracking_convert(excel_file, *args, **kwargs):
+        watcher_instance.converted.append(excel_file.name)
+        return convert_single_file(excel_file, *args, **kwargs)
+
+    converter.convert_single_file = tracking_convert
+    return watcher_instance
+
+
+def read_json(tmp_path, name):
+    return json.loads((tmp_path / 'json' / name).read_text(encoding='utf-8'))
+
+
+def read_manifest(tmp_path):
+    return json.loads((tmp_path / 'json' / MANIFEST_FILENAME).read_text(encoding='utf-8'))
+
+
+def test_converts_after_file_is_stable(tmp_path, watcher, save, clock):
+    save('hero', [['ID', 'name'], [1, '骑士']])
+    watcher.poll()
+    assert list(watcher.pending) == [tmp_path / 'excel' / 'hero.xlsx']
+    assert watcher.converted == []
+
+    clock.now += 0.5
+    watcher.poll()
+    assert watcher.converted == []
+
+    clock.now += 0.5
+    watcher.poll()
+    assert watcher.converted == ['hero.xlsx']
+    assert watcher.pending == {}
+    assert read_json(tmp_path, 'hero.json') == {'hero': [{'ID': 1, 'name': '骑士'}]}
+
+    # 没有新的变化时不再转换
+    clock.now += 5
+    watcher.poll()
+    assert watcher.converted == ['hero.xlsx']
+
+
+def test_each_change_restarts_debounce(tmp_path, watcher, save, clock):
+    # 模拟Excel分多次写入：每次变化都重新计时，稳定后只转换一次
+    for name in ('骑士', '游侠', '牧师'):
+        save('hero', [['ID', 'name'], [1, name]])
+        watcher.poll()
+        clock.now += 0.8
+    assert watcher.converted == []
+
+    watcher.poll()
+    assert watcher.converted == []
+
+    clock.now += 0.2
+    watcher.poll()
+    assert watcher.converted == ['hero.xlsx']
+    assert read_json(tmp_path, 'hero.json') == {'hero': [{'ID': 1, 'name': '牧师'}]}
+
+
+def test_next_timeout_waits_for_pending_file(watcher, save, clock):
+    assert watcher.next_timeout() == 1.0
+
+    save('hero', [['ID', 'name'], [1, '骑士']])
+    watcher.poll()
+    clock.now += 0.25
+    assert watcher.next_timeout() == pytest.approx(0.75)
+
+    clock.now += 5
+    assert watcher.next_timeout() == 0.0
+
+
+def test_lock_and_temp_files_ignored(tmp_path, watcher, clock):
+    excel_dir = tmp_path / 'excel'
+    # Excel打开工作簿时创建的锁文件，以及保存时的临时文件
+    (excel_dir / '~$hero.xlsx').write_bytes(b'\x00' * 165)
+    (excel_dir / 'A1B2C3D4').write_bytes(b'partial')
+    (excel_dir / 'hero.xlsx.tmp').write_bytes(b'partial')
+
+    watcher.poll()
+    clock.now += 5
+    watcher.poll()
+
+    assert watcher.pending == {}
+    assert watcher.converted == []
+    assert sorted(path.name for path in watcher.snapshot) == ['hero.xlsx', 'items.xlsx']
+
+
+def test_save_through_temp_file_converts_once(tmp_path, watcher, save, clock):
+    # Excel先写入无扩展名的临时文件，再重命名覆盖原文件
+    excel_dir = tmp_path / 'excel'
+    new_version = save('draft', [['ID', 'name'], [1, '骑士']], sheet_name='hero')
+    temp_file = excel_dir / 'A1B2C3D4'
+    new_version.rename(temp_file)
+    watcher.poll()
+    assert watcher.pending == {}
+
+    (excel_dir / '~$hero.xlsx').write_bytes(b'\x00' * 165)
+    temp_file.replace(excel_dir / 'hero.xlsx')
+    watcher.poll()
+    (excel_dir / '~$hero.xlsx').unlink()
+    clock.now += 0.5
+    watcher.poll()
+    clock.now += 0.5
+    watcher.poll()
+
+    assert watcher.converted == ['hero.xlsx']
+    assert read_json(tmp_path, 'hero.json') == {'hero': [{'ID': 1, 'name': '骑士'}]}
+
+
+def test_resave_without_changes_skips_conversion(tmp_path, watcher, clock, caplog):
+    hero = tmp_path / 'excel' / 'hero.xlsx'
+    os.utime(hero, ns=(2_000_000_000_000_000_000, 2_000_000_000_000_000_000))
+
+    watcher.poll()
+    clock.now += 1
+    with caplog.at_level(logging.INFO):
+        watcher.poll()
+
+    assert watcher.converted == []
+    assert any('文件内容未变化，跳过' in record.getMessage() for record in caplog.records)
+    # 清单更新为新的修改时间，之后的批量转换无需重新计算哈希
+    assert watcher.converter.is_up_to_date(hero)
+
+
+def test_deleted_workbook_pruned_from_manifest(tmp_path, watcher, clock):
+    hero_key = watcher.converter.manifest.source_key(tmp_path / 'excel' / 'hero.xlsx')
+    assert hero_key in read_manifest(tmp_path)['entries']
+
+    (tmp_path / 'excel' / 'hero.xlsx').unlink()
+    watcher.poll()
+
+    entries = read_manifest(tmp_path)['entries']
+    assert hero_key not in entries
+    assert len(entries) == 1
+    assert not (tmp_path / 'json' / 'hero.json').exists()
+    assert (tmp_path / 'json' / 'items.json').exists()
+    assert watcher.converted == []
+
+
+def test_deleted_before_stable_is_not_converted(tmp_path, watcher, save, clock):
+    hero = save('hero', [['ID', 'name'], [1, '骑士']])
+    watcher.poll()
+    assert hero in watcher.pending
+
+    hero.unlink()
+    clock.now += 0.5
+    watcher.poll()
+    clock.now += 5
+    watcher.poll()
+
+    assert watcher.pending == {}
+    assert watcher.converted == []
+    assert not (tmp_path / 'json' / 'hero.json').exists()
+
+
+def test_watch_polls_without_watchdog(tmp_path, make_config, save, monkeypatch, caplog):
+    # 未安装watchdog时按间隔轮询
+    monkeypatch.setitem(sys.modules, 'watchdog', None)
+    save('hero', HERO)
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'),
+                                     config_path=make_config())
+    watcher_instance = WorkbookWatcher(converter, interval=0.02, debounce=0.05)
+
+    with caplog.at_level(logging.INFO):
+        thread = threading.Thread(target=watcher_instance.watch)
+        thread.start()
+        try:
+            deadline = time.monotonic() + 10
+            while not watcher_instance.snapshot and time.monotonic() < deadline:
+                time.sleep(0.01)
+            save('hero', [['ID', 'name'], [1, '骑士']])
+
+            while time.monotonic() < deadline:
+                if read_json(tmp_path, 'hero.json') == {'hero': [{'ID': 1, 'name': '骑士'}]}:
+                    break
+                time.sleep(0.02)
+        finally:
+            watcher_instance.stop()
+            thread.join(10)
+
+    assert not thread.is_alive()
+    assert watcher_instance.observer is None
+    assert read_json(tmp_path, 'hero.json') == {'hero': [{'ID': 1, 'name': '骑士'}]}
+    assert any('使用轮询方式监视' in record.getMessage() for record in caplog.records)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""[INDEXES] 二级索引：唯一索引(!)、复合索引(a+b)、无效声明，以及生成的 get_by_<字段> 查询函数"""
+
+import logging
+
+import pytest
+
+from gdscript_generator import GDScriptGenerator
+
+FIELD_TYPES = {'ID': 'int', 'name': 'String', 'type': 'String', 'quality': 'int', 'Weight Kg': 'float'}
+
+
+@pytest.fixture
+def generator(make_config):
+    def create(declaration, sheet_name='items'):
+        return GDScriptGenerator(make_config({'INDEXES': {sheet_name: declaration}}))
+    return create
+
+
+def test_index_declarations_parsed(generator):
+    specs = generator('type, !name, type+quality, Weight Kg').get_index_specs('items', FIELD_TYPES, 'ID')
+
+    assert specs == [(['type'], False), (['name'], True), (['type', 'quality'], False), (['Weight Kg'], False)]
+
+
+@pytest.mark.parametrize('declaration, expected, message', [
+    ('bogus', [], '不存在的字段: bogus'),
+    ('type+bogus', [], '不存在的字段: bogus'),
+    ('Name', [], '不存在的字段: Name'),
+    ('!', [], '不存在的字段'),
+    ('ID', [], '与ID字段相同'),
+    ('type, !type', [(['type'], False)], '重复声明'),
+    ('type+quality, !type+quality', [(['type', 'quality'], False)], '重复声明'),
+])
+def test_invalid_declarations_skipped_with_warning(generator, caplog, declaration, expected, message):
+    with caplog.at_level(logging.WARNING):
+        specs = generator(declaration).get_index_specs('items', FIELD_TYPES, 'ID')
+
+    assert specs == expected
+    assert any(message in record.getMessage() for record in caplog.records)
+
+
+def test_composite_key_on_id_is_allowed(generator):
+    assert generator('ID+type, , ').get_index_specs('items', FIELD_TYPES, 'ID') == [(['ID', 'type'], False)]
+
+
+def test_other_sheets_and_missing_section_have_no_indexes(generator, make_config):
+    assert generator('type').get_index_specs('hero', FIELD_TYPES, 'ID') == []
+    assert GDScriptGenerator(make_config(name='plain.ini')).get_index_specs('items', FIELD_TYPES, 'ID') == []
+    # 配置项名不区分大小写
+    assert generator('type').get_index_specs('Items', FIELD_TYPES, 'ID') == [(['type'], False)]
+
+
+def test_loader_declares_indexes_and_accessors(generator):
+    script = generator('type, !name, type+quality').generate_loader_class('items', FIELD_TYPES)
+
+    assert 'var index_by_type: Dictionary[String, Array] = {}' in script
+    assert 'var index_by_name: Dictionary[String, Variant] = {}' in script
+    assert 'var index_by_type_and_quality: Dictionary[Array, Array] = {}' in script
+
+    # load_data 把每个数据项加入索引
+    assert '\t\t_index_item(data_item)' in script
+    assert '\tindex_by_name[data_item.name] = data_item' in script
+    assert '\tvar type_and_quality_key = [data_item.type, data_item.quality]' in script
+    assert '\tindex_by_type_and_quality[type_and_quality_key].append(data_item)' in script
+
+    assert 'func get_by_type(type: String) -> Array:\n\treturn index_by_type.get(type, [])' in script
+    assert 'func get_by_name(name: String) -> Variant:\n\treturn index_by_name.get(name, null)' in script
+    assert ('func get_by_type_and_quality(type: String, quality: int) -> Array:\n'
+            '\treturn index_by_type_and_quality.get([type, quality], [])') in script
+
+
+def test_field_names_converted_in_accessors(generator):
+    generator_instance = generator('Weight Kg')
+    script = generator_instance.generate_loader_class('items', FIELD_TYPES)
+    gd_name = generator_instance.convert_to_gdscript_name('Weight Kg')
+
+    assert f"func get_by_{gd_name}({gd_name}: float) -> Array:" in script
+    assert f"var index_by_{gd_name}: Dictionary[float, Array] = {{}}" in script
+
+
+def test_no_index_code_without_declarations(generator):
+    script = generator('').generate_loader_class('items', FIELD_TYPES)
+
+    assert 'index_by_' not in script
+    assert '_index_item' not in script
+
+
+def test_binary_and_columnar_loaders_index_items(generator):
+    generator_instance = generator('!name')
+    generator_instance.generate_binary_loader = True
+    generator_instance.generate_columnar_loader = True
+
+    script = generator_instance.generate_loader_class('items', FIELD_TYPES)
+
+    # JSON、列式JSON和二进制三条加载路径都维护索引
+    assert script.count('_index_item(data_item)') == 3
+
+
+def test_generated_scripts_include_indexes(tmp_path, make_workbook, make_config):
+    from excel_to_json import ExcelToJsonConverter
+
+    make_workbook('items', {'items': [['ID', 'name', 'type'], [1, '铁剑', 'weapon'], [2, '木盾', 'armor']]})
+    config = make_config({'INDEXES': {'items': '!name, type'}})
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'), config_path=config,
+                                     generate_gdscript=True, gdscript_output_dir=str(tmp_path / 'gdscript'))
+    assert converter.convert_all_files()['success'] == 1
+
+    loaders = list((tmp_path / 'gdscript').rglob('*loader*.gd'))
+    assert len(loaders) == 1
+    script = loaders[0].read_text(encoding='utf-8')
+    assert 'func get_by_name(name: String)' in script
+    assert 'func get_by_type(type: String) -> Array:' in script
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""分片输出：按行数切分、分片清单中的ID范围、ID字段查找"""
+
+import json
+
+import pytest
+
+from json_shards import SHARD_MANIFEST_FILENAME, ShardedJsonWriter, find_id_key
+from json_writer import JsonStreamWriter
+
+
+def write_shards(tmp_path, sheets, shard_rows=0, **writer_options):
+    """写出分片，返回 (输出文件列表, 分片清单)"""
+    writer = ShardedJsonWriter(JsonStreamWriter(**writer_options), shard_rows)
+    outputs = writer.write(sheets.items(), tmp_path / 'shards')
+    manifest = json.loads((tmp_path / 'shards' / SHARD_MANIFEST_FILENAME).read_text(encoding='utf-8'))
+    return outputs, manifest
+
+
+def load_shard(tmp_path, file_name):
+    return json.loads((tmp_path / 'shards' / file_name).read_text(encoding='utf-8'))
+
+
+@pytest.mark.parametrize('record, expected', [
+    ({'name': 'a', 'ID': 1, 'id': 2}, 'ID'),
+    ({'name': 'a', 'id': 'sword'}, 'id'),
+    ({'name': 'a', 'Key': 'k', 'index': 3}, 'Key'),
+    ({'name': 'a', 'index': 3}, 'index'),
+    ({'code': 'x', 'name': 'a'}, 'code'),
+    ({}, None),
+])
+def test_find_id_key(record, expected):
+    assert find_id_key(record) == expected
+
+
+@pytest.mark.parametrize('chunk_size', [1000, 2])
+def test_rows_split_into_shards(tmp_path, chunk_size):
+    records = [{'ID': index, 'name': f"物品{index}"} for index in (5, 3, 9, 1, 7, 2, 8)]
+
+    outputs, manifest = write_shards(tmp_path, {'items': records}, shard_rows=3, chunk_size=chunk_size)
+
+    entry = manifest['sheets']['items']
+    assert entry['id_field'] == 'ID'
+    assert entry['rows'] == 7
+    assert entry['shards'] == [
+        {'file': 'items.0.json', 'rows': 3, 'min_id': 3, 'max_id': 9},
+        {'file': 'items.1.json', 'rows': 3, 'min_id': 1, 'max_id': 7},
+        {'file': 'items.2.json', 'rows': 1, 'min_id': 8, 'max_id': 8},
+    ]
+    assert [path.name for path in outputs] == ['items.0.json', 'items.1.json', 'items.2.json', SHARD_MANIFEST_FILENAME]
+
+    loaded = [record for shard in entry['shards'] for record in load_shard(tmp_path, shard['file'])['items']]
+    assert loaded == records
+
+
+def test_exact_multiple_does_not_leave_empty_shard(tmp_path):
+    records = [{'ID': index} for index in range(4)]
+
+    _, manifest = write_shards(tmp_path, {'items': records}, shard_rows=2)
+
+    assert [shard['rows'] for shard in manifest['sheets']['items']['shards']] == [2, 2]
+    assert not (tmp_path / 'shards' / 'items.2.json').exists()
+
+
+def test_one_file_per_sheet_without_shard_rows(tmp_path):
+    sheets = {
+        'hero': [{'ID': 1}, {'ID': 2}],
+        'empty': [],
+        'meta': {'version': 3},
+    }
+
+    _, manifest = write_shards(tmp_path, sheets)
+
+    assert manifest['sheets']['hero']['shards'] == [{'file': 'hero.json', 'rows': 2, 'min_id': 1, 'max_id': 2}]
+    assert manifest['sheets']['empty'] == {'id_field': None, 'rows': 0,
+                                           'shards': [{'file': 'empty.json', 'rows': 0}]}
+    assert load_shard(tmp_path, 'empty.json') == {'empty': []}
+    assert manifest['sheets']['meta']['rows'] is None
+    assert load_shard(tmp_path, 'meta.json') == {'meta': {'version': 3}}
+
+
+def test_string_ids_use_string_order(tmp_path):
+    records = [{'key': key} for key in ('sword', 'axe', 'bow', 'Zweihander', '盾')]
+
+    _, manifest = write_shards(tmp_path, {'items': records}, shard_rows=3)
+
+    entry = manifest['sheets']['items']
+    assert entry['id_field'] == 'key'
+    assert entry['shards'][0] == {'file': 'items.0.json', 'rows': 3, 'min_id': 'axe', 'max_id': 'sword'}
+    assert entry['shards'][1] == {'file': 'items.1.json', 'rows': 2, 'min_id': 'Zweihander', 'max_id': '盾'}
+
+
+@pytest.mark.parametrize('ids', [
+    [1, 'two', 3],
+    ['one', 2, 3],
+    [1, None, 3],
+    [True, False, True],
+    [1, [2], 3],
+])
+def test_mixed_ids_omit_range_only_for_affected_shard(tmp_path, ids):
+    records = [{'ID': value} for value in ids] + [{'ID': 10}, {'ID': 20}]
+
+    _, manifest = write_shards(tmp_path, {'items': records}, shard_rows=3)
+
+    first, second = manifest['sheets']['items']['shards']
+    assert first == {'file': 'items.0.json', 'rows': 3}
+    assert second == {'file': 'items.1.json', 'rows': 2, 'min_id': 10, 'max_id': 20}
+
+
+def test_int_and_float_ids_compare_as_numbers(tmp_path):
+    _, manifest = write_shards(tmp_path, {'items': [{'ID': 2}, {'ID': 0.5}, {'ID': 3}]})
+
+    shard = manifest['sheets']['items']['shards'][0]
+    assert (shard['min_id'], shard['max_id']) == (0.5, 3)
+
+
+def test_shard_file_names_are_unique_and_safe(tmp_path):
+    sheets = {'shards': [{'ID': 1}], 'A/B': [{'ID': 2}], 'Hero': [{'ID': 3}], 'hero': [{'ID': 4}]}
+
+    outputs, manifest = write_shards(tmp_path, sheets)
+
+    files = [entry['shards'][0]['file'] for entry in manifest['sheets'].values()]
+    assert files == ['shards_.json', 'A_B.json', 'Hero.json', 'hero_1.json']
+    assert len({path.name.lower() for path in outputs}) == len(outputs)
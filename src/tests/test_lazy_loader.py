@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""lazy_loading = true 生成的延迟加载器：ID/索引键的类型转换、按需创建数据项和 release_cache"""
+
+import pytest
+
+from gdscript_generator import GDScriptGenerator
+
+FIELD_TYPES = {'ID': 'int', 'name': 'String', 'weight': 'float', 'usable': 'bool', 'extra': 'Variant'}
+
+
+@pytest.fixture
+def generator(make_config):
+    def create(indexes=None, **gdscript):
+        sections = {'GDSCRIPT': {'lazy_loading': 'true', **gdscript}}
+        if indexes:
+            sections['INDEXES'] = {'items': indexes}
+        return GDScriptGenerator(make_config(sections))
+    return create
+
+
+def lazy_script(generator_instance, field_types=FIELD_TYPES):
+    return generator_instance.generate_loader_class('items', field_types)
+
+
+def test_lazy_loading_config_selects_lazy_loader(generator, make_config):
+    assert 'func release_cache():' in lazy_script(generator())
+    assert 'func release_cache():' not in GDScriptGenerator(make_config(name='eager.ini')).generate_loader_class(
+        'items', FIELD_TYPES)
+
+
+@pytest.mark.parametrize('id_field, id_type, expression', [
+    ('ID', 'int', 'int(_field_value(row, 0, 0))'),
+    ('name', 'String', 'str(_field_value(row, 0, ""))'),
+    ('weight', 'float', 'float(_field_value(row, 0, 0.0))'),
+    ('usable', 'bool', 'bool(_field_value(row, 0, false))'),
+    ('extra', 'Variant', '_field_value(row, 0, null)'),
+])
+def test_row_by_id_casts_key_to_field_type(generator, id_field, id_type, expression):
+    # JSON中的数字在Godot中解析为float，键必须转换为字段类型才能与 get_by_id 的参数匹配
+    field_types = {id_field: id_type, 'other': 'int'}
+    lines = generator().generate_lazy_loader_lines('items', field_types, id_field, [])
+    script = '\n'.join(lines)
+
+    assert f"var _row_by_id: Dictionary[{id_type}, int] = {{}}" in script
+    assert f"\t\t_row_by_id[{expression}] = row" in script
+    assert f"func get_by_id(id: {id_type}) -> Variant:\n\tvar row = _row_by_id.get(id, -1)" in script
+
+
+def test_key_position_follows_column_order(generator):
+    field_types = {'name': 'String', 'level': 'int', 'ID': 'int'}
+    script = '\n'.join(generator().generate_lazy_loader_lines('items', field_types, 'ID', []))
+
+    assert 'const FIELD_NAMES: Array[String] = ["name", "level", "ID"]' in script
+    assert '\t\t_row_by_id[int(_field_value(row, 2, 0))] = row' in script
+
+
+def test_no_id_field_indexes_nothing(generator):
+    script = '\n'.join(generator().generate_lazy_loader_lines('items', {}, '', []))
+
+    assert '_row_by_id[' not in script
+    assert '\tfor row in range(first_row, row_count):\n\t\tpass' in script
+
+
+def test_items_created_on_first_access_and_released(generator):
+    script = lazy_script(generator())
+
+    assert 'var _items: Array[Variant] = []' in script
+    assert ('func get_at(row: int) -> Variant:\n'
+            '\tvar data_item = _items[row]\n'
+            '\tif data_item == null:\n'
+            '\t\tdata_item = _create_item(row)\n'
+            '\t\t_items[row] = data_item\n'
+            '\treturn data_item') in script
+    # 释放缓存只清空数据项，保留原始数据和ID/索引映射
+    assert 'func release_cache():\n\t_items.fill(null)\n' in script
+    assert 'func get_count() -> int:\n\treturn _row_count' in script
+    # 加载时不创建数据项
+    load_data = script[script.index('func load_data'):script.index('func _reset_rows')]
+    assert 'ItemsData.new(' not in load_data
+
+
+def test_reload_clears_cache_and_indexes(generator):
+    script = lazy_script(generator('!name, name+usable'))
+
+    reset = script[script.index('func _reset_rows'):script.index('func _index_rows')]
+    for line in ('\t_items.clear()', '\t_row_by_id.clear()',
+                 '\tindex_by_name.clear()', '\tindex_by_name_and_usable.clear()'):
+        assert line in reset
+
+
+def test_lazy_indexes_map_keys_to_rows(generator):
+    script = lazy_script(generator('!name, name+usable'))
+
+    assert 'var index_by_name: Dictionary[String, int] = {}' in script
+    assert 'var index_by_name_and_usable: Dictionary[Array, Array] = {}' in script
+    assert '\t\tindex_by_name[str(_field_value(row, 1, ""))] = row' in script
+    assert ('\t\tvar name_and_usable_key = [str(_field_value(row, 1, "")), bool(_field_value(row, 3, false))]'
+            in script)
+    assert ('func get_by_name(name: String) -> Variant:\n'
+            '\tvar row = index_by_name.get(name, -1)\n'
+            '\treturn null if row < 0 else get_at(row)') in script
+    assert '\tfor row in index_by_name_and_usable.get([name, usable], []):\n\t\titems.append(get_at(row))' in script
+
+
+def test_create_item_from_columns(generator):
+    plain = lazy_script(generator())
+    assert '\tdata_item.weight = _columns[2][row]' in plain
+
+    optimized = lazy_script(generator(optimized_scripts='true'))
+    assert '\treturn DataScript.ItemsData.from_columns(_columns, row)' in optimized
+
+
+def test_binary_and_columnar_loaders_keep_columns(generator):
+    generator_instance = generator()
+    generator_instance.generate_binary_loader = True
+    generator_instance.generate_columnar_loader = True
+
+    script = lazy_script(generator_instance)
+
+    assert script.count('\t_columns = field_columns\n\t_reset_rows(int(sheet["row_count"]))') == 2
+    assert 'data_array' not in script
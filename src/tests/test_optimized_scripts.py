@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""optimized_scripts = true：强类型容器和返回值、单次字典查找的构造函数、按列构造的 from_columns"""
+
+import pytest
+
+from gdscript_generator import GDScriptGenerator
+
+FIELD_TYPES = {'ID': 'int', '名称': 'String', 'weight': 'float', 'tags': 'Array'}
+ITEM_TYPE = 'DataScript.ItemsData'
+
+
+@pytest.fixture
+def generator(make_config):
+    def create(optimized=True, **options):
+        sections = {'GDSCRIPT': {'optimized_scripts': 'true' if optimized else 'false'}}
+        if options.get('indexes'):
+            sections['INDEXES'] = {'items': options['indexes']}
+        generator_instance = GDScriptGenerator(make_config(sections))
+        generator_instance.generate_binary_loader = options.get('binary', False)
+        generator_instance.generate_columnar_loader = options.get('columnar', False)
+        return generator_instance
+    return create
+
+
+def test_data_class_reads_each_field_once(generator):
+    script = generator().generate_data_class('items', FIELD_TYPES)
+
+    assert '\t\tid = data.get("ID", id)' in script
+    assert '\t\tweight = data.get("weight", weight)' in script
+    assert '\t\ttags = data.get("tags", tags)' in script
+    assert 'data.has(' not in script
+
+
+def test_from_columns_assigns_fields_in_column_order(generator):
+    script = generator().generate_data_class('items', FIELD_TYPES)
+    gd_name = generator().convert_to_gdscript_name('名称')
+
+    assert ('\tstatic func from_columns(columns: Array, row: int) -> ItemsData:\n'
+            '\t\tvar item := ItemsData.new()\n'
+            '\t\titem.id = columns[0][row]\n'
+            f"\t\titem.{gd_name} = columns[1][row]\n"
+            '\t\titem.weight = columns[2][row]\n'
+            '\t\titem.tags = columns[3][row]\n'
+            '\t\treturn item') in script
+
+
+def test_plain_data_class_unchanged(generator):
+    script = generator(optimized=False).generate_data_class('items', FIELD_TYPES)
+
+    assert '\t\tif data.has("ID"):\n\t\t\tid = data["ID"]' in script
+    assert 'from_columns' not in script
+    assert 'data.get(' not in script
+
+
+def test_loader_uses_typed_containers(generator):
+    script = generator(indexes='!weight, tags').generate_loader_class('items', FIELD_TYPES)
+
+    assert f"var data_dict: Dictionary[int, {ITEM_TYPE}] = {{}}" in script
+    assert f"var data_array: Array[{ITEM_TYPE}] = []" in script
+    assert f"var index_by_weight: Dictionary[float, {ITEM_TYPE}] = {{}}" in script
+    assert 'var index_by_tags: Dictionary[Array, Array] = {}' in script
+    assert f"func _index_item(data_item: {ITEM_TYPE}) -> void:" in script
+    assert f"func get_by_id(id: int) -> {ITEM_TYPE}:" in script
+    assert f"func get_by_weight(weight: float) -> {ITEM_TYPE}:" in script
+    assert f"func get_all() -> Array[{ITEM_TYPE}]:" in script
+    assert f"func create_data_item(data: Dictionary) -> {ITEM_TYPE}:" in script
+    assert 'Variant' not in script
+
+
+def test_plain_loader_uses_variant(generator):
+    script = generator(optimized=False).generate_loader_class('items', FIELD_TYPES)
+
+    assert 'var data_dict: Dictionary[int, Variant] = {}' in script
+    assert 'var data_array: Array[Variant] = []' in script
+    assert 'func get_by_id(id: int) -> Variant:' in script
+    assert f"[{ITEM_TYPE}]" not in script
+    assert f"-> {ITEM_TYPE}" not in script
+
+
+def test_column_loaders_use_from_columns(generator):
+    script = generator(binary=True, columnar=True).generate_loader_class('items', FIELD_TYPES)
+
+    assert script.count(f"\t\tvar data_item = {ITEM_TYPE}.from_columns(field_columns, i)") == 2
+    assert 'field_columns[0][i]' not in script
+
+    plain = generator(optimized=False, binary=True, columnar=True).generate_loader_class('items', FIELD_TYPES)
+    assert 'from_columns' not in plain
+    assert plain.count('\t\tdata_item.id = field_columns[0][i]') == 2
+
+
+def test_class_name_settings_apply_to_item_type(make_config):
+    config = make_config({'GDSCRIPT': {'optimized_scripts': 'true', 'class_name_prefix': 'Game',
+                                       'class_name_suffix': 'Row'}})
+    generator_instance = GDScriptGenerator(config)
+
+    assert generator_instance.get_item_type('items') == 'DataScript.GameItemsRow'
+    script = generator_instance.generate_loader_class('items', FIELD_TYPES)
+    assert 'var data_array: Array[DataScript.GameItemsRow] = []' in script
+    assert 'static func from_columns(columns: Array, row: int) -> GameItemsRow:' in \
+        generator_instance.generate_data_class('items', FIELD_TYPES)
+
+
+def test_generated_scripts_from_workbook(tmp_path, make_workbook, make_config):
+    from excel_to_json import ExcelToJsonConverter
+
+    make_workbook('items', {'items': [['ID', 'name', 'weight'], [1, '铁剑', 1.5], [2, '木盾', 2.5]]})
+    config = make_config({'GDSCRIPT': {'optimized_scripts': 'true'}, 'OUTPUT': {'binary_output': 'true'}})
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'), config_path=config,
+                                     generate_gdscript=True, gdscript_output_dir=str(tmp_path / 'gdscript'))
+    assert converter.convert_all_files()['success'] == 1
+
+    scripts = {path.name: path.read_text(encoding='utf-8') for path in (tmp_path / 'gdscript').rglob('*.gd')}
+    data_script = next(text for name, text in scripts.items() if 'static func from_columns' in text)
+    loader_script = next(text for name, text in scripts.items() if 'func load_data' in text)
+    assert '\t\tname = data.get("name", name)' in data_script
+    assert f"var data_array: Array[{ITEM_TYPE}] = []" in loader_script
+    assert f"{ITEM_TYPE}.from_columns(field_columns, i)" in loader_script
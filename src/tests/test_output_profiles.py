@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""多个输出配置与工作表缓存：命中缓存时每个配置的输出与完整转换逐字节相同"""
+
+import json
+import logging
+
+import pytest
+
+from build_manifest import MANIFEST_FILENAME
+from excel_to_json import ExcelToJsonConverter
+
+# 字段顺序不是字母序，dev配置按字段名排序后与其他配置不同
+ITEM_ROWS = [
+    ['ID', 'name', 'type', 'attack'],
+    [1, '铁剑', 'weapon', 10],
+    [2, '木盾', 'armor', None],
+    [3, '药水', 'potion', 0],
+]
+
+DROP_ROWS = [
+    ['ID', 'item', 'rate'],
+    [1, 1, 0.5],
+    [2, 3, 0.25],
+]
+
+PROFILES = 'dev,release,default'
+
+
+def convert(tmp_path, output_name, config, **options):
+    """把 tmp_path/excel 转换到 tmp_path/<output_name>，返回转换统计"""
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / output_name),
+                                     config_path=config, output_profile=PROFILES, **options)
+    return converter.convert_all_files()
+
+
+@pytest.fixture
+def workbook(make_workbook):
+    return make_workbook('items', {'items': ITEM_ROWS, 'drops': DROP_ROWS})
+
+
+def test_profiles_are_written_to_subdirectories(tmp_path, workbook, make_config):
+    convert(tmp_path, 'json', make_config(), incremental=False)
+    output_dir = tmp_path / 'json'
+
+    dev = (output_dir / 'items.json').read_text(encoding='utf-8')
+    release = (output_dir / 'release' / 'items.json').read_text(encoding='utf-8')
+    default = (output_dir / 'default' / 'items.json').read_text(encoding='utf-8')
+
+    assert list(json.loads(dev)['items'][0]) == ['ID', 'attack', 'name', 'type']
+    assert list(json.loads(default)['items'][0]) == ['ID', 'name', 'type', 'attack']
+    assert '\n' not in release.strip()
+    assert json.loads(dev) == json.loads(release) == json.loads(default)
+
+
+def test_cached_sheets_match_full_conversion_for_every_profile(tmp_path, workbook, make_config, read_outputs,
+                                                                caplog):
+    config = make_config()
+    convert(tmp_path, 'expected', config, incremental=False)
+    expected = read_outputs(tmp_path / 'expected')
+
+    convert(tmp_path, 'json', config)
+    assert read_outputs(tmp_path / 'json') == expected
+
+    # 删除清单后工作簿被重新转换，两个工作表都直接使用缓存的片段
+    (tmp_path / 'json' / MANIFEST_FILENAME).unlink()
+    with caplog.at_level(logging.INFO):
+        assert convert(tmp_path, 'json', config)['success'] == 1
+    assert '重新解析工作表' not in caplog.text
+    assert read_outputs(tmp_path / 'json') == expected
+
+
+def test_changed_sheet_is_parsed_again_with_other_sheets_cached(tmp_path, workbook, make_workbook, make_config,
+                                                                read_outputs, caplog):
+    config = make_config()
+    convert(tmp_path, 'json', config)
+
+    make_workbook('items', {'items': ITEM_ROWS, 'drops': DROP_ROWS + [[3, 2, 0.125]]})
+    with caplog.at_level(logging.INFO):
+        assert convert(tmp_path, 'json', config)['success'] == 1
+    assert '重新解析工作表: drops' in caplog.text
+
+    convert(tmp_path, 'expected', config, incremental=False)
+    assert read_outputs(tmp_path / 'json') == read_outputs(tmp_path / 'expected')
+
+
+def test_reordered_profiles_do_not_reuse_other_profile_fragments(tmp_path, workbook, make_config, read_outputs):
+    config = make_config()
+    convert(tmp_path, 'json', config)
+
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'), config_path=config,
+                                     output_profile='release,dev')
+    converter.convert_all_files()
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'expected'), config_path=config,
+                                     output_profile='release,dev', incremental=False)
+    converter.convert_all_files()
+
+    actual = read_outputs(tmp_path / 'json')
+    expected = read_outputs(tmp_path / 'expected')
+    assert {name: actual[name] for name in expected} == expected
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""--jobs 并行转换与串行转换的输出、日志顺序、进度事件和统计结果相同"""
+
+import json
+import logging
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from build_manifest import MANIFEST_FILENAME
+from excel_to_json import ExcelToJsonConverter
+from progress import ProgressReporter
+
+WORKBOOKS = {
+    'hero': {'hero': [['ID', 'name', 'hp'], [1, '剑士', 120], [2, '法师', 80]]},
+    'items': {
+        'weapons': [['ID', 'name', 'attack'], [1, '铁剑', 10.5], [2, '木弓', 7]],
+        'armors': [['ID', 'name', 'defense'], [1, '木盾', 3], [2, None, 4]],
+    },
+    'skills': {'skills': [['ID', 'power', 'active'], [1, 1.5, True], [2, 2, False]]},
+    'quests': {'quests': [['key', 'reward'], ['q1', 100], ['q2', 200]]},
+}
+
+# 只在并行模式下出现的日志
+PARALLEL_ONLY = re.compile(r'^使用 \d+ 个进程并行转换$')
+
+
+def run(tmp_path, config, jobs, caplog):
+    """转换全部工作簿，返回 (统计, 输出内容, 日志, 进度事件, 运行报告, 构建清单)"""
+    for directory in ('json', 'gdscript'):
+        shutil.rmtree(tmp_path / directory, ignore_errors=True)
+
+    events = []
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'), config_path=config,
+                                     generate_gdscript=True, gdscript_output_dir=str(tmp_path / 'gdscript'),
+                                     binary_output=True, jobs=jobs, collect_report=True,
+                                     progress=ProgressReporter(events.append))
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        result = converter.convert_all_files()
+
+    outputs = {
+        path.relative_to(tmp_path).as_posix(): path.read_bytes()
+        for directory in ('json', 'gdscript')
+        for path in sorted((tmp_path / directory).rglob('*'))
+        if path.is_file() and path.name != MANIFEST_FILENAME
+    }
+    logs = [(record.levelname, record.getMessage()) for record in caplog.records
+            if not PARALLEL_ONLY.match(record.getMessage())]
+    for event in events:
+        event.pop('seconds', None)
+    report = [(file_report['file'], file_report['status'], file_report['rows'],
+               [(sheet['name'], sheet['rows'], sheet['bytes']) for sheet in file_report['sheets']])
+              for file_report in converter.report.files]
+    manifest = json.loads((tmp_path / 'json' / MANIFEST_FILENAME).read_text(encoding='utf-8'))
+    return result, outputs, logs, events, report, manifest
+
+
+def test_parallel_matches_serial(tmp_path, make_workbook, make_config, caplog, monkeypatch):
+    for name, sheets in WORKBOOKS.items():
+        make_workbook(name, sheets)
+    (tmp_path / 'excel' / 'broken.xlsx').write_bytes(b'not a workbook')
+    config = make_config()
+
+    serial = run(tmp_path, config, 1, caplog)
+    parallel_runs = []
+    convert_files_parallel = ExcelToJsonConverter.convert_files_parallel
+    monkeypatch.setattr(ExcelToJsonConverter, 'convert_files_parallel',
+                        lambda self, *args, **kwargs: parallel_runs.append(1) or
+                        convert_files_parallel(self, *args, **kwargs))
+    parallel = run(tmp_path, config, 2, caplog)
+    assert parallel_runs == [1]
+
+    assert serial[0] == {'success': 4, 'failed': 1, 'skipped': 0}
+    assert parallel[0] == serial[0]
+    assert parallel[1] == serial[1]
+    assert parallel[2] == serial[2]
+    assert parallel[3] == serial[3]
+    assert parallel[4] == serial[4]
+    assert parallel[5] == serial[5]
+    assert len(serial[2]) > 10 and serial[3]
+
+    # 日志按输入顺序：每个文件的开始和完成日志都在下一个文件之前
+    started = [message for _, message in serial[2] if message.startswith('开始转换文件')]
+    assert [message.rsplit('/', 1)[-1] for message in started] == \
+        ['broken.xlsx', 'hero.xlsx', 'items.xlsx', 'quests.xlsx', 'skills.xlsx']
+
+
+def test_parallel_summary_in_cli_output(tmp_path, make_workbook, make_config):
+    for name, sheets in WORKBOOKS.items():
+        make_workbook(name, sheets)
+    src_dir = Path(__file__).resolve().parent.parent
+
+    summaries = []
+    for jobs in ('1', '2'):
+        shutil.rmtree(tmp_path / 'json', ignore_errors=True)
+        result = subprocess.run(
+            [sys.executable, str(src_dir / 'excel_to_json.py'), '-i', str(tmp_path / 'excel'),
+             '-o', str(tmp_path / 'json'), '-c', make_config(), '--jobs', jobs],
+            capture_output=True, text=True, encoding='utf-8', timeout=120,
+        )
+        assert result.returncode == 0, result.stderr
+        summaries.append([line.split(' - ', 2)[-1] for line in result.stderr.splitlines()
+                          if '批量转换完成' in line or '输出文件有变化' in line])
+
+    assert summaries[0][0] == '批量转换完成！成功: 4, 失败: 0, 跳过: 0'
+    assert summaries[1] == summaries[0]
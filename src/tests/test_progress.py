@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""--progress 事件流和 --log-file：标准输出只有JSON事件，标准错误输出写入日志文件"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_progress_events_with_log_file(tmp_path, make_workbook, make_config):
+    make_workbook('items', {'items': [['ID', 'name'], [1, '铁剑']]})
+    (tmp_path / 'excel' / 'broken.xlsx').write_bytes(b'not a workbook')
+    log_file = tmp_path / 'convert.log'
+
+    result = subprocess.run(
+        [sys.executable, str(SRC_DIR / 'excel_to_json.py'), '--progress', '--log-file', str(log_file),
+         '-i', str(tmp_path / 'excel'), '-o', str(tmp_path / 'json'), '-c', make_config()],
+        capture_output=True, text=True, encoding='utf-8', timeout=120,
+    )
+
+    assert result.stderr == ''
+    assert log_file.exists()
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    names = [event['event'] for event in events if event['event'] != 'log']
+    assert names[0] == 'batch_started'
+    assert 'error' in names
+    assert events[-1]['event'] == 'batch_finished'
+    assert (events[-1]['success'], events[-1]['failed']) == (1, 1)
+
+
+def test_redirect_stderr_captures_python_and_fd_writes(tmp_path):
+    log_file = tmp_path / 'stderr.log'
+    code = (
+        'import os, sys\n'
+        'from progress import redirect_stderr\n'
+        f'redirect_stderr({str(log_file)!r})\n'
+        'print("python", file=sys.stderr)\n'
+        'os.write(2, b"fd\\n")\n'
+        'raise SystemExit("exit")\n'
+    )
+
+    result = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR, capture_output=True, text=True, timeout=60)
+
+    assert result.stderr == ''
+    assert log_file.read_text(encoding='utf-8').split() == ['python', 'fd', 'exit']
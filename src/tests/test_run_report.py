@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""--report 运行报告、--profile 性能分析和内存增量测量"""
+
+import json
+import pstats
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from excel_to_json import CONVERTER_VERSION
+from run_report import REPORT_VERSION, FILE_STAGES, PeakMemory, RunReport
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+def run_main(tmp_path, config, *extra):
+    return subprocess.run(
+        [sys.executable, str(SRC_DIR / 'excel_to_json.py'),
+         '-i', str(tmp_path / 'excel'), '-o', str(tmp_path / 'json'), '-c', config, *extra],
+        capture_output=True, text=True, encoding='utf-8', timeout=120,
+    )
+
+
+def test_report_and_profile(tmp_path, make_workbook, make_config):
+    make_workbook('items', {
+        'items': [['ID', 'name'], [1, '铁剑'], [2, '木盾']],
+        'skills': [['ID', 'power'], [1, 1.5]],
+    })
+    (tmp_path / 'excel' / 'broken.xlsx').write_bytes(b'not a workbook')
+    report_file = tmp_path / 'report.json'
+    profile_file = tmp_path / 'convert.prof'
+
+    result = run_main(tmp_path, make_config(), '--report', str(report_file), '--profile', str(profile_file))
+    assert result.returncode == 0, result.stderr
+
+    report = json.loads(report_file.read_text(encoding='utf-8'))
+    assert report['report_version'] == REPORT_VERSION
+    assert report['converter_version'] == CONVERTER_VERSION
+    assert report['summary'] == {'success': 1, 'failed': 1, 'skipped': 0}
+    assert report['rows'] == 3
+    assert set(report['stages']) == set(FILE_STAGES)
+
+    files = {Path(file_report['file']).name: file_report for file_report in report['files']}
+    assert files['broken.xlsx']['status'] == 'failed'
+    assert files['broken.xlsx']['error']
+    items = files['items.xlsx']
+    assert items['status'] == 'success'
+    assert {sheet['name']: sheet['rows'] for sheet in items['sheets']} == {'items': 2, 'skills': 1}
+    assert all(sheet['bytes'] > 0 for sheet in items['sheets'])
+    assert 'items.json' in {Path(output).name for output in items['changed_outputs']}
+    assert {sheet['sheet'] for sheet in report['slowest_sheets']} == {'items', 'skills'}
+    if items['rss_increase_mb'] is not None:
+        assert items['rss_increase_mb'] >= 0
+        assert all(sheet['rss_increase_mb'] >= 0 for sheet in items['sheets'])
+
+    stats = pstats.Stats(str(profile_file))
+    assert any(function == 'convert_all_files' for _, _, function in stats.stats)
+
+
+def test_skipped_file_in_report(tmp_path, make_workbook, make_config):
+    make_workbook('items', {'items': [['ID', 'name'], [1, '铁剑']]})
+    config = make_config()
+    assert run_main(tmp_path, config).returncode == 0
+
+    report_file = tmp_path / 'report.json'
+    assert run_main(tmp_path, config, '--report', str(report_file)).returncode == 0
+
+    report = json.loads(report_file.read_text(encoding='utf-8'))
+    assert report['summary'] == {'success': 0, 'failed': 0, 'skipped': 1}
+    assert report['files'][0]['rss_increase_mb'] is None
+    assert report['changed_outputs'] == []
+
+
+def test_report_module_does_not_import_converter():
+    code = 'import sys, run_report; print("excel_to_json" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR, capture_output=True, text=True, timeout=60)
+    assert result.stdout.strip() == 'False'
+    assert RunReport('9.9').to_dict()['converter_version'] == '9.9'
+
+
+def test_overlapping_measurements_do_not_reset_each_other():
+    outer = PeakMemory()
+    if outer.increase_mb() is None:
+        pytest.skip('无法测量内存')
+
+    block = b'x' * (64 * 1024 * 1024)
+    inner = PeakMemory()
+    inner_increase = inner.increase_mb()
+    # 内层测量开始时内存已经分配，外层测量仍能看到这次增长
+    outer_increase = outer.increase_mb()
+    del block
+
+    assert outer_increase >= 48
+    assert inner_increase < 48
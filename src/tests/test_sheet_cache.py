@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""工作表级缓存和 --sheets 筛选：只重新解析变化或选中的工作表，输出总是包含全部工作表"""
+
+import json
+import logging
+import shutil
+
+import pytest
+
+from build_manifest import MANIFEST_FILENAME
+from excel_to_json import ExcelToJsonConverter
+from sheet_cache import SHEET_CACHE_DIRNAME
+
+ITEM_ROWS = [
+    ['ID', 'name', 'type'],
+    [1, '铁剑', 'weapon'],
+    [2, '药水', 'potion'],
+]
+
+DROP_ROWS = [
+    ['ID', 'item', 'rate'],
+    [1, 1, 0.5],
+]
+
+LEVEL_ROWS = [
+    ['level', 'exp'],
+    [1, 100],
+    [2, 250],
+]
+
+
+def convert(tmp_path, output_name, config, **options):
+    """把 tmp_path/excel 转换到 tmp_path/<output_name>（含GDScript和二进制输出），返回转换统计"""
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / output_name), config_path=config,
+                                     generate_gdscript=True, gdscript_output_dir=str(tmp_path / output_name / 'gd'),
+                                     binary_output=True, **options)
+    return converter.convert_all_files()
+
+
+def assert_matches_fresh_conversion(tmp_path, config, read_outputs):
+    """在同一输出目录中完整重新转换（生成的加载器包含输出路径），与当前输出比较"""
+    actual = read_outputs(tmp_path / 'json')
+    shutil.rmtree(tmp_path / 'json')
+    convert(tmp_path, 'json', config, incremental=False)
+    assert read_outputs(tmp_path / 'json') == actual
+
+
+def read_sheets(tmp_path, output_name='json'):
+    with open(tmp_path / output_name / 'game.json', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def workbook(make_workbook):
+    return make_workbook('game', {'items': ITEM_ROWS, 'drops': DROP_ROWS, 'levels': LEVEL_ROWS})
+
+
+def test_only_edited_sheet_is_parsed_again(tmp_path, workbook, make_workbook, make_config, read_outputs, caplog):
+    config = make_config()
+    convert(tmp_path, 'json', config)
+
+    make_workbook('game', {'items': ITEM_ROWS, 'drops': DROP_ROWS + [[2, 2, 0.125]], 'levels': LEVEL_ROWS})
+    with caplog.at_level(logging.INFO):
+        assert convert(tmp_path, 'json', config)['success'] == 1
+    assert '重新解析工作表: drops' in caplog.text
+    assert_matches_fresh_conversion(tmp_path, config, read_outputs)
+
+
+def test_cache_entries_of_removed_sheets_are_dropped(tmp_path, workbook, make_workbook, make_config, read_outputs):
+    config = make_config()
+    convert(tmp_path, 'json', config)
+    cache_dir = tmp_path / 'json' / SHEET_CACHE_DIRNAME
+    files_before = len(list(cache_dir.rglob('*')))
+
+    make_workbook('game', {'items': ITEM_ROWS, 'levels': LEVEL_ROWS})
+    convert(tmp_path, 'json', config)
+
+    assert len(list(cache_dir.rglob('*'))) < files_before
+    (index,) = cache_dir.rglob('sheets.json')
+    assert sorted(json.loads(index.read_text(encoding='utf-8'))['sheets']) == ['items', 'levels']
+    assert_matches_fresh_conversion(tmp_path, config, read_outputs)
+
+
+def test_sheet_filter_keeps_other_sheets_and_scripts(tmp_path, workbook, make_workbook, make_config, read_outputs,
+                                                     caplog):
+    config = make_config()
+    convert(tmp_path, 'json', config)
+    scripts = sorted(path.name for path in (tmp_path / 'json' / 'gd').rglob('*.gd'))
+
+    make_workbook('game', {'items': ITEM_ROWS + [[3, '木盾', 'armor']], 'drops': DROP_ROWS + [[2, 3, 1.0]],
+                           'levels': LEVEL_ROWS})
+    with caplog.at_level(logging.INFO):
+        assert convert(tmp_path, 'json', config, sheets=['items'])['success'] == 1
+    assert '重新解析工作表: items' in caplog.text
+
+    # 只有选中的工作表更新，其余工作表保持上次的输出，生成的脚本都保留
+    sheets = read_sheets(tmp_path)
+    assert list(sheets) == ['items', 'drops', 'levels']
+    assert len(sheets['items']) == 3
+    assert len(sheets['drops']) == 1
+    assert sorted(path.name for path in (tmp_path / 'json' / 'gd').rglob('*.gd')) == scripts
+
+    # 不带筛选再次转换时，修改过的其余工作表也会更新
+    assert convert(tmp_path, 'json', config)['success'] == 1
+    assert_matches_fresh_conversion(tmp_path, config, read_outputs)
+
+
+def test_sheet_filter_without_cache_converts_all_sheets(tmp_path, workbook, make_config):
+    config = make_config()
+    assert convert(tmp_path, 'json', config, sheets=['levels'])['success'] == 1
+    assert list(read_sheets(tmp_path)) == ['items', 'drops', 'levels']
+
+    assert convert(tmp_path, 'plain', config, sheets=['levels'], incremental=False)['success'] == 1
+    assert list(read_sheets(tmp_path, 'plain')) == ['items', 'drops', 'levels']
+
+
+def test_sheet_filter_without_matching_sheets_leaves_outputs(tmp_path, workbook, make_config, read_outputs):
+    config = make_config()
+    convert(tmp_path, 'json', config)
+    before = read_outputs(tmp_path / 'json')
+
+    (tmp_path / 'json' / MANIFEST_FILENAME).unlink()
+    convert(tmp_path, 'json', config, sheets=['missing'])
+
+    assert read_outputs(tmp_path / 'json') == before
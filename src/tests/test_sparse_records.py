@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""稀疏记录：省略的字段按null或字段默认值补回后与完整记录相同"""
+
+import json
+
+from build_manifest import MANIFEST_FILENAME
+from excel_to_json import ExcelToJsonConverter
+from sparse_records import SparseRecordFilter
+
+ITEM_ROWS = [
+    ['ID', 'name', 'count', 'rate', 'active', 'note'],
+    [0, '铁剑', 0, 0.0, False, None],
+    [1, '木盾', 3, 0.5, True, '稀有'],
+    [2, '药水', 0, 1.5, False, None],
+]
+
+# 各字段的数据类默认值（与推断出的类型对应，含空值的note列推断为Variant，默认值为null）
+FIELD_DEFAULTS = {'ID': 0, 'name': '', 'count': 0, 'rate': 0.0, 'active': False, 'note': None}
+
+
+def convert(tmp_path, output_name, config, **options):
+    """把 tmp_path/excel 转换到 tmp_path/<output_name>，返回items表的记录"""
+    converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / output_name),
+                                     config_path=config, incremental=False, **options)
+    assert converter.convert_all_files()['failed'] == 0
+    with open(tmp_path / output_name / 'items.json', encoding='utf-8') as f:
+        return json.load(f)['items']
+
+
+def test_null_fields_are_omitted(tmp_path, make_workbook, make_config):
+    make_workbook('items', {'items': ITEM_ROWS})
+    full = convert(tmp_path, 'full', make_config({'DEFAULT': {'include_null_values': 'true'}}, 'full.ini'))
+    sparse = convert(tmp_path, 'sparse', make_config({'DEFAULT': {'include_null_values': 'false'}}))
+
+    assert 'note' not in sparse[0]
+    assert any(value is None for record in full for value in record.values())
+    assert not any(value is None for record in sparse for value in record.values())
+    assert [{key: record.get(key) for key in full_record} for record, full_record in zip(sparse, full)] == full
+
+
+def test_default_values_are_omitted_and_restored(tmp_path, make_workbook, make_config):
+    make_workbook('items', {'items': ITEM_ROWS})
+    options = {'generate_gdscript': True, 'gdscript_output_dir': str(tmp_path / 'gd')}
+    full = convert(tmp_path, 'full', make_config({'DEFAULT': {'include_null_values': 'true'}}, 'full.ini'),
+                   **options)
+    sparse = convert(tmp_path, 'sparse', make_config({
+        'DEFAULT': {'include_null_values': 'false'},
+        'OUTPUT': {'omit_default_values': 'true'},
+    }), **options)
+
+    # ID字段即使等于默认值也保留
+    assert sparse[0] == {'ID': 0, 'name': '铁剑'}
+    assert sparse[1] == {'ID': 1, 'name': '木盾', 'count': 3, 'rate': 0.5, 'active': True, 'note': '稀有'}
+    assert sparse[2] == {'ID': 2, 'name': '药水', 'rate': 1.5}
+
+    restored = [{key: record.get(key, FIELD_DEFAULTS[key]) for key in FIELD_DEFAULTS} for record in sparse]
+    assert restored == full
+
+
+def test_variant_columns_keep_default_looking_values():
+    class Tracker:
+        sheets_structure = {'mixed': {'ID': 'int', 'value': 'Variant', 'count': 'int'}}
+
+    records = [{'ID': 1, 'value': 0, 'count': 0}, {'ID': 2, 'value': 'x', 'count': 5}]
+    sparse_filter = SparseRecordFilter(include_null_values=False, omit_default_values=True)
+
+    ((sheet_name, sparse),) = sparse_filter.track([('mixed', iter(records))], Tracker())
+
+    assert sheet_name == 'mixed'
+    assert list(sparse) == [{'ID': 1, 'value': 0}, {'ID': 2, 'value': 'x', 'count': 5}]
+
+
+def test_sparse_records_from_sheet_cache_match_full_conversion(tmp_path, make_workbook, make_config, read_outputs):
+    make_workbook('items', {'items': ITEM_ROWS, 'drops': [['ID', 'rate'], [1, None], [2, 0.5]]})
+    config = make_config({'DEFAULT': {'include_null_values': 'false'}})
+
+    ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'expected'), config_path=config,
+                         incremental=False).convert_all_files()
+    for _ in range(2):
+        # 第二次转换前删除清单，工作簿重新转换时两个工作表都命中缓存
+        (tmp_path / 'json' / MANIFEST_FILENAME).unlink(missing_ok=True)
+        converter = ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'), config_path=config)
+        assert converter.convert_all_files()['success'] == 1
+        assert read_outputs(tmp_path / 'json') == read_outputs(tmp_path / 'expected')
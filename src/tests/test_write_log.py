@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""只写入有变化的文件：未变化的输出保留原文件，有变化的输出路径出现在日志、运行报告和进度事件中"""
+
+import logging
+
+import pytest
+
+from excel_to_json import ExcelToJsonConverter
+from progress import ProgressReporter
+
+
+def create_converter(tmp_path, config, **options):
+    """创建同时输出JSON、二进制和GDScript的转换器"""
+    return ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'),
+                                generate_gdscript=True, gdscript_output_dir=str(tmp_path / 'gdscript'),
+                                binary_output=True, config_path=config, **options)
+
+
+def output_state(tmp_path):
+    """输出目录（含缓存、清单等隐藏文件）中每个文件的修改时间"""
+    return {
+        path: path.stat().st_mtime_ns
+        for directory in ('json', 'gdscript')
+        for path in (tmp_path / directory).rglob('*') if path.is_file()
+    }
+
+
+@pytest.mark.parametrize('options', [{}, {'pipeline_writes': True}, {'jobs': 2}])
+def test_unchanged_reexport_keeps_files(tmp_path, make_workbook, make_config, options):
+    make_workbook('hero', {'hero': [['ID', 'name'], [1, '铁剑']], 'skill': [['ID', 'power'], [1, 2.5]]})
+    make_workbook('items', {'items': [['ID', 'price'], [1, 10]]})
+    config = make_config()
+    create_converter(tmp_path, config).convert_all_files()
+    before = output_state(tmp_path)
+
+    events = []
+    converter = create_converter(tmp_path, config, progress=ProgressReporter(events.append), **options)
+    assert converter.convert_all_files(force=True) == {'success': 2, 'failed': 0, 'skipped': 0}
+
+    after = output_state(tmp_path)
+    assert not [path for path in after if path.name.endswith('.tmp')]
+    assert after == before
+    assert events[-1]['event'] == 'batch_finished'
+    assert events[-1]['changed'] == []
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_changed_paths_reported(tmp_path, make_workbook, make_config, caplog, jobs):
+    make_workbook('hero', {'hero': [['ID', 'name'], [1, '铁剑']]})
+    make_workbook('items', {'items': [['ID', 'price'], [1, 10]]})
+    config = make_config()
+    create_converter(tmp_path, config).convert_all_files()
+
+    make_workbook('items', {'items': [['ID', 'price'], [1, 12]]})
+    events = []
+    converter = create_converter(tmp_path, config, jobs=jobs, collect_report=True,
+                                 progress=ProgressReporter(events.append))
+    with caplog.at_level(logging.INFO):
+        assert converter.convert_all_files(force=True) == {'success': 2, 'failed': 0, 'skipped': 0}
+
+    json_file = str(tmp_path / 'json' / 'items.json')
+    changed = events[-1]['changed']
+    assert json_file in changed
+    assert str(tmp_path / 'json' / 'items.bin') in changed
+    assert not [path for path in changed if 'hero' in path]
+
+    report = converter.report.to_dict()
+    assert report['changed_outputs'] == changed
+    files = {file_report['file']: file_report for file_report in report['files']}
+    assert files[str(tmp_path / 'excel' / 'hero.xlsx')]['changed_outputs'] == []
+
+    assert f"已更新: {json_file}" in caplog.messages
+    assert not [message for message in caplog.messages if message.startswith('已更新:') and 'hero' in message]
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""后台提交：同一文件按提交顺序完成，等待提交的数据过多时阻塞，后一个文件失败不影响前一个文件"""
+
+import threading
+
+import pytest
+
+import json_writer
+from excel_to_json import ExcelToJsonConverter
+from json_writer import WritePipeline, atomic_open, defer_writes, record_writes
+
+
+@pytest.fixture
+def gated_commits(monkeypatch):
+    """在 release 之前阻塞所有提交线程"""
+    release = threading.Event()
+    commit = json_writer._commit_temp_file
+
+    def gated(temp_file, output_file, skip_unchanged):
+        assert release.wait(10)
+        commit(temp_file, output_file, skip_unchanged)
+
+    monkeypatch.setattr(json_writer, '_commit_temp_file', gated)
+    return release
+
+
+def write(path, text):
+    with atomic_open(path) as f:
+        f.write(text)
+
+
+def test_same_file_commits_in_submission_order(tmp_path):
+    output_file = tmp_path / 'data.json'
+
+    with record_writes() as write_log, WritePipeline(workers=4) as pipeline:
+        with defer_writes(pipeline) as batch:
+            for version in range(30):
+                write(output_file, f"version {version}")
+                write(tmp_path / f"other_{version}.json", str(version))
+        batch.wait()
+
+    assert output_file.read_text(encoding='utf-8') == 'version 29'
+    assert write_log.changed.count(output_file) == 30
+    assert not list(tmp_path.glob('.*.tmp'))
+
+
+def test_writes_outside_defer_are_synchronous(tmp_path):
+    with WritePipeline() as pipeline:
+        with defer_writes(pipeline):
+            pass
+        write(tmp_path / 'data.json', 'now')
+        assert (tmp_path / 'data.json').read_text(encoding='utf-8') == 'now'
+
+
+def test_backpressure_blocks_until_commits_finish(tmp_path, gated_commits):
+    submitted = threading.Event()
+
+    with WritePipeline(workers=2, max_pending_bytes=10) as pipeline:
+        with defer_writes(pipeline) as batch:
+            write(tmp_path / 'a.json', '12345678')
+
+            def submit_second():
+                with defer_writes(pipeline):
+                    write(tmp_path / 'b.json', '12345678')
+                submitted.set()
+
+            thread = threading.Thread(target=submit_second)
+            thread.start()
+            # 8 + 8 字节超过上限，第二个文件等待第一个提交完成
+            assert not submitted.wait(0.3)
+            assert pipeline.pending_bytes == 8
+
+            gated_commits.set()
+            assert submitted.wait(10)
+            thread.join()
+            batch.wait()
+
+    assert (tmp_path / 'a.json').read_text(encoding='utf-8') == '12345678'
+    assert (tmp_path / 'b.json').read_text(encoding='utf-8') == '12345678'
+    assert pipeline.pending_bytes == 0
+
+
+def test_file_larger_than_limit_is_still_submitted(tmp_path):
+    with WritePipeline(max_pending_bytes=4) as pipeline:
+        with defer_writes(pipeline) as batch:
+            write(tmp_path / 'big.json', 'x' * 100)
+        batch.wait()
+
+    assert (tmp_path / 'big.json').read_text(encoding='utf-8') == 'x' * 100
+
+
+def test_failed_batch_does_not_affect_earlier_batch(tmp_path, monkeypatch):
+    commit = json_writer._commit_temp_file
+
+    def failing(temp_file, output_file, skip_unchanged):
+        if output_file.name == 'b.json':
+            temp_file.unlink()
+            raise OSError('磁盘已满')
+        commit(temp_file, output_file, skip_unchanged)
+
+    monkeypatch.setattr(json_writer, '_commit_temp_file', failing)
+    (tmp_path / 'b.json').write_text('old', encoding='utf-8')
+
+    with WritePipeline() as pipeline:
+        with defer_writes(pipeline) as first:
+            write(tmp_path / 'a.json', 'new')
+        with defer_writes(pipeline) as second:
+            write(tmp_path / 'b.json', 'new')
+
+        first.wait()
+        with pytest.raises(OSError, match='磁盘已满'):
+            second.wait()
+
+    assert (tmp_path / 'a.json').read_text(encoding='utf-8') == 'new'
+    assert (tmp_path / 'b.json').read_text(encoding='utf-8') == 'old'
+    assert not list(tmp_path.glob('.*.tmp'))
+
+
+def create_converter(tmp_path, config):
+    return ExcelToJsonConverter(str(tmp_path / 'excel'), str(tmp_path / 'json'), config_path=config,
+                                generate_gdscript=True, gdscript_output_dir=str(tmp_path / 'gdscript'),
+                                pipeline_writes=True, write_threads=2)
+
+
+def test_pipelined_conversion_keeps_earlier_output_when_later_file_fails(tmp_path, make_workbook,
+                                                                           make_config, monkeypatch):
+    for name in ('a', 'b', 'c'):
+        make_workbook(name, {name: [['ID', 'value'], [1, 'old']]})
+    config = make_config()
+    assert create_converter(tmp_path, config).convert_all_files() == {'success': 3, 'failed': 0, 'skipped': 0}
+
+    for name in ('a', 'b', 'c'):
+        make_workbook(name, {name: [['ID', 'value'], [1, 'new']]})
+    commit = json_writer._commit_temp_file
+
+    def failing(temp_file, output_file, skip_unchanged):
+        if output_file.name == 'b.json':
+            temp_file.unlink()
+            raise OSError('磁盘已满')
+        commit(temp_file, output_file, skip_unchanged)
+
+    monkeypatch.setattr(json_writer, '_commit_temp_file', failing)
+    converter = create_converter(tmp_path, config)
+    assert converter.convert_all_files() == {'success': 2, 'failed': 1, 'skipped': 0}
+
+    json_dir = tmp_path / 'json'
+    assert 'new' in (json_dir / 'a.json').read_text(encoding='utf-8')
+    assert 'new' in (json_dir / 'c.json').read_text(encoding='utf-8')
+    assert 'old' in (json_dir / 'b.json').read_text(encoding='utf-8')
+    assert not [path for path in tmp_path.rglob('*.tmp')]
+
+    # 失败的文件没有记入清单，下次重新转换；成功的文件不受影响
+    monkeypatch.setattr(json_writer, '_commit_temp_file', commit)
+    assert create_converter(tmp_path, config).convert_all_files() == {'success': 1, 'failed': 0, 'skipped': 2}
+    assert 'new' in (json_dir / 'b.json').read_text(encoding='utf-8')